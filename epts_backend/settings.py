@@ -60,6 +60,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "performance.middleware.RankQueueMiddleware",
 ]
 
 ROOT_URLCONF = "epts_backend.urls"
@@ -380,6 +381,46 @@ API_VERSION = "v1"
 PERFORMANCE_EVALUATION_PERIOD = "weekly"
 TOP_PERFORMERS_COUNT = 5
 WEAK_PERFORMERS_COUNT = 5
+PERFORMANCE_BULK_MAX_ROWS = 500
+PERFORMANCE_IMPORT_CHUNK_SIZE = 1000
+
+# Report settings
+REPORT_STREAM_CHUNK_SIZE = 2000
+# Background report jobs: "thread" runs them in a pool inside the web process,
+# "worker" leaves them queued for `python manage.py report_worker`
+REPORT_JOB_RUNNER = "thread"
+REPORT_JOB_WORKERS = 2
+# Jobs still "running" this long after they started are treated as orphaned by a
+# crashed/restarted process and queued again (on startup and by report_worker)
+REPORT_JOB_STALE_SECONDS = 2 * 3600
+# Cached report payloads are invalidated on change; the TTL is a safety net (None = no expiry)
+REPORT_CACHE_TTL_SECONDS = 24 * 3600
+# Bulk PDF rendering: process pool size (None = CPU count) and smallest batch worth a pool
+REPORT_PDF_WORKERS = None
+REPORT_PDF_PARALLEL_MIN = 8
+# Rendered employee PDFs, content-addressed and LRU-trimmed to the size cap
+REPORT_PDF_CACHE_DIR = MEDIA_ROOT / "pdf_cache"
+REPORT_PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# `manage.py warm_reports`: threads used to build department reports in parallel
+REPORT_WARM_WORKERS = 4
+# Report datasets memoized per process (shared by JSON / CSV / Excel / PDF renderers)
+REPORT_DATASET_MEMO_SIZE = 32
+REPORT_DATASET_MEMO_SECONDS = 300
+# CachedReport payloads: "zlib" / "gzip" store compressed compact JSON, "json" stores it as is
+REPORT_PAYLOAD_COMPRESSION = "zlib"
+REPORT_PAYLOAD_COMPRESSION_MIN_BYTES = 1024
+
+# Feedback averages: sum whole weeks from FeedbackWeekRollup (backfilled after
+# `migrate` when out of sync; repair with `python manage.py rebuild_feedback_rollups`
+# after queryset .update() / bulk_create writes); False scans the raw feedback tables
+FEEDBACK_USE_ROLLUPS = True
+
+# Feedback ?search=: ranked full-text hits considered per request
+# (rebuild the index with `python manage.py rebuild_feedback_search`)
+FEEDBACK_SEARCH_MAX_HITS = 500
+# Batch feedback submission (/api/feedback/bulk/) and `import_feedback` chunking
+FEEDBACK_BULK_MAX_ROWS = 5000
+FEEDBACK_IMPORT_CHUNK_SIZE = 1000
 
 # Account lockout settings
 MAX_LOGIN_ATTEMPTS = 5
@@ -0,0 +1,151 @@
+# ===========================================================
+# feedback/aggregates.py
+# ===========================================================
+# Purpose:
+# Batched feedback averages across all feedback sources.
+#
+# One grouped UNION ALL over GeneralFeedback, ManagerFeedback
+# and ClientFeedback returns sum / count / avg of ratings per
+# employee, for any number of employees (ids are chunked to stay
+# under the database's bind-parameter limit).
+# Optional date window is applied on feedback_date (inclusive).
+#
+# Whole ISO weeks come from FeedbackWeekRollup (a few small rows
+# per employee, maintained on write by feedback/rollups.py); only
+# the partial weeks at the window's edges scan raw feedback.
+# ===========================================================
+
+from collections import namedtuple
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from datetime import date, timedelta
+
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback, FeedbackWeekRollup
+
+FEEDBACK_MODELS = (GeneralFeedback, ManagerFeedback, ClientFeedback)
+
+# 3 tables × ids + 6 date params stays below SQLite's 999-variable limit
+ID_CHUNK_SIZE = 300
+
+FeedbackAverage = namedtuple("FeedbackAverage", ["sum", "count", "avg"])
+EMPTY_AVERAGE = FeedbackAverage(0, 0, 0.0)
+
+
+def _source_sql(model, placeholders, windowed):
+    meta = model._meta
+    table = connection.ops.quote_name(meta.db_table)
+    employee_col = connection.ops.quote_name(meta.get_field("employee").column)
+    rating_col = connection.ops.quote_name(meta.get_field("rating").column)
+    date_col = connection.ops.quote_name(meta.get_field("feedback_date").column)
+
+    sql = (
+        f"SELECT {employee_col} AS employee_id, {rating_col} AS rating FROM {table} "
+        f"WHERE {employee_col} IN ({placeholders})"
+    )
+    if windowed:
+        sql += f" AND {date_col} >= %s AND {date_col} <= %s"
+    return sql
+
+
+def _raw_totals(ids, start_date, end_date, totals):
+    """Add rating sum / count from the raw feedback tables (optionally windowed) into totals."""
+    windowed = start_date is not None or end_date is not None
+    window_params = [start_date or "0001-01-01", end_date or "9999-12-31"] if windowed else []
+
+    with connection.cursor() as cursor:
+        for offset in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[offset:offset + ID_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            union = " UNION ALL ".join(_source_sql(m, placeholders, windowed) for m in FEEDBACK_MODELS)
+            params = []
+            for _ in FEEDBACK_MODELS:
+                params.extend(chunk)
+                params.extend(window_params)
+
+            cursor.execute(
+                f"SELECT employee_id, SUM(rating), COUNT(*) FROM ({union}) feedback_union GROUP BY employee_id",
+                params,
+            )
+            for employee_id, total, count in cursor.fetchall():
+                entry = totals.setdefault(employee_id, [0, 0])
+                entry[0] += int(total or 0)
+                entry[1] += count
+
+
+def _rollup_totals(ids, first_week, last_week, totals):
+    """Add the FeedbackWeekRollup rows with week_start in [first_week, last_week] (None = open) into totals."""
+    for offset in range(0, len(ids), ID_CHUNK_SIZE):
+        rollups = FeedbackWeekRollup.objects.filter(employee_id__in=ids[offset:offset + ID_CHUNK_SIZE])
+        if first_week is not None:
+            rollups = rollups.filter(week_start__gte=first_week)
+        if last_week is not None:
+            rollups = rollups.filter(week_start__lte=last_week)
+        for row in rollups.values("employee_id").annotate(total=Sum("rating_sum"), count=Sum("rating_count")).order_by():
+            entry = totals.setdefault(row["employee_id"], [0, 0])
+            entry[0] += int(row["total"] or 0)
+            entry[1] += int(row["count"] or 0)
+
+
+def split_window(start_date, end_date):
+    """
+    Split a date window into whole ISO weeks and partial-week edges.
+    Returns (weeks, edges): weeks = (first_monday, last_monday) with None for
+    an open end, or None when the window holds no whole week; edges = the
+    (start, end) date ranges outside those weeks.
+    """
+    first_week = None if start_date is None else start_date + timedelta(days=(7 - start_date.weekday()) % 7)
+    last_week = None if end_date is None else end_date - timedelta(days=(end_date.weekday() + 1) % 7 + 6)
+
+    if first_week is not None and last_week is not None and first_week > last_week:
+        return None, [(start_date, end_date)]
+
+    edges = []
+    if start_date is not None and start_date < first_week:
+        edges.append((start_date, first_week - timedelta(days=1)))
+    if end_date is not None and last_week + timedelta(days=6) < end_date:
+        edges.append((last_week + timedelta(days=7), end_date))
+    return (first_week, last_week), edges
+
+
+def feedback_averages(employee_ids, start_date=None, end_date=None):
+    """
+    Return {employee_id: FeedbackAverage(sum, count, avg)} for employees
+    that have feedback in the window. Missing employees have no feedback;
+    use `.get(employee_id, EMPTY_AVERAGE)`.
+
+    start_date / end_date are dates or ISO strings (or None for open-ended).
+    Whole weeks of the window are summed from FeedbackWeekRollup; only the
+    partial weeks at its edges read the raw feedback tables
+    (FEEDBACK_USE_ROLLUPS = False scans the raw tables for everything).
+    """
+    ids = sorted({int(i) for i in employee_ids if i is not None})
+    if not ids:
+        return {}
+    if isinstance(start_date, str):
+        start_date = date.fromisoformat(start_date)
+    if isinstance(end_date, str):
+        end_date = date.fromisoformat(end_date)
+
+    totals = {}
+    if not getattr(settings, "FEEDBACK_USE_ROLLUPS", True):
+        _raw_totals(ids, start_date, end_date, totals)
+    else:
+        weeks, edges = split_window(start_date, end_date)
+        if weeks:
+            _rollup_totals(ids, *weeks, totals)
+        for edge_start, edge_end in edges:
+            _raw_totals(ids, edge_start, edge_end, totals)
+
+    return {
+        employee_id: FeedbackAverage(total, count, round(total / count, 2) if count else 0.0)
+        for employee_id, (total, count) in totals.items()
+        if count
+    }
+
+
+def feedback_average_map(employee_ids, start_date=None, end_date=None):
+    """{employee_id: avg rating} for every requested employee (0.0 when none)."""
+    employee_ids = list(employee_ids)
+    averages = feedback_averages(employee_ids, start_date=start_date, end_date=end_date)
+    return {e: averages.get(e, EMPTY_AVERAGE).avg for e in employee_ids}
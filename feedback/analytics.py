@@ -0,0 +1,209 @@
+# ===========================================================
+# feedback/analytics.py
+# ===========================================================
+# Purpose:
+# Rolling-window feedback analytics (e.g. last 30 / 90 / 365
+# days) per employee and per department, for many employees
+# at once.
+#
+# • The windows all end on `as_of`, so they are nested: one
+#   grouped query over the widest window labels every rating
+#   with the narrowest window containing it (CASE on
+#   feedback_date) and counts per (employee, department,
+#   window, rating); wider windows are cumulative sums
+# • The query filters employee_id IN (…) [AND department_id]
+#   AND a feedback_date range, i.e. the leading columns of the
+#   (employee, department, feedback_date) index of every
+#   feedback table; ids are chunked like feedback/aggregates.py
+# • Histograms are compact arrays: index 0 counts rating 1,
+#   index 9 counts rating 10
+# ===========================================================
+
+from django.db import connection
+from datetime import timedelta
+
+from employee.models import Department
+from .aggregates import FEEDBACK_MODELS, ID_CHUNK_SIZE
+from .models import RATING_MIN, RATING_MAX
+
+DEFAULT_WINDOWS = (30, 90, 365)
+MAX_WINDOWS = 5
+MAX_WINDOW_DAYS = 730
+
+RATING_SCALE = RATING_MAX - RATING_MIN + 1
+
+
+def parse_windows(value):
+    """'30,90,365' → (30, 90, 365); raises ValueError for bad input."""
+    if not value:
+        return DEFAULT_WINDOWS
+    try:
+        windows = sorted({int(part) for part in str(value).split(",") if part.strip()})
+    except ValueError:
+        raise ValueError("windows must be a comma-separated list of day counts.")
+    if not windows or len(windows) > MAX_WINDOWS:
+        raise ValueError(f"Provide between 1 and {MAX_WINDOWS} windows.")
+    if windows[0] < 1 or windows[-1] > MAX_WINDOW_DAYS:
+        raise ValueError(f"Windows must be between 1 and {MAX_WINDOW_DAYS} days.")
+    return tuple(windows)
+
+
+def window_start(as_of, days):
+    """First day of the `days`-day window ending on (and including) as_of."""
+    return as_of - timedelta(days=days - 1)
+
+
+def _source_sql(model, placeholders, with_department):
+    meta = model._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    employee_col = qn(meta.get_field("employee").column)
+    department_col = qn(meta.get_field("department").column)
+    rating_col = qn(meta.get_field("rating").column)
+    date_col = qn(meta.get_field("feedback_date").column)
+
+    sql = (
+        f"SELECT {employee_col} AS employee_id, {department_col} AS department_id, "
+        f"{rating_col} AS rating, {date_col} AS feedback_date FROM {table} "
+        f"WHERE {employee_col} IN ({placeholders})"
+    )
+    if with_department:
+        sql += f" AND {department_col} = %s"
+    return sql + f" AND {date_col} >= %s AND {date_col} <= %s"
+
+
+def _empty_window():
+    return [0] * RATING_SCALE
+
+
+def rating_counts(employee_ids, as_of, windows=DEFAULT_WINDOWS, department_id=None):
+    """
+    {(employee_id, department_id): [histogram per window, narrowest first]}
+    where each histogram counts ratings in that window only (not cumulative).
+    """
+    ids = sorted({int(i) for i in employee_ids if i is not None})
+    windows = sorted(windows)
+    if not ids:
+        return {}
+
+    adapt = connection.ops.adapt_datefield_value
+    starts = [adapt(window_start(as_of, days)) for days in windows]
+    # Narrowest window first: each row lands in the smallest window containing it
+    band = "0"
+    if len(windows) > 1:
+        whens = " ".join(f"WHEN feedback_date >= %s THEN {position}" for position in range(len(windows) - 1))
+        band = f"CASE {whens} ELSE {len(windows) - 1} END"
+    band_params = starts[:-1]
+    range_params = [starts[-1], adapt(as_of)]
+
+    counts = {}
+    with connection.cursor() as cursor:
+        for offset in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[offset:offset + ID_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            union = " UNION ALL ".join(
+                _source_sql(m, placeholders, department_id is not None) for m in FEEDBACK_MODELS
+            )
+            params = list(band_params)
+            for _ in FEEDBACK_MODELS:
+                params.extend(chunk)
+                if department_id is not None:
+                    params.append(department_id)
+                params.extend(range_params)
+
+            cursor.execute(
+                f"SELECT employee_id, department_id, {band} AS band, rating, COUNT(*) "
+                f"FROM ({union}) feedback_union "
+                f"GROUP BY employee_id, department_id, band, rating",
+                params,
+            )
+            for employee_id, dept_id, position, rating, count in cursor.fetchall():
+                if rating is None or not (RATING_MIN <= rating <= RATING_MAX):
+                    continue
+                histograms = counts.setdefault((employee_id, dept_id), [_empty_window() for _ in windows])
+                histograms[position][rating - RATING_MIN] += count
+    return counts
+
+
+def summarize(histogram):
+    """count / average / histogram of one window's rating counts."""
+    count = sum(histogram)
+    total = sum(n * (RATING_MIN + i) for i, n in enumerate(histogram))
+    return {
+        "count": count,
+        "average": round(total / count, 2) if count else None,
+        "histogram": histogram,
+    }
+
+
+def _cumulative(bands):
+    """Per-band histograms (narrowest first) → histograms of the nested windows."""
+    running = _empty_window()
+    result = []
+    for histogram in bands:
+        running = [a + b for a, b in zip(running, histogram)]
+        result.append(running)
+    return result
+
+
+def _add(target, bands):
+    for histogram, extra in zip(target, bands):
+        for i, n in enumerate(extra):
+            histogram[i] += n
+
+
+def rolling_feedback_analytics(employees, as_of, windows=DEFAULT_WINDOWS, department=None):
+    """
+    Rolling-window stats for the given Employee objects (user and
+    department loaded). Returns {"employees": [...], "departments": [...]},
+    each entry carrying {"<days>": {count, average, histogram}} per window.
+    Department totals group by the department recorded on the feedback.
+    """
+    windows = sorted(windows)
+    counts = rating_counts(
+        [e.id for e in employees], as_of, windows, department_id=department.id if department else None
+    )
+
+    per_employee = {}
+    per_department = {}
+    for (employee_id, department_id), bands in counts.items():
+        _add(per_employee.setdefault(employee_id, [_empty_window() for _ in windows]), bands)
+        _add(per_department.setdefault(department_id, [_empty_window() for _ in windows]), bands)
+
+    def _windows(bands):
+        return {
+            str(days): summarize(histogram)
+            for days, histogram in zip(windows, _cumulative(bands or [_empty_window() for _ in windows]))
+        }
+
+    department_names = {}
+    for employee in employees:
+        if employee.department_id:
+            department_names[employee.department_id] = employee.department.name
+    if department:
+        department_names[department.id] = department.name
+    missing = [d for d in per_department if d is not None and d not in department_names]
+    if missing:
+        department_names.update(Department.objects.filter(pk__in=missing).values_list("id", "name"))
+
+    return {
+        "employees": [
+            {
+                "emp_id": employee.user.emp_id,
+                "employee_name": f"{employee.user.first_name} {employee.user.last_name}".strip(),
+                "department": department_names.get(employee.department_id),
+                "windows": _windows(per_employee.get(employee.id)),
+            }
+            for employee in employees
+        ],
+        "departments": [
+            {
+                "department_id": department_id,
+                "department": department_names.get(department_id, "Unassigned"),
+                "windows": _windows(bands),
+            }
+            for department_id, bands in sorted(
+                per_department.items(), key=lambda item: department_names.get(item[0]) or ""
+            )
+        ],
+    }
@@ -0,0 +1,326 @@
+# ===========================================================
+# feedback/bulk.py
+# ===========================================================
+# Purpose:
+# Batch submission of General / Manager / Client feedback
+# (quarterly client batches run to thousands of rows).
+#
+# • Rows are validated without touching the database
+# • Employees / departments are resolved with one query each
+#   for the whole batch (or once per import)
+# • Valid rows are inserted with one bulk_create per feedback
+#   class; the weekly rollups, search index and cached reports
+#   are refreshed once for the batch (bulk_create skips save()
+#   and signals)
+# • Employees get one summary notification per feedback type,
+#   all created with a single bulk insert
+# • Invalid rows are reported per index without aborting the rest
+# ===========================================================
+
+from collections import Counter
+from rest_framework import serializers
+from django.db import transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
+import logging
+import time
+
+from employee.models import Employee, Department
+from notifications.models import Notification
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback, RATING_MIN, RATING_MAX
+from .rollups import refresh_feedback_rollups
+from .search import index_new_feedback
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_CLASSES = {
+    "General": GeneralFeedback,
+    "Manager": ManagerFeedback,
+    "Client": ClientFeedback,
+}
+
+BULK_INSERT_BATCH_SIZE = 500
+
+
+# ===========================================================
+# ROW VALIDATION (no database access)
+# ===========================================================
+class FeedbackRowSerializer(serializers.Serializer):
+    """
+    Shape/range validation for one feedback row of a batch.
+    `source` may be omitted when the batch has a default
+    (context["default_source"]).
+    """
+
+    source = serializers.ChoiceField(choices=list(FEEDBACK_CLASSES), required=False)
+    employee = serializers.CharField(required=False)
+    employee_emp_id = serializers.CharField(required=False)
+    department_code = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    feedback_text = serializers.CharField()
+    remarks = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    rating = serializers.IntegerField(
+        min_value=RATING_MIN, max_value=RATING_MAX,
+        error_messages={
+            "invalid": f"Rating must be an integer between {RATING_MIN} and {RATING_MAX}.",
+            "min_value": f"Rating must be between {RATING_MIN} and {RATING_MAX}.",
+            "max_value": f"Rating must be between {RATING_MIN} and {RATING_MAX}.",
+        },
+    )
+    visibility = serializers.ChoiceField(choices=["Private", "Public"], required=False, default="Private")
+    feedback_date = serializers.DateField(required=False)
+    manager_name = serializers.CharField(required=False, allow_blank=True, allow_null=True, max_length=150)
+    client_name = serializers.CharField(required=False, allow_blank=True, allow_null=True, max_length=150)
+
+    def validate(self, attrs):
+        emp_value = attrs.get("employee") or attrs.get("employee_emp_id")
+        if not emp_value:
+            raise serializers.ValidationError({"employee": "Employee ID is required."})
+        attrs["employee"] = emp_value.strip()
+
+        attrs["source"] = attrs.get("source") or self.context.get("default_source")
+        if not attrs["source"]:
+            raise serializers.ValidationError({"source": f"Source is required ({', '.join(FEEDBACK_CLASSES)})."})
+        attrs.setdefault("feedback_date", timezone.localdate())
+        return attrs
+
+
+# ===========================================================
+# BATCHED LOOKUPS
+# ===========================================================
+class FeedbackLookups:
+    """
+    Case-insensitive emp_id / department code maps.
+    Built once per batch (for_rows) or once per import (preload_all).
+    """
+
+    def __init__(self, employees, departments):
+        self.employees = employees        # EMP0001 -> Employee (user loaded)
+        self.departments = departments    # ENG01 -> Department
+
+    @classmethod
+    def for_rows(cls, rows):
+        emp_keys = {r["employee"].upper() for r in rows}
+        dept_keys = {r["department_code"].upper() for r in rows if r.get("department_code")}
+
+        employees = {}
+        if emp_keys:
+            employees = {
+                e.emp_key: e
+                for e in Employee.objects.select_related("user")
+                .annotate(emp_key=Upper("user__emp_id"))
+                .filter(emp_key__in=emp_keys)
+            }
+        departments = {}
+        if dept_keys:
+            departments = {
+                d.code_key: d
+                for d in Department.objects.annotate(code_key=Upper("code")).filter(code_key__in=dept_keys, is_active=True)
+            }
+        return cls(employees, departments)
+
+    @classmethod
+    def preload_all(cls):
+        employees = {
+            e.user.emp_id.upper(): e
+            for e in Employee.objects.select_related("user").only(
+                "id", "department_id", "manager_id",
+                "user__id", "user__emp_id", "user__first_name", "user__last_name",
+            )
+        }
+        departments = {d.code.upper(): d for d in Department.objects.filter(is_active=True)}
+        return cls(employees, departments)
+
+
+def build_feedback(attrs, lookups, user=None, manager_employee=None):
+    """
+    Turn one validated row into an unsaved feedback instance of its source class.
+    `manager_employee` (the submitting manager) limits Manager rows to their team.
+    Returns (instance, None) or (None, errors).
+    """
+    emp = lookups.employees.get(attrs["employee"].upper())
+    if not emp:
+        return None, {"employee": f"Employee with emp_id '{attrs['employee']}' not found."}
+
+    department_id = emp.department_id
+    if attrs.get("department_code"):
+        dept = lookups.departments.get(attrs["department_code"].upper())
+        if not dept:
+            return None, {"department_code": f"Department '{attrs['department_code']}' not found or inactive."}
+        if emp.department_id and dept.id != emp.department_id:
+            return None, {"department_code": "Department does not match the employee’s assigned department."}
+        department_id = dept.id
+
+    source = attrs["source"]
+    if source == "Manager" and manager_employee and emp.manager_id != manager_employee.id:
+        return None, {"employee": "Managers can only submit feedback for their own team members."}
+
+    instance = FEEDBACK_CLASSES[source](
+        employee=emp,
+        department_id=department_id,
+        feedback_text=attrs["feedback_text"],
+        remarks=attrs.get("remarks"),
+        rating=attrs["rating"],
+        visibility=attrs.get("visibility") or "Private",
+        feedback_date=attrs["feedback_date"],
+        created_by=user,
+        source_type=source,
+    )
+    if source == "Manager":
+        instance.manager_name = attrs.get("manager_name") or (
+            f"{user.first_name} {user.last_name}".strip() if user else ""
+        )
+    elif source == "Client":
+        instance.client_name = attrs.get("client_name") or "Anonymous Client"
+    return instance, None
+
+
+# ===========================================================
+# INSERT + SIDE EFFECTS
+# ===========================================================
+def insert_feedback(instances):
+    """
+    bulk_create the instances (one statement batch per feedback class) and
+    refresh their weekly rollup buckets in the same transaction; then add
+    their search documents. Returns the instances.
+    """
+    if not instances:
+        return []
+    by_class = {}
+    for instance in instances:
+        by_class.setdefault(type(instance), []).append(instance)
+
+    with transaction.atomic():
+        for model, rows in by_class.items():
+            model.objects.bulk_create(rows, batch_size=BULK_INSERT_BATCH_SIZE)
+        refresh_feedback_rollups({(type(i), i.employee_id, i.feedback_date) for i in instances})
+        changes = {(i.employee_id, i.feedback_date) for i in instances}
+        transaction.on_commit(lambda: invalidate_report_caches(changes))
+    index_new_feedback(instances)
+    return instances
+
+
+def invalidate_report_caches(changes):
+    """
+    Stale the cached reports the batch feeds into — what reports/signals.py
+    does per save, for every (employee_id, feedback_date) of the batch.
+    """
+    from reports.cache import invalidate_for_feedback
+
+    try:
+        return invalidate_for_feedback(changes)
+    except Exception as e:
+        logger.warning("[BulkFeedback] Report cache invalidation failed: %s", e)
+        return 0
+
+
+class NotificationTally:
+    """
+    Running (employee, feedback type) → count / latest date of inserted
+    feedback. Holds one entry per pair, not the instances, so an import can
+    fold in every chunk and notify once at the end.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.latest = {}
+        self.user_ids = {}
+
+    def add(self, instances):
+        for instance in instances:
+            key = (instance.employee_id, instance.source_type)
+            self.counts[key] += 1
+            self.latest[key] = max(self.latest.get(key, instance.feedback_date), instance.feedback_date)
+            self.user_ids[instance.employee_id] = instance.employee.user_id
+        return self
+
+    def notifications(self):
+        notifications = []
+        for (employee_id, source), count in self.counts.items():
+            if not self.user_ids.get(employee_id):
+                continue
+            latest = self.latest[(employee_id, source)].strftime("%d %b %Y")
+            notifications.append(Notification(
+                employee_id=self.user_ids[employee_id],
+                message=(
+                    f"{count} new {source} feedback received (latest {latest})."
+                    if count > 1 else f"New {source} feedback received on {latest}."
+                ),
+                auto_delete=True,
+            ))
+        return notifications
+
+
+def notify_employees(tally):
+    """One summary notification per (employee, feedback type) of the tally, created in one bulk insert."""
+    notifications = tally.notifications()
+    if not notifications:
+        return 0
+    try:
+        Notification.objects.bulk_create(notifications, batch_size=BULK_INSERT_BATCH_SIZE)
+    except Exception as e:
+        logger.warning("Bulk feedback notification creation failed: %s", e)
+        return 0
+    return len(notifications)
+
+
+# ===========================================================
+# BULK CREATE
+# ===========================================================
+def bulk_create_feedback(rows, user=None, default_source=None, manager_employee=None):
+    """
+    Validate and insert a list of feedback dicts.
+
+    Returns a result dict with created rows (index/id/emp_id/source),
+    per-row errors keyed by input index, and throughput.
+    """
+    started = time.perf_counter()
+    errors = []
+    valid = []  # (index, attrs)
+    # One serializer for the whole batch: building its fields per row dominates otherwise
+    validator = FeedbackRowSerializer(context={"default_source": default_source})
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "errors": {"row": "Each feedback must be an object."}})
+            continue
+        try:
+            valid.append((index, validator.run_validation(row)))
+        except serializers.ValidationError as exc:
+            errors.append({
+                "index": index,
+                "emp_id": row.get("employee") or row.get("employee_emp_id"),
+                "errors": {f: m[0] if isinstance(m, list) else m for f, m in exc.detail.items()},
+            })
+
+    lookups = FeedbackLookups.for_rows([attrs for _, attrs in valid])
+
+    pending = []  # (index, instance)
+    for index, attrs in valid:
+        instance, row_errors = build_feedback(attrs, lookups, user=user, manager_employee=manager_employee)
+        if row_errors:
+            errors.append({"index": index, "emp_id": attrs["employee"], "errors": row_errors})
+        else:
+            pending.append((index, instance))
+
+    insert_feedback([i for _, i in pending])
+    notifications = notify_employees(NotificationTally().add(i for _, i in pending))
+
+    elapsed = time.perf_counter() - started
+    errors.sort(key=lambda e: e["index"])
+    return {
+        "created": len(pending),
+        "failed": len(errors),
+        "notifications": notifications,
+        "results": [
+            {
+                "index": index,
+                "id": instance.pk,
+                "emp_id": instance.employee.user.emp_id,
+                "source": instance.source_type,
+                "feedback_date": instance.feedback_date,
+            }
+            for index, instance in pending
+        ],
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(len(rows) / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,152 @@
+# ===========================================================
+# feedback/feed.py
+# ===========================================================
+# Purpose:
+# One chronological feed over General, Manager and Client
+# feedback of an employee.
+#
+# • feed_page() — a single UNION ALL query, newest first by
+#   (feedback_date, created_at, source, id), paginated with a
+#   keyset cursor: the next page continues strictly after the
+#   last row, so deep pages cost the same as the first and rows
+#   added meanwhile never shift or repeat items
+# • feed_counts() — per-source totals in one grouped aggregate
+#   over the same UNION
+# ===========================================================
+
+from django.db import connection
+from django.db.models import CharField, F, Q, Value
+from datetime import date, datetime
+import base64
+import json
+
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback
+
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+# source → (model, field naming the author, if the source has one)
+FEED_SOURCES = {
+    "General": (GeneralFeedback, None),
+    "Manager": (ManagerFeedback, "manager_name"),
+    "Client": (ClientFeedback, "client_name"),
+}
+
+FEED_FIELDS = [
+    "id",
+    "feedback_date",
+    "created_at",
+    "rating",
+    "feedback_text",
+    "remarks",
+    "visibility",
+    "source",
+    "author_name",
+    "department_name",
+    "submitted_by_first_name",
+    "submitted_by_last_name",
+]
+
+FEED_ORDERING = ["-feedback_date", "-created_at", "-source", "-id"]
+
+
+def employee_feed_querysets(employee, public_client_only=True):
+    """Per-source querysets of the employee's feedback (client feedback: Public only, as in My Feedback)."""
+    querysets = {}
+    for source, (model, _) in FEED_SOURCES.items():
+        qs = model.objects.filter(employee=employee)
+        if public_client_only and model is ClientFeedback:
+            qs = qs.filter(visibility="Public")
+        querysets[source] = qs
+    return querysets
+
+
+# ===========================================================
+# CURSOR
+# ===========================================================
+def encode_cursor(row):
+    """Opaque token for the position right after `row`."""
+    key = [row["feedback_date"].isoformat(), row["created_at"].isoformat(), row["source"], row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor(); raises ValueError for a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        feedback_date, created_at, source, pk = json.loads(raw)
+        return date.fromisoformat(feedback_date), datetime.fromisoformat(created_at), str(source), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor.")
+
+
+def _after(source, cursor):
+    """
+    Keyset condition for one source: rows that sort strictly after the
+    cursor. `source` is constant within a branch, so the source tie-break
+    is resolved here instead of in SQL.
+    """
+    feedback_date, created_at, cursor_source, pk = cursor
+    same_instant = Q(feedback_date=feedback_date, created_at=created_at)
+    condition = Q(feedback_date__lt=feedback_date) | Q(feedback_date=feedback_date, created_at__lt=created_at)
+    if source < cursor_source:
+        condition |= same_instant
+    elif source == cursor_source:
+        condition |= same_instant & Q(id__lt=pk)
+    return condition
+
+
+# ===========================================================
+# QUERIES
+# ===========================================================
+def _branch(source, qs):
+    _, author_field = FEED_SOURCES[source]
+    return qs.order_by().annotate(
+        source=Value(source, output_field=CharField()),
+        author_name=F(author_field) if author_field else Value("", output_field=CharField()),
+        department_name=F("department__name"),
+        submitted_by_first_name=F("created_by__first_name"),
+        submitted_by_last_name=F("created_by__last_name"),
+    ).values(*FEED_FIELDS)
+
+
+def feed_page(querysets, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    One page of the merged feed, newest first.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    branches = []
+    for source, qs in querysets.items():
+        if cursor is not None:
+            qs = qs.filter(_after(source, cursor))
+        branches.append(_branch(source, qs))
+    if not branches:
+        return [], None
+
+    feed = branches[0].union(*branches[1:], all=True).order_by(*FEED_ORDERING)
+    rows = list(feed[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def feed_counts(querysets):
+    """{source: count} for every source (zero included), from one grouped aggregate."""
+    parts, params = [], []
+    for source, qs in querysets.items():
+        sql, part_params = (
+            qs.order_by().annotate(source=Value(source, output_field=CharField())).values("source")
+            .query.sql_with_params()
+        )
+        parts.append(sql)
+        params.extend(part_params)
+
+    counts = dict.fromkeys(querysets, 0)
+    if not parts:
+        return counts
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT source, COUNT(*) FROM ({' UNION ALL '.join(parts)}) feed_sources GROUP BY source",
+            params,
+        )
+        counts.update(dict(cursor.fetchall()))
+    return counts
@@ -0,0 +1,113 @@
+# ===========================================================
+# feedback/importers.py
+# ===========================================================
+# Purpose:
+# Streaming import of feedback spreadsheets (CSV / XLSX), e.g.
+# the quarterly client feedback batches.
+#
+# • Rows are streamed with the performance importer's readers
+#   and processed in fixed-size chunks (flat memory)
+# • emp_id / department code maps are built once per import
+# • Each chunk is inserted with feedback/bulk.py (bulk_create
+#   per feedback class, rollups + search index per chunk)
+# • Notifications are tallied per (employee, feedback type) as
+#   chunks are inserted — instances are dropped after their
+#   chunk — and created with one bulk insert after the last chunk
+# • dry_run validates everything without writing
+# ===========================================================
+
+from rest_framework import serializers
+import time
+import logging
+
+from performance.importers import chunked, iter_rows
+from .bulk import (
+    FeedbackLookups,
+    FeedbackRowSerializer,
+    NotificationTally,
+    build_feedback,
+    insert_feedback,
+    notify_employees,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 100
+
+# Spreadsheet headers that map onto row fields
+HEADER_ALIASES = {
+    "emp_id": "employee",
+    "employee_id": "employee",
+    "department": "department_code",
+    "type": "source",
+    "feedback_type": "source",
+    "date": "feedback_date",
+    "feedback": "feedback_text",
+    "text": "feedback_text",
+    "comments": "feedback_text",
+    "manager": "manager_name",
+    "client": "client_name",
+}
+
+
+class FeedbackImporter:
+    """Streams rows from a CSV/XLSX file and bulk-inserts them chunk by chunk."""
+
+    def __init__(self, chunk_size=1000, dry_run=False, user=None, default_source=None):
+        self.chunk_size = max(1, int(chunk_size))
+        self.dry_run = dry_run
+        self.user = user
+        self.default_source = default_source
+        self.stats = {
+            "rows": 0, "created": 0, "failed": 0, "chunks": 0,
+            "notifications": 0, "dry_run": dry_run, "errors": [],
+        }
+
+    def _error(self, line, emp_id, errors):
+        self.stats["failed"] += 1
+        if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+            self.stats["errors"].append({"row": line, "emp_id": emp_id, "errors": errors})
+
+    def run(self, fileobj, filename):
+        started = time.perf_counter()
+        lookups = FeedbackLookups.preload_all()
+        # One serializer for the whole file: building its fields per row dominates otherwise
+        validator = FeedbackRowSerializer(context={"default_source": self.default_source})
+        tally = NotificationTally()
+        line = 1  # header row
+
+        for chunk in chunked(iter_rows(fileobj, filename, aliases=HEADER_ALIASES), self.chunk_size):
+            instances = []
+            for row in chunk:
+                line += 1
+                self.stats["rows"] += 1
+                try:
+                    attrs = validator.run_validation(row)
+                except serializers.ValidationError as exc:
+                    self._error(line, row.get("employee"), {
+                        f: m[0] if isinstance(m, list) else m for f, m in exc.detail.items()
+                    })
+                    continue
+                instance, errors = build_feedback(attrs, lookups, user=self.user)
+                if errors:
+                    self._error(line, row.get("employee"), errors)
+                    continue
+                instances.append(instance)
+
+            if not self.dry_run:
+                tally.add(insert_feedback(instances))
+            self.stats["created"] += len(instances)
+            self.stats["chunks"] += 1
+
+        if tally.counts:
+            self.stats["notifications"] = notify_employees(tally)
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_seconds"] = round(elapsed, 3)
+        self.stats["rows_per_second"] = round(self.stats["rows"] / elapsed, 1) if elapsed else None
+        logger.info(
+            "[FeedbackImport] %s rows | created=%s failed=%s | %.1f rows/s | dry_run=%s",
+            self.stats["rows"], self.stats["created"], self.stats["failed"],
+            self.stats["rows_per_second"] or 0, self.dry_run,
+        )
+        return self.stats
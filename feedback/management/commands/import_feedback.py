@@ -0,0 +1,65 @@
+# ===========================================================
+# feedback/management/commands/import_feedback.py
+# ===========================================================
+# Usage:
+#   python manage.py import_feedback q3_clients.csv --source Client
+#   python manage.py import_feedback feedback.xlsx --dry-run
+#   python manage.py import_feedback big.csv --chunk-size 2000 --submitted-by EMP0001
+#
+# Rows without a source/type column use --source.
+# ===========================================================
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from feedback.bulk import FEEDBACK_CLASSES
+from feedback.importers import FeedbackImporter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV/XLSX file of feedback and bulk-insert it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .xlsx file.")
+        parser.add_argument("--source", choices=list(FEEDBACK_CLASSES), help="Source for rows without one.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+        parser.add_argument(
+            "--chunk-size", type=int,
+            default=getattr(settings, "FEEDBACK_IMPORT_CHUNK_SIZE", 1000),
+            help="Rows per bulk insert.",
+        )
+        parser.add_argument("--submitted-by", help="emp_id recorded as the feedback's creator.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options.get("submitted_by"):
+            user = User.objects.filter(emp_id__iexact=options["submitted_by"]).first()
+            if not user:
+                raise CommandError(f"User '{options['submitted_by']}' not found.")
+
+        importer = FeedbackImporter(
+            chunk_size=options["chunk_size"], dry_run=options["dry_run"],
+            user=user, default_source=options.get("source"),
+        )
+        path = options["path"]
+        try:
+            with open(path, "rb") as fh:
+                stats = importer.run(fh, path)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in stats["errors"]:
+            self.stderr.write(f"Row {error['row']} ({error['emp_id']}): {error['errors']}")
+        if stats["failed"] > len(stats["errors"]):
+            self.stderr.write(f"... {stats['failed'] - len(stats['errors'])} more error(s) not shown.")
+
+        verb = "Validated" if stats["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['rows']} row(s) in {stats['chunks']} chunk(s): "
+            f"{stats['created']} created, {stats['failed']} failed, "
+            f"{stats['notifications']} notification(s) | "
+            f"{stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)."
+        ))
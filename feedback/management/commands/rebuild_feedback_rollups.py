@@ -0,0 +1,26 @@
+# ===========================================================
+# feedback/management/commands/rebuild_feedback_rollups.py
+# ===========================================================
+# Usage:
+#   python manage.py rebuild_feedback_rollups
+#
+# Recomputes FeedbackWeekRollup from the raw feedback tables —
+# the one-off backfill after deploying the rollup table, or a
+# repair after writes that bypassed BaseFeedback.save.
+# ===========================================================
+
+from django.core.management.base import BaseCommand
+import time
+
+from feedback.rollups import rebuild_feedback_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly feedback rollups from the raw feedback tables."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild_feedback_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows} feedback rollup row(s) in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,33 @@
+# ===========================================================
+# feedback/management/commands/rebuild_feedback_search.py
+# ===========================================================
+# Usage:
+#   python manage.py rebuild_feedback_search
+#   python manage.py rebuild_feedback_search --batch-size 5000
+#
+# Recreates the full-text search documents of all feedback —
+# the backfill after enabling search, or a repair after writes
+# that bypassed the model signals (queryset update/bulk_create).
+# ===========================================================
+
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+from feedback.search import rebuild_search_index, SearchUnavailable
+
+
+class Command(BaseCommand):
+    help = "Rebuild the feedback full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert batch.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            indexed = rebuild_search_index(batch_size=options["batch_size"])
+        except SearchUnavailable as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} feedback document(s) in {time.perf_counter() - started:.2f}s."
+        ))
@@ -1,7 +1,7 @@
 # ===========================================================
 # feedback/models.py
 # ===========================================================
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -112,7 +112,19 @@ class BaseFeedback(models.Model):
             self.source_type = self.__class__.__name__.replace("Feedback", "")
 
         self.full_clean()
-        super().save(*args, **kwargs)
+
+        # Keep the weekly rollup current: the old bucket too when the feedback moves
+        from .rollups import refresh_feedback_rollups
+
+        previous = None
+        if self.pk:
+            previous = type(self).objects.filter(pk=self.pk).values_list("employee_id", "feedback_date").first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            buckets = {(type(self), self.employee_id, self.feedback_date)}
+            if previous:
+                buckets.add((type(self), *previous))
+            refresh_feedback_rollups(buckets)
 
         # Trigger notification (optional)
         try:
@@ -205,3 +217,54 @@ class ClientFeedback(BaseFeedback):
     class Meta:
         verbose_name = "Client Feedback"
         verbose_name_plural = "Client Feedback"
+
+
+# ===========================================================
+# Weekly Feedback Rollup (maintained on write)
+# ===========================================================
+class FeedbackWeekRollup(models.Model):
+    """
+    Rating totals of one employee, one feedback source and one ISO week.
+    Kept current by feedback/rollups.py on every feedback save / delete
+    (queryset .update() / bulk_create callers refresh it themselves);
+    feedback averages for a date window sum these rows instead of
+    scanning the raw feedback tables.
+    """
+
+    SOURCE_CHOICES = [
+        ("General", "General"),
+        ("Manager", "Manager"),
+        ("Client", "Client"),
+    ]
+
+    employee = models.ForeignKey(
+        "employee.Employee",
+        on_delete=models.CASCADE,
+        related_name="feedback_week_rollups",
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    week_start = models.DateField(help_text="Monday of the ISO week.")
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_min = models.PositiveSmallIntegerField(default=0)
+    rating_max = models.PositiveSmallIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-week_start"]
+        verbose_name = "Feedback Week Rollup"
+        verbose_name_plural = "Feedback Week Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "source", "week_start"], name="unique_feedback_week_rollup"),
+        ]
+        indexes = [
+            models.Index(fields=["employee", "week_start"]),
+            models.Index(fields=["week_start"]),
+        ]
+
+    @property
+    def average(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else 0.0
+
+    def __str__(self):
+        return f"{self.source} feedback — employee #{self.employee_id}, week of {self.week_start} ({self.average})"
@@ -0,0 +1,149 @@
+# ===========================================================
+# feedback/rollups.py
+# ===========================================================
+# Purpose:
+# Maintain FeedbackWeekRollup — rating sum / count / min / max
+# per employee, feedback source and ISO week.
+#
+# • refresh_feedback_rollups() recomputes the given buckets from
+#   the raw feedback (one grouped aggregate per source-week, one
+#   upsert) and drops buckets that became empty; BaseFeedback.save
+#   and the post_delete receiver call it for the buckets a write
+#   touched (old and new bucket when a feedback moves)
+# • rebuild_feedback_rollups() recomputes everything (backfill)
+# • ensure_feedback_rollups() runs that rebuild after `migrate`
+#   (post_migrate) when the rollup totals no longer match the
+#   raw tables — the first deploy of the table, or writes that
+#   bypassed the maintenance
+#
+# Only BaseFeedback.save and deletes maintain the rollup.
+# Queryset .update() and bulk_create() skip it: callers must
+# pass the buckets they touched to refresh_feedback_rollups()
+# (as feedback/bulk.py does) or run `rebuild_feedback_rollups`.
+# ===========================================================
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncWeek
+from datetime import date, timedelta
+import logging
+
+from performance.ranking import upsert_options
+from .models import FeedbackWeekRollup, GeneralFeedback, ManagerFeedback, ClientFeedback
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_SOURCES = {
+    GeneralFeedback: "General",
+    ManagerFeedback: "Manager",
+    ClientFeedback: "Client",
+}
+
+ROLLUP_FIELDS = ["rating_sum", "rating_count", "rating_min", "rating_max", "refreshed_at"]
+
+
+def week_start(day):
+    """Monday of the ISO week containing `day` (a date or ISO string)."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day - timedelta(days=day.weekday())
+
+
+def source_of(model):
+    """Rollup source key of a feedback model (proxies/subclasses resolve to their concrete model)."""
+    return FEEDBACK_SOURCES[model._meta.concrete_model]
+
+
+def refresh_feedback_rollups(buckets):
+    """
+    Recompute rollup rows for (feedback_model, employee_id, day) buckets;
+    `day` is any date of the week. Returns the number of rows written.
+    """
+    grouped = {}
+    for model, employee_id, day in buckets:
+        if employee_id and day:
+            grouped.setdefault((source_of(model), week_start(day)), set()).add(employee_id)
+
+    models_by_source = {source: model for model, source in FEEDBACK_SOURCES.items()}
+    written = 0
+    for (source, monday), employee_ids in sorted(grouped.items()):
+        totals = {
+            row["employee_id"]: row
+            for row in models_by_source[source].objects.filter(
+                employee_id__in=employee_ids,
+                feedback_date__gte=monday,
+                feedback_date__lte=monday + timedelta(days=6),
+            ).values("employee_id").annotate(
+                total=Sum("rating"), count=Count("id"), low=Min("rating"), high=Max("rating"),
+            ).order_by()
+        }
+        rows = [
+            FeedbackWeekRollup(
+                employee_id=employee_id,
+                source=source,
+                week_start=monday,
+                rating_sum=row["total"] or 0,
+                rating_count=row["count"],
+                rating_min=row["low"] or 0,
+                rating_max=row["high"] or 0,
+            )
+            for employee_id, row in totals.items()
+        ]
+        with transaction.atomic():
+            if rows:
+                FeedbackWeekRollup.objects.bulk_create(
+                    rows, **upsert_options(["employee", "source", "week_start"], ROLLUP_FIELDS)
+                )
+            emptied = employee_ids - set(totals)
+            if emptied:
+                FeedbackWeekRollup.objects.filter(
+                    employee_id__in=emptied, source=source, week_start=monday
+                ).delete()
+        written += len(rows)
+    return written
+
+
+def rebuild_feedback_rollups():
+    """Recompute every rollup row from the raw feedback tables. Returns the number of rows."""
+    rows = []
+    for model, source in FEEDBACK_SOURCES.items():
+        for row in (
+            model.objects.annotate(week=TruncWeek("feedback_date"))
+            .values("employee_id", "week")
+            .annotate(total=Sum("rating"), count=Count("id"), low=Min("rating"), high=Max("rating"))
+            .order_by()
+        ):
+            week = row["week"]
+            rows.append(FeedbackWeekRollup(
+                employee_id=row["employee_id"],
+                source=source,
+                week_start=week.date() if hasattr(week, "date") else week,
+                rating_sum=row["total"] or 0,
+                rating_count=row["count"],
+                rating_min=row["low"] or 0,
+                rating_max=row["high"] or 0,
+            ))
+
+    with transaction.atomic():
+        FeedbackWeekRollup.objects.all().delete()
+        FeedbackWeekRollup.objects.bulk_create(rows, batch_size=1000)
+    logger.info("[FeedbackRollup] Rebuilt %s rollup row(s).", len(rows))
+    return len(rows)
+
+
+def rollups_in_sync():
+    """True when the rollup rows add up to the raw feedback tables (count and rating sum)."""
+    raw_count = raw_sum = 0
+    for model in FEEDBACK_SOURCES:
+        totals = model.objects.aggregate(count=Count("id"), total=Sum("rating"))
+        raw_count += totals["count"]
+        raw_sum += totals["total"] or 0
+    rolled = FeedbackWeekRollup.objects.aggregate(count=Sum("rating_count"), total=Sum("rating_sum"))
+    return (rolled["count"] or 0, rolled["total"] or 0) == (raw_count, raw_sum)
+
+
+def ensure_feedback_rollups():
+    """Rebuild the rollups if they drifted from the raw tables. Returns the rows rebuilt (0 when in sync)."""
+    if rollups_in_sync():
+        return 0
+    return rebuild_feedback_rollups()
@@ -0,0 +1,371 @@
+# ===========================================================
+# feedback/search.py
+# ===========================================================
+# Purpose:
+# Full-text search over feedback text, remarks and names, with
+# ranked hits and highlighted snippets.
+#
+# One shadow table, `feedback_search`, holds a document per
+# feedback (source, feedback_id, employee_id, feedback_text,
+# remarks, names) in the database's native full-text index:
+# • SQLite     — FTS5 virtual table, bm25 rank, snippet()
+# • PostgreSQL — weighted tsvector (names > text > remarks) with a
+#                GIN index, ts_rank_cd, ts_headline
+# • MySQL      — InnoDB FULLTEXT index, MATCH … AGAINST (snippets
+#                are cut in Python)
+# Other backends raise SearchUnavailable and the viewsets fall
+# back to DRF's icontains SearchFilter.
+#
+# feedback/signals.py keeps the table in sync on save / delete;
+# `manage.py rebuild_feedback_search` rebuilds it from scratch.
+# Snippets are HTML-escaped with matches wrapped in <mark>.
+# ===========================================================
+
+from collections import namedtuple
+from django.conf import settings
+from django.db import connection, transaction, DatabaseError
+from django.db.models import Case, CharField, IntegerField, Value, When
+from rest_framework import filters
+import html
+import logging
+import re
+
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback
+from .rollups import source_of
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "feedback_search"
+SEARCH_MODELS = (GeneralFeedback, ManagerFeedback, ClientFeedback)
+AUTHOR_FIELDS = {ManagerFeedback: "manager_name", ClientFeedback: "client_name"}
+
+# Private-use characters mark matches in native snippets, so the text can be
+# HTML-escaped before the markers become <mark> tags
+_START, _STOP = "\ue000", "\ue001"
+SNIPPET_WORDS = 24
+
+SearchHit = namedtuple("SearchHit", ["source", "feedback_id", "score", "snippet"])
+
+
+class SearchUnavailable(Exception):
+    """The database has no supported full-text index."""
+
+
+def max_hits():
+    return getattr(settings, "FEEDBACK_SEARCH_MAX_HITS", 500)
+
+
+def search_terms(text):
+    return re.findall(r"\w+", text or "")
+
+
+# ===========================================================
+# SCHEMA
+# ===========================================================
+_SCHEMA = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "source UNINDEXED, feedback_id UNINDEXED, employee_id UNINDEXED, "
+        "feedback_text, remarks, names, tokenize = 'porter unicode61')",
+    ],
+    "postgresql": [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "source varchar(20) NOT NULL, feedback_id bigint NOT NULL, employee_id bigint NOT NULL, "
+        "feedback_text text NOT NULL DEFAULT '', remarks text NOT NULL DEFAULT '', names text NOT NULL DEFAULT '', "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', names), 'A') || "
+        "setweight(to_tsvector('english', feedback_text), 'B') || "
+        "setweight(to_tsvector('english', remarks), 'C')) STORED, "
+        "PRIMARY KEY (source, feedback_id))",
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+    ],
+    "mysql": [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "source varchar(20) NOT NULL, feedback_id bigint NOT NULL, employee_id bigint NOT NULL, "
+        "feedback_text longtext NOT NULL, remarks longtext NOT NULL, names text NOT NULL, "
+        "PRIMARY KEY (source, feedback_id), "
+        f"FULLTEXT KEY {SEARCH_TABLE}_text (feedback_text, remarks, names)"
+        ") ENGINE=InnoDB",
+    ],
+}
+
+_ensured = set()
+
+
+def search_supported():
+    return connection.vendor in _SCHEMA
+
+
+def create_search_schema(db_connection):
+    """Create the search table on a connection (no-op if it exists or the backend has no index)."""
+    if db_connection.vendor not in _SCHEMA:
+        return False
+    with db_connection.cursor() as cursor:
+        for statement in _SCHEMA[db_connection.vendor]:
+            cursor.execute(statement)
+    _ensured.add(db_connection.alias)
+    return True
+
+
+def ensure_search_index():
+    """Create the search table for the current database if it does not exist yet."""
+    if not search_supported():
+        raise SearchUnavailable(f"Full-text search is not supported on {connection.vendor}.")
+    if connection.alias not in _ensured:
+        create_search_schema(connection)
+
+
+# ===========================================================
+# INDEXING
+# ===========================================================
+def _document(feedback):
+    """(source, feedback_id, employee_id, feedback_text, remarks, names) for one feedback."""
+    names = []
+    user = getattr(feedback.employee, "user", None)
+    if user:
+        names += [user.first_name, user.last_name, user.emp_id]
+    author_field = AUTHOR_FIELDS.get(type(feedback)._meta.concrete_model)
+    if author_field:
+        names.append(getattr(feedback, author_field))
+    return (
+        source_of(type(feedback)),
+        feedback.pk,
+        feedback.employee_id,
+        feedback.feedback_text or "",
+        feedback.remarks or "",
+        " ".join(n for n in names if n),
+    )
+
+
+def _insert(cursor, documents):
+    cursor.executemany(
+        f"INSERT INTO {SEARCH_TABLE} (source, feedback_id, employee_id, feedback_text, remarks, names) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        documents,
+    )
+
+
+def index_feedback(feedback):
+    """Insert or replace one feedback's search document."""
+    document = _document(feedback)
+    ensure_search_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE source = %s AND feedback_id = %s", document[:2])
+        _insert(cursor, [document])
+
+
+def unindex_feedback(model, feedback_id):
+    ensure_search_index()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE source = %s AND feedback_id = %s", [source_of(model), feedback_id]
+        )
+
+
+def sync_feedback(model, feedback=None, feedback_id=None):
+    """
+    Signal entry point: (re)index a saved feedback or drop a deleted one.
+    Failures are logged, not raised — a stale search row never blocks a
+    feedback write (rebuild_feedback_search repairs the index).
+    """
+    if not search_supported():
+        return
+    try:
+        with transaction.atomic():
+            if feedback is not None:
+                index_feedback(feedback)
+            else:
+                unindex_feedback(model, feedback_id)
+    except DatabaseError as e:
+        logger.warning(f"[FeedbackSearch] Index sync failed for {model.__name__} #{feedback_id or feedback.pk}: {e}")
+
+
+def index_new_feedback(instances):
+    """
+    Add search documents for freshly bulk-inserted feedback (bulk_create skips
+    the post_save sync). Rows without a pk (backends that cannot return ids
+    from bulk inserts) are left for rebuild_feedback_search.
+    """
+    documents = [_document(i) for i in instances if i.pk is not None]
+    if len(documents) < len(instances):
+        logger.warning(
+            f"[FeedbackSearch] {len(instances) - len(documents)} bulk-inserted feedback row(s) have no id; "
+            "run rebuild_feedback_search to index them."
+        )
+    if not documents or not search_supported():
+        return 0
+    try:
+        with transaction.atomic():
+            ensure_search_index()
+            with connection.cursor() as cursor:
+                _insert(cursor, documents)
+    except DatabaseError as e:
+        logger.warning(f"[FeedbackSearch] Bulk index failed for {len(documents)} document(s): {e}")
+        return 0
+    return len(documents)
+
+
+def rebuild_search_index(batch_size=1000):
+    """Re-create every search document from the feedback tables. Returns the number indexed."""
+    ensure_search_index()
+    indexed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        for model in SEARCH_MODELS:
+            batch = []
+            for feedback in model.objects.select_related("employee__user").order_by("pk").iterator(chunk_size=batch_size):
+                batch.append(_document(feedback))
+                if len(batch) >= batch_size:
+                    _insert(cursor, batch)
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                _insert(cursor, batch)
+                indexed += len(batch)
+        if connection.vendor == "sqlite":
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    logger.info(f"[FeedbackSearch] Rebuilt index with {indexed} document(s).")
+    return indexed
+
+
+# ===========================================================
+# QUERYING
+# ===========================================================
+def _finish_snippet(snippet):
+    return html.escape(snippet or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _python_snippet(text, terms):
+    """Window of SNIPPET_WORDS words around the first match, matches highlighted (MySQL)."""
+    words = (text or "").split()
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*", re.IGNORECASE)
+    first = next((i for i, word in enumerate(words) if pattern.search(word)), 0)
+    start = max(0, first - SNIPPET_WORDS // 3)
+    window = " ".join(words[start:start + SNIPPET_WORDS])
+    marked = pattern.sub(lambda m: f"{_START}{m.group(0)}{_STOP}", window)
+    prefix = "… " if start else ""
+    suffix = " …" if start + SNIPPET_WORDS < len(words) else ""
+    return _finish_snippet(f"{prefix}{marked}{suffix}")
+
+
+def _source_filter(sources):
+    if not sources:
+        return "", []
+    return f" AND source IN ({', '.join(['%s'] * len(sources))})", list(sources)
+
+
+def _scope_filter(within):
+    """Restrict hits to the rows of a (permission-scoped) feedback queryset, inside the index query."""
+    if within is None or not within.query.where:
+        return "", []
+    sql, params = within.order_by().values("pk").query.sql_with_params()
+    return f" AND feedback_id IN ({sql})", list(params)
+
+
+def search_feedback(text, sources=None, limit=None, within=None):
+    """
+    Ranked hits for a free-text query, best first (higher score = better).
+    `sources` limits the hits to General / Manager / Client; `within` (a
+    feedback queryset) limits them to its rows before the hit limit applies.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    ensure_search_index()
+    limit = limit or max_hits()
+    source_sql, source_params = _source_filter(sources)
+    scope_sql, scope_params = _scope_filter(within)
+    source_sql += scope_sql
+    source_params += scope_params
+    vendor = connection.vendor
+
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            # Quoted prefix terms: user input can never be parsed as FTS5 syntax
+            match = " ".join(f'"{term}"*' for term in terms)
+            cursor.execute(
+                f"SELECT source, feedback_id, -rank, "
+                f"snippet({SEARCH_TABLE}, -1, %s, %s, '…', %s) "
+                f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s{source_sql} "
+                f"ORDER BY rank LIMIT %s",
+                [_START, _STOP, SNIPPET_WORDS, match, *source_params, limit],
+            )
+            return [SearchHit(s, int(pk), score, _finish_snippet(snippet)) for s, pk, score, snippet in cursor.fetchall()]
+
+        if vendor == "postgresql":
+            options = f"StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2"
+            cursor.execute(
+                f"SELECT source, feedback_id, ts_rank_cd(document, query), "
+                f"ts_headline('english', feedback_text || ' ' || remarks, query, %s) "
+                f"FROM {SEARCH_TABLE}, websearch_to_tsquery('english', %s) query "
+                f"WHERE document @@ query{source_sql} ORDER BY 3 DESC LIMIT %s",
+                [options, " ".join(terms), *source_params, limit],
+            )
+            return [SearchHit(s, int(pk), score, _finish_snippet(snippet)) for s, pk, score, snippet in cursor.fetchall()]
+
+        # mysql
+        match = " ".join(terms)
+        cursor.execute(
+            f"SELECT source, feedback_id, MATCH (feedback_text, remarks, names) AGAINST (%s) AS score, "
+            f"feedback_text, remarks FROM {SEARCH_TABLE} "
+            f"WHERE MATCH (feedback_text, remarks, names) AGAINST (%s){source_sql} ORDER BY score DESC LIMIT %s",
+            [match, match, *source_params, limit],
+        )
+        return [
+            SearchHit(s, int(pk), score, _python_snippet(f"{feedback_text} {remarks}", terms))
+            for s, pk, score, feedback_text, remarks in cursor.fetchall()
+        ]
+
+
+# ===========================================================
+# DRF FILTERS
+# ===========================================================
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the full-text index: matching rows are annotated with
+    search_rank (1 = best) and search_snippet. The hits are taken from the
+    view's (already scoped) queryset, so the hit limit never drops rows the
+    user may see. Falls back to the regular icontains search over
+    `search_fields` when no index is available.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "")
+        if not search_terms(text):
+            return super().filter_queryset(request, queryset, view)
+        try:
+            hits = search_feedback(text, sources=[source_of(queryset.model)], within=queryset)
+        except (SearchUnavailable, DatabaseError) as e:
+            logger.warning(f"[FeedbackSearch] Falling back to LIKE search: {e}")
+            return super().filter_queryset(request, queryset, view)
+
+        if not hits:
+            return queryset.none()
+        return queryset.filter(pk__in=[hit.feedback_id for hit in hits]).annotate(
+            search_rank=Case(
+                *(When(pk=hit.feedback_id, then=Value(position)) for position, hit in enumerate(hits, 1)),
+                output_field=IntegerField(),
+            ),
+            search_snippet=Case(
+                *(When(pk=hit.feedback_id, then=Value(hit.snippet)) for hit in hits),
+                output_field=CharField(),
+            ),
+        )
+
+
+class FeedbackOrderingFilter(filters.OrderingFilter):
+    """
+    Default to relevance order for full-text searches; ?ordering= still wins.
+    ?ordering=search_rank is honoured only when the search annotated it
+    (otherwise the term is dropped like any unknown field).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and "search_rank" in queryset.query.annotations:
+            return ["search_rank"]
+        return super().get_ordering(request, queryset, view)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = set(super().remove_invalid_fields(queryset, fields, view, request))
+        ranked = "search_rank" in queryset.query.annotations
+        return [term for term in fields if term in valid or (ranked and term.lstrip("-") == "search_rank")]
@@ -135,6 +135,10 @@ class BaseFeedbackSerializer(serializers.ModelSerializer):
         )
         rep["department_name"] = getattr(instance.department, "name", "-")
         rep["employee_name"] = self.get_employee_full_name(instance)
+        if hasattr(instance, "search_snippet"):
+            # Full-text ?search= results (feedback.search.FullTextSearchFilter)
+            rep["search_rank"] = instance.search_rank
+            rep["search_snippet"] = instance.search_snippet
         return rep
 
 
@@ -207,3 +211,39 @@ class ClientFeedbackSerializer(BaseFeedbackSerializer):
         if not validated_data.get("client_name"):
             validated_data["client_name"] = "Anonymous Client"
         return super().create(validated_data)
+
+
+# ===========================================================
+# Feedback Feed Item Serializer (Unified Feed)
+# ===========================================================
+class FeedbackFeedItemSerializer(serializers.Serializer):
+    """One row of the merged General / Manager / Client feed (rows are dicts from feed_page)."""
+
+    id = serializers.IntegerField()
+    source = serializers.CharField()
+    feedback_date = serializers.DateField(format="%Y-%m-%d")
+    created_at = serializers.DateTimeField()
+    rating = serializers.IntegerField()
+    rating_display = serializers.SerializerMethodField()
+    feedback_text = serializers.CharField()
+    remarks = serializers.CharField(allow_null=True)
+    visibility = serializers.CharField()
+    author_name = serializers.SerializerMethodField()
+    department_name = serializers.SerializerMethodField()
+    submitted_by = serializers.SerializerMethodField()
+
+    def get_rating_display(self, obj):
+        return f"{obj['rating']}/10"
+
+    def get_author_name(self, obj):
+        """Manager or client name; '-' for general feedback."""
+        if obj["source"] == "Client":
+            return (obj["author_name"] or "Anonymous Client").strip()
+        return obj["author_name"] or "-"
+
+    def get_department_name(self, obj):
+        return obj["department_name"] or "-"
+
+    def get_submitted_by(self, obj):
+        name = f"{obj['submitted_by_first_name'] or ''} {obj['submitted_by_last_name'] or ''}".strip()
+        return name or "-"
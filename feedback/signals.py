@@ -2,9 +2,10 @@
 # feedback/signals.py
 # ===========================================================
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 from django.apps import apps
+from django.db.utils import OperationalError, ProgrammingError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -65,3 +66,72 @@ def feedback_created_handler(sender, instance, created, **kwargs):
                 )
         except Exception as e:
             logger.warning(f"Notification dispatch failed: {e}")
+
+
+# ===========================================================
+# Signal Receiver — Weekly Rollup on Delete
+# ===========================================================
+@receiver(post_delete)
+def feedback_deleted_handler(sender, instance, **kwargs):
+    """
+    Recompute the weekly rollup bucket of a deleted feedback and drop its
+    search document (instance and queryset deletes).
+    """
+    if sender not in get_feedback_models():
+        return
+
+    from .rollups import refresh_feedback_rollups
+    from .search import sync_feedback
+
+    refresh_feedback_rollups([(sender, instance.employee_id, instance.feedback_date)])
+    sync_feedback(sender, feedback_id=instance.pk)
+
+
+# ===========================================================
+# Signal Receivers — Full-Text Search Index
+# ===========================================================
+@receiver(post_save)
+def feedback_search_handler(sender, instance, raw=False, **kwargs):
+    """(Re)index the saved feedback's text, remarks and names."""
+    if raw or sender not in get_feedback_models():
+        return
+
+    from .search import sync_feedback
+
+    sync_feedback(sender, feedback=instance)
+
+
+@receiver(post_migrate)
+def feedback_search_schema_handler(sender, using="default", **kwargs):
+    """Create the full-text search table once the feedback tables exist."""
+    if getattr(sender, "name", "") != "feedback":
+        return
+
+    from django.db import connections
+    from .search import create_search_schema
+
+    if create_search_schema(connections[using]):
+        logger.info(f"[FeedbackSearch] Search table ready on '{using}'.")
+
+
+# ===========================================================
+# Signal Receiver — Weekly Rollup Backfill
+# ===========================================================
+@receiver(post_migrate)
+def feedback_rollup_backfill_handler(sender, using="default", **kwargs):
+    """
+    Backfill FeedbackWeekRollup after `migrate` when it does not add up to
+    the raw feedback (feedback averages read the rollup by default).
+    """
+    if getattr(sender, "name", "") != "feedback":
+        return
+
+    from .rollups import ensure_feedback_rollups
+
+    try:
+        rows = ensure_feedback_rollups()
+    except (OperationalError, ProgrammingError) as db_err:
+        logger.warning(f"[FeedbackRollup] Backfill skipped: {db_err}")
+        return
+    if rows:
+        logger.info(f"[FeedbackRollup] Backfilled {rows} rollup row(s) on '{using}'.")
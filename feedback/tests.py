@@ -1,3 +1,272 @@
-from django.test import TestCase
+from django.apps import apps
+from django.test import TestCase, override_settings
+from datetime import date, timedelta
+from rest_framework.test import APIClient
+import io
+import random
 
-# Create your tests here.
+from users.models import User
+from employee.models import Employee, Department
+from notifications.models import Notification
+from performance.models import PerformanceEvaluation
+from reports.cache import fresh_report, store_report
+from .aggregates import feedback_averages
+from .importers import FeedbackImporter
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback, FeedbackWeekRollup
+from .rollups import rebuild_feedback_rollups, rollups_in_sync
+from .search import search_feedback
+from .signals import feedback_rollup_backfill_handler
+
+
+class FeedbackTestData(TestCase):
+    """A department, an admin and a few employees with feedback spread over several weeks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code="ENG01", name="Engineering")
+        cls.admin = User.objects.create(
+            emp_id="EMP0000", username="admin", email="admin@example.com", role="Admin",
+            first_name="Ada", last_name="Admin",
+        )
+        cls.employees = []
+        for i in range(1, 4):
+            user = User.objects.create(
+                emp_id=f"EMP{i:04d}", username=f"emp{i}", email=f"emp{i}@example.com", role="Employee",
+                first_name=f"Emp{i}", last_name="Test", department=cls.department,
+            )
+            cls.employees.append(
+                Employee.objects.create(user=user, department=cls.department, joining_date=date(2024, 1, 1))
+            )
+
+    @classmethod
+    def create_feedback(cls, count=60, start=date(2025, 9, 1), days=70, seed=7):
+        rng = random.Random(seed)
+        models = [GeneralFeedback, ManagerFeedback, ClientFeedback]
+        for _ in range(count):
+            model = rng.choice(models)
+            extra = {"manager_name": "Mia Manager"} if model is ManagerFeedback else {}
+            if model is ClientFeedback:
+                extra = {"client_name": "Acme", "visibility": "Public"}
+            model.objects.create(
+                employee=rng.choice(cls.employees),
+                feedback_text="Solid delivery this sprint",
+                rating=rng.randint(1, 10),
+                feedback_date=start + timedelta(days=rng.randrange(days)),
+                created_by=cls.admin,
+                **extra,
+            )
+
+
+class FeedbackRollupParityTests(FeedbackTestData):
+    """Averages served from FeedbackWeekRollup equal the raw-table averages for any window."""
+
+    WINDOWS = [
+        (None, None),
+        ("2025-09-01", "2025-11-09"),   # whole weeks only
+        ("2025-09-03", "2025-10-16"),   # partial weeks at both edges
+        ("2025-09-10", "2025-09-12"),   # inside a single week
+        (None, "2025-10-01"),
+        ("2025-10-01", None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_feedback()
+        cls.ids = [e.id for e in cls.employees]
+
+    def assert_parity(self):
+        for start, end in self.WINDOWS:
+            with override_settings(FEEDBACK_USE_ROLLUPS=False):
+                raw = feedback_averages(self.ids, start, end)
+            with override_settings(FEEDBACK_USE_ROLLUPS=True):
+                rolled = feedback_averages(self.ids, start, end)
+            self.assertEqual(raw, rolled, f"window {start}..{end}")
+
+    def test_rollup_matches_raw_average(self):
+        self.assertTrue(FeedbackWeekRollup.objects.exists())
+        self.assert_parity()
+
+    def test_parity_after_edit_move_and_delete(self):
+        feedback = GeneralFeedback.objects.order_by("pk").first()
+        feedback.rating = 10
+        feedback.feedback_date = date(2025, 11, 5)  # moves it to another week
+        feedback.save()
+        ManagerFeedback.objects.order_by("pk").first().delete()
+        self.assert_parity()
+
+    def test_rebuild_reproduces_maintained_rollups(self):
+        maintained = set(FeedbackWeekRollup.objects.values_list(
+            "employee_id", "source", "week_start", "rating_sum", "rating_count", "rating_min", "rating_max"
+        ))
+        FeedbackWeekRollup.objects.all().delete()
+        rebuild_feedback_rollups()
+        rebuilt = set(FeedbackWeekRollup.objects.values_list(
+            "employee_id", "source", "week_start", "rating_sum", "rating_count", "rating_min", "rating_max"
+        ))
+        self.assertEqual(maintained, rebuilt)
+
+    def test_migrate_backfills_rollups_that_drifted(self):
+        # Writes that bypass save() — what an existing database looks like before the backfill
+        GeneralFeedback.objects.filter(pk=GeneralFeedback.objects.order_by("pk").first().pk).update(rating=1)
+        FeedbackWeekRollup.objects.filter(source="Client").delete()
+        self.assertFalse(rollups_in_sync())
+
+        feedback_rollup_backfill_handler(sender=apps.get_app_config("feedback"))
+        self.assertTrue(rollups_in_sync())
+        self.assert_parity()
+
+
+class FeedbackFeedPagingTests(FeedbackTestData):
+    """Keyset paging of the merged feed: newest first, no gaps, no repeats, stable under inserts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_feedback(count=45, days=10)  # few dates, so many rows share a feedback_date
+        cls.employee = cls.employees[0]
+        cls.private = ClientFeedback.objects.create(
+            employee=cls.employee, feedback_text="Internal note", rating=3, client_name="Acme",
+            visibility="Private", created_by=cls.admin,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee.user)
+
+    def expected_feed(self):
+        rows = []
+        for source, model in (("General", GeneralFeedback), ("Manager", ManagerFeedback), ("Client", ClientFeedback)):
+            qs = model.objects.filter(employee=self.employee)
+            if model is ClientFeedback:
+                qs = qs.filter(visibility="Public")
+            rows += [(f.feedback_date, f.created_at, source, f.id) for f in qs]
+        return [(source, pk) for *_, source, pk in sorted(rows, reverse=True)]
+
+    def walk(self, page_size, on_page=None):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"page_size": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/feedback/feed/", params)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body["records"]), page_size)
+            seen += [(r["source"], r["id"]) for r in body["records"]]
+            pages += 1
+            if on_page:
+                on_page(pages)
+            cursor = body["pagination"]["next_cursor"]
+            if not cursor:
+                return seen, pages
+
+    def test_pages_cover_the_feed_in_order(self):
+        expected = self.expected_feed()
+        self.assertGreater(len(expected), 8)
+        seen, pages = self.walk(page_size=4)
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, -(-len(expected) // 4))
+        self.assertNotIn(("Client", self.private.id), seen)
+
+    def test_new_feedback_does_not_shift_later_pages(self):
+        expected = self.expected_feed()
+
+        def add_newer(page):
+            if page == 1:
+                GeneralFeedback.objects.create(
+                    employee=self.employee, feedback_text="Late entry", rating=9,
+                    feedback_date=date(2030, 1, 1), created_by=self.admin,
+                )
+
+        seen, _ = self.walk(page_size=5, on_page=add_newer)
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/feedback/feed/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkFeedbackSideEffectTests(FeedbackTestData):
+    """bulk_create skips save() and signals: the bulk paths must refresh rollups, search, caches and notify."""
+
+    WEEK_DAY = date(2025, 10, 8)  # ISO week 41 of 2025
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Weekly reports show overall feedback averages: every week EMP0001 was evaluated in goes stale
+        for review_date in (date(2025, 7, 23), cls.WEEK_DAY):
+            PerformanceEvaluation.objects.create(
+                employee=cls.employees[0], evaluator=cls.admin, review_date=review_date, communication_skills=80,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        year = self.WEEK_DAY.year
+        self.periods = [
+            ("weekly", {"week_number": 41}),
+            ("weekly", {"week_number": 30}),
+            ("department", {"week_number": 41, "department": self.department}),
+            ("monthly", {"month": self.WEEK_DAY.month}),
+        ]
+        self.untouched = [("weekly", {"week_number": 20}), ("monthly", {"month": 7})]
+        for report_type, period in self.periods + self.untouched:
+            store_report(report_type, year, {"cached": True}, **period)
+            self.assertIsNotNone(fresh_report(report_type, year, **period))
+
+    def assert_side_effects(self, emp_ids, text):
+        year = self.WEEK_DAY.year
+        for report_type, period in self.periods:
+            self.assertIsNone(fresh_report(report_type, year, **period), (report_type, period))
+        for report_type, period in self.untouched:
+            self.assertIsNotNone(fresh_report(report_type, year, **period), (report_type, period))
+
+        with override_settings(FEEDBACK_USE_ROLLUPS=False):
+            raw = feedback_averages(self.ids, None, None)
+        with override_settings(FEEDBACK_USE_ROLLUPS=True):
+            rolled = feedback_averages(self.ids, None, None)
+        self.assertEqual(raw, rolled)
+
+        hits = search_feedback(text)
+        self.assertEqual(
+            {(h.source, h.feedback_id) for h in hits},
+            {("Client", pk) for pk in ClientFeedback.objects.filter(feedback_text__icontains=text).values_list("pk", flat=True)}
+            | {("General", pk) for pk in GeneralFeedback.objects.filter(feedback_text__icontains=text).values_list("pk", flat=True)},
+        )
+        for emp_id in emp_ids:
+            self.assertTrue(Notification.objects.filter(employee__emp_id=emp_id).exists(), emp_id)
+
+    @property
+    def ids(self):
+        return [e.id for e in self.employees]
+
+    def test_bulk_endpoint(self):
+        rows = [
+            {"employee": "EMP0001", "source": "General", "feedback_text": "Quarterly zephyr review", "rating": 8,
+             "feedback_date": self.WEEK_DAY.isoformat()},
+            {"employee": "emp0002", "source": "Client", "feedback_text": "Zephyr rollout went well", "rating": 6,
+             "client_name": "Acme", "feedback_date": self.WEEK_DAY.isoformat()},
+            {"employee": "EMP9999", "source": "General", "feedback_text": "Unknown employee", "rating": 5},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/feedback/bulk/", rows, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 1))
+        self.assertEqual(response.data["errors"][0]["index"], 2)
+        self.assertEqual(FeedbackWeekRollup.objects.filter(week_start=date(2025, 10, 6)).count(), 2)
+        self.assert_side_effects(["EMP0001", "EMP0002"], "zephyr")
+
+    def test_importer_across_chunks(self):
+        lines = ["emp_id,type,date,feedback,rating,client"]
+        for i in range(7):
+            lines.append(f"EMP000{i % 3 + 1},{'Client' if i % 2 else 'General'},{self.WEEK_DAY},Zephyr batch {i},{i + 3},Acme")
+        lines.append("EMP0001,General,2025-13-01,Bad date,5,")
+        upload = io.BytesIO("\n".join(lines).encode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = FeedbackImporter(chunk_size=3, user=self.admin).run(upload, "feedback.csv")
+        self.assertEqual((stats["rows"], stats["created"], stats["failed"], stats["chunks"]), (8, 7, 1, 3))
+        self.assertEqual(stats["notifications"], 6)  # one per (employee, feedback type)
+        self.assert_side_effects(["EMP0001", "EMP0002", "EMP0003"], "zephyr")
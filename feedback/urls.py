@@ -9,6 +9,9 @@ from .views import (
     ManagerFeedbackViewSet,
     ClientFeedbackViewSet,
     MyFeedbackView,
+    MyFeedbackFeedView,
+    BulkFeedbackView,
+    FeedbackAnalyticsView,
 )
 
 app_name = "feedback"
@@ -20,6 +23,9 @@ Feedback Module API Routes
 🔹 /api/feedback/manager-feedback/   → Manager feedback CRUD
 🔹 /api/feedback/client-feedback/    → Client feedback CRUD
 🔹 /api/feedback/my-feedback/        → Employee self feedback dashboard
+🔹 /api/feedback/feed/               → Employee feedback feed (all sources, cursor-paginated)
+🔹 /api/feedback/bulk/               → Batch feedback submission (Admin/Manager)
+🔹 /api/feedback/analytics/          → Rolling-window averages + rating histograms (Admin/Manager)
 """
 
 # -----------------------------------------------------------
@@ -36,4 +42,7 @@ router.register(r"client-feedback", ClientFeedbackViewSet, basename="client-feed
 urlpatterns = [
     path("", include(router.urls)),
     path("my-feedback/", MyFeedbackView.as_view(), name="my-feedback"),
+    path("feed/", MyFeedbackFeedView.as_view(), name="feedback-feed"),
+    path("bulk/", BulkFeedbackView.as_view(), name="feedback-bulk"),
+    path("analytics/", FeedbackAnalyticsView.as_view(), name="feedback-analytics"),
 ]
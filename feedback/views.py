@@ -2,22 +2,37 @@
 # feedback/views.py
 # ===========================================================
 
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from datetime import date
 import logging
 
 from notifications.models import Notification
 from employee.models import Employee, Department
-from .models import GeneralFeedback, ManagerFeedback, ClientFeedback
+from .models import GeneralFeedback, ManagerFeedback, ClientFeedback, RATING_MIN, RATING_MAX
 from .serializers import (
     GeneralFeedbackSerializer,
     ManagerFeedbackSerializer,
     ClientFeedbackSerializer,
+    FeedbackFeedItemSerializer,
+)
+from .feed import (
+    employee_feed_querysets,
+    decode_cursor,
+    feed_counts,
+    feed_page,
+    FEED_MAX_PAGE_SIZE,
+    FEED_PAGE_SIZE,
 )
 from .permissions import IsAdminOrManager
+from .search import FeedbackOrderingFilter, FullTextSearchFilter
+from .bulk import bulk_create_feedback, FEEDBACK_CLASSES
+from .analytics import parse_windows, rolling_feedback_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +70,7 @@ class GeneralFeedbackViewSet(viewsets.ModelViewSet):
     queryset = GeneralFeedback.objects.select_related("employee__user", "department", "created_by").all()
     serializer_class = GeneralFeedbackSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, FeedbackOrderingFilter]
     search_fields = ["employee__user__first_name", "employee__user__last_name", "feedback_text"]
     ordering_fields = ["created_at", "rating"]
     ordering = ["-created_at"]
@@ -90,7 +105,7 @@ class ManagerFeedbackViewSet(viewsets.ModelViewSet):
     queryset = ManagerFeedback.objects.select_related("employee__user", "department", "created_by").all()
     serializer_class = ManagerFeedbackSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, FeedbackOrderingFilter]
     search_fields = ["employee__user__first_name", "employee__user__last_name", "feedback_text"]
     ordering_fields = ["created_at", "rating"]
     ordering = ["-created_at"]
@@ -143,7 +158,7 @@ class ClientFeedbackViewSet(viewsets.ModelViewSet):
     queryset = ClientFeedback.objects.select_related("employee__user", "department", "created_by").all()
     serializer_class = ClientFeedbackSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, FeedbackOrderingFilter]
     search_fields = ["client_name", "employee__user__first_name", "feedback_text"]
     ordering_fields = ["created_at", "rating"]
     ordering = ["-created_at"]
@@ -190,8 +205,21 @@ class ClientFeedbackViewSet(viewsets.ModelViewSet):
 # ===========================================================
 # My Feedback (Employee Dashboard)
 # ===========================================================
+def feed_summary(user, counts):
+    return {
+        "employee": f"{user.first_name} {user.last_name}".strip(),
+        "total_general": counts["General"],
+        "total_manager": counts["Manager"],
+        "total_client": counts["Client"],
+        "overall_count": sum(counts.values()),
+    }
+
+
 class MyFeedbackView(APIView):
-    """Displays all feedback for the logged-in employee (Dashboard view)."""
+    """
+    Displays all feedback for the logged-in employee (Dashboard view).
+    Unpaginated; /api/feedback/feed/ serves the same feedback page by page.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -206,18 +234,16 @@ class MyFeedbackView(APIView):
         manager_qs = ManagerFeedback.objects.filter(employee__user=user)
         client_qs = ClientFeedback.objects.filter(employee__user=user, visibility="Public")
 
-        summary = {
-            "employee": f"{user.first_name} {user.last_name}".strip(),
-            "total_general": general_qs.count(),
-            "total_manager": manager_qs.count(),
-            "total_client": client_qs.count(),
-            "overall_count": general_qs.count() + manager_qs.count() + client_qs.count(),
-        }
+        counts = feed_counts({"General": general_qs, "Manager": manager_qs, "Client": client_qs})
+        summary = feed_summary(user, counts)
 
+        related = ("employee__user", "department", "created_by")
         data = {
-            "general_feedback": GeneralFeedbackSerializer(general_qs, many=True).data,
-            "manager_feedback": ManagerFeedbackSerializer(manager_qs, many=True).data,
-            "client_feedback": ClientFeedbackSerializer(client_qs, many=True).data,
+            "general_feedback": GeneralFeedbackSerializer(general_qs.select_related(*related), many=True).data,
+            "manager_feedback": ManagerFeedbackSerializer(
+                manager_qs.select_related(*related, "employee__manager__user"), many=True
+            ).data,
+            "client_feedback": ClientFeedbackSerializer(client_qs.select_related(*related), many=True).data,
         }
 
         logger.info(f"Feedback summary fetched for {user.emp_id}")
@@ -227,3 +253,194 @@ class MyFeedbackView(APIView):
              "records": data},
             status=200,
         )
+
+
+# ===========================================================
+# My Feedback Feed (Unified, Cursor-Paginated)
+# ===========================================================
+class MyFeedbackFeedView(APIView):
+    """
+    The logged-in employee's General, Manager and (Public) Client feedback
+    as one feed, newest first.
+
+    Query Params:
+      - ?page_size=20                  (max 100)
+      - ?cursor=<next_cursor>          (from the previous page)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if getattr(user, "role", "") != "Employee":
+            return Response(
+                {"error": "Access denied. Only employees can view their feedback."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        employee = Employee.objects.filter(user=user).first()
+        if not employee:
+            return Response({"error": "Employee profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            page_size = min(max(int(request.query_params.get("page_size", FEED_PAGE_SIZE)), 1), FEED_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "page_size must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        token = request.query_params.get("cursor")
+        try:
+            cursor = decode_cursor(token) if token else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        querysets = employee_feed_querysets(employee)
+        rows, next_cursor = feed_page(querysets, cursor=cursor, page_size=page_size)
+
+        next_link = None
+        if next_cursor:
+            params = request.query_params.copy()
+            params["cursor"] = next_cursor
+            next_link = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+        return Response(
+            {
+                "message": "Feedback feed retrieved successfully.",
+                "summary": feed_summary(user, feed_counts(querysets)),
+                "records": FeedbackFeedItemSerializer(rows, many=True).data,
+                "pagination": {
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "next": next_link,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# ===========================================================
+# Bulk Feedback Submission (Batched Inserts)
+# ===========================================================
+class BulkFeedbackView(APIView):
+    """
+    POST /api/feedback/bulk/
+    Body: [{...feedback...}, ...]  or  {"source": "Client", "feedback": [...]}
+    Each row: employee (emp_id), feedback_text, rating, optional source,
+    department_code, remarks, visibility, feedback_date, manager_name, client_name.
+    Good rows are saved; bad rows are reported per index.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
+
+    def post(self, request):
+        payload = request.data
+        default_source = payload.get("source") if isinstance(payload, dict) else None
+        rows = payload.get("feedback") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"error": "Provide a non-empty list of feedback."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if default_source and default_source not in FEEDBACK_CLASSES:
+            return Response(
+                {"error": f"source must be one of: {', '.join(FEEDBACK_CLASSES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_rows = getattr(settings, "FEEDBACK_BULK_MAX_ROWS", 5000)
+        if len(rows) > max_rows:
+            return Response(
+                {"error": f"A batch may contain at most {max_rows} feedback rows."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Managers may only submit manager feedback for their own team
+        manager_employee = None
+        if not is_admin(request.user):
+            manager_employee = Employee.objects.filter(user=request.user).first()
+
+        try:
+            result = bulk_create_feedback(
+                rows, user=request.user, default_source=default_source, manager_employee=manager_employee
+            )
+        except Exception as exc:
+            logger.exception("Error saving bulk feedback: %s", exc)
+            return Response(
+                {"error": "An unexpected error occurred while saving feedback."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(
+            "[BulkFeedback] %s created, %s failed by %s (%s rows/s)",
+            result["created"], result["failed"], getattr(request.user, "emp_id", request.user),
+            result["rows_per_second"],
+        )
+        return Response(
+            {
+                "message": f"{result['created']} feedback record(s) saved, {result['failed']} failed.",
+                **result,
+            },
+            status=status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+# ===========================================================
+# Feedback Analytics (Rolling Windows)
+# ===========================================================
+class FeedbackAnalyticsView(APIView):
+    """
+    GET /api/feedback/analytics/
+    Rolling-window feedback averages and 1–10 rating histograms per
+    employee and per department.
+
+    Query Params:
+      - ?windows=30,90,365           (days, ending on as_of)
+      - ?as_of=YYYY-MM-DD            (default: today)
+      - ?department=<id>             (employees of one department)
+      - ?employees=EMP0001,EMP0002   (specific employees)
+    Admins see everyone; managers see their own team.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            windows = parse_windows(params.get("windows"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            as_of = date.fromisoformat(params["as_of"]) if params.get("as_of") else timezone.localdate()
+        except ValueError:
+            return Response({"error": "as_of must be a date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        employees = Employee.objects.select_related("user", "department").order_by("user__emp_id")
+        if not is_admin(request.user):
+            employees = employees.filter(manager__user=request.user)
+
+        department = None
+        if params.get("department"):
+            try:
+                department = Department.objects.get(pk=int(params["department"]))
+            except (ValueError, Department.DoesNotExist):
+                return Response({"error": "Department not found."}, status=status.HTTP_404_NOT_FOUND)
+            employees = employees.filter(department=department)
+
+        if params.get("employees"):
+            emp_ids = [e.strip() for e in params["employees"].split(",") if e.strip()]
+            employees = employees.filter(user__emp_id__in=emp_ids)
+
+        employees = list(employees)
+        if not employees:
+            return Response({"message": "No employees in scope."}, status=status.HTTP_200_OK)
+
+        data = rolling_feedback_analytics(employees, as_of, windows, department=department)
+        logger.info(
+            f"[FeedbackAnalytics] {len(employees)} employee(s), windows={list(windows)} "
+            f"by {getattr(request.user, 'emp_id', request.user)}"
+        )
+        return Response(
+            {
+                "as_of": as_of.isoformat(),
+                "windows": list(windows),
+                "rating_scale": [RATING_MIN, RATING_MAX],
+                **data,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,303 @@
+# ===========================================================
+# performance/bulk.py
+# ===========================================================
+# Purpose:
+# Batch submission of performance evaluations.
+#
+# • Rows are validated with the single-evaluation serializer's
+#   fields and checks, without touching the database
+# • Employees / departments / evaluators are resolved with one
+#   query each for the whole batch
+# • Duplicates are detected with one query
+# • Valid rows are inserted with bulk_create, each affected
+#   ranking bucket is re-ranked once, and notifications are
+#   created with one bulk insert
+# • Invalid rows are reported per index without aborting the rest
+# ===========================================================
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
+import logging
+
+from employee.models import Employee, Department
+from notifications.models import Notification
+from .models import METRIC_FIELDS, PerformanceEvaluation
+from .rank_queue import rank_queue
+from .ranking import bucket_for
+from .serializers import PerformanceCreateUpdateSerializer
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+# ===========================================================
+# ROW VALIDATION (no database access)
+# ===========================================================
+class EvaluationRowSerializer(PerformanceCreateUpdateSerializer):
+    """
+    One evaluation row of a batch: the fields and field checks of the
+    single-evaluation serializer. Its per-row lookups are left out —
+    employees, evaluators and departments come from EvaluationLookups
+    (build_evaluation), duplicates from one query per batch.
+    """
+
+    def validate(self, attrs):
+        attrs["employee"] = self.employee_value(attrs)
+        attrs.setdefault("review_date", timezone.localdate())
+        return attrs
+
+
+# ===========================================================
+# BATCHED LOOKUPS
+# ===========================================================
+class EvaluationLookups:
+    """
+    Case-insensitive emp_id / department code maps.
+    Built once per batch (for_rows) or once per import (preload_all).
+    """
+
+    def __init__(self, employees, departments, evaluators):
+        self.employees = employees        # EMP0001 -> Employee (user loaded)
+        self.departments = departments    # ENG01 -> Department
+        self.evaluators = evaluators      # EMP0001 -> User
+
+    @classmethod
+    def for_rows(cls, rows):
+        emp_keys = {r["employee"].upper() for r in rows}
+        dept_keys = {r["department_code"].upper() for r in rows if r.get("department_code")}
+        evaluator_keys = {r["evaluator_emp_id"].upper() for r in rows if r.get("evaluator_emp_id")}
+
+        employees = {}
+        if emp_keys:
+            employees = {
+                e.emp_key: e
+                for e in Employee.objects.select_related("user")
+                .annotate(emp_key=Upper("user__emp_id"))
+                .filter(emp_key__in=emp_keys)
+            }
+        departments = {}
+        if dept_keys:
+            departments = {
+                d.code_key: d
+                for d in Department.objects.annotate(code_key=Upper("code")).filter(code_key__in=dept_keys, is_active=True)
+            }
+        evaluators = {}
+        if evaluator_keys:
+            evaluators = {
+                u.emp_key: u
+                for u in User.objects.annotate(emp_key=Upper("emp_id")).filter(emp_key__in=evaluator_keys)
+            }
+        return cls(employees, departments, evaluators)
+
+    @classmethod
+    def preload_all(cls):
+        employees = {
+            e.user.emp_id.upper(): e
+            for e in Employee.objects.select_related("user").only(
+                "id", "department_id", "user__id", "user__emp_id", "user__first_name", "user__last_name"
+            )
+        }
+        departments = {d.code.upper(): d for d in Department.objects.filter(is_active=True)}
+        evaluators = {u.emp_id.upper(): u for u in User.objects.only("id", "emp_id")}
+        return cls(employees, departments, evaluators)
+
+
+def existing_keys(employee_ids, weeks, years):
+    """Return the set of (employee_id, week_number, year, evaluation_type) already stored."""
+    if not employee_ids:
+        return set()
+    return set(
+        PerformanceEvaluation.objects.filter(
+            employee_id__in=employee_ids, week_number__in=weeks, year__in=years
+        ).values_list("employee_id", "week_number", "year", "evaluation_type")
+    )
+
+
+def build_evaluation(attrs, lookups, default_evaluator=None):
+    """
+    Turn one validated row into an unsaved PerformanceEvaluation with derived fields filled.
+    Returns (instance, None) or (None, errors).
+    """
+    emp = lookups.employees.get(attrs["employee"].upper())
+    if not emp:
+        return None, {"employee": f"Employee with emp_id '{attrs['employee']}' not found."}
+
+    evaluator = default_evaluator
+    if attrs.get("evaluator_emp_id"):
+        evaluator = lookups.evaluators.get(attrs["evaluator_emp_id"].upper())
+        if not evaluator:
+            return None, {"evaluator_emp_id": f"Evaluator '{attrs['evaluator_emp_id']}' not found."}
+
+    department_id = emp.department_id
+    if attrs.get("department_code"):
+        dept = lookups.departments.get(attrs["department_code"].upper())
+        if not dept:
+            return None, {"department_code": f"Department '{attrs['department_code']}' not found or inactive."}
+        department_id = dept.id
+
+    instance = PerformanceEvaluation(
+        employee=emp,
+        evaluator=evaluator,
+        department_id=department_id,
+        evaluation_type=attrs.get("evaluation_type") or "Manager",
+        review_date=attrs["review_date"],
+        evaluation_period=attrs.get("evaluation_period") or "",
+        remarks=attrs.get("remarks"),
+        **{name: attrs.get(name, 0) for name in METRIC_FIELDS},
+    )
+    instance.populate_derived_fields()
+    return instance, None
+
+
+def _notification_for(instance):
+    return Notification(
+        employee=instance.employee.user,
+        message=f"Your weekly performance for {instance.evaluation_period} has been published.",
+        auto_delete=True,
+    )
+
+
+# ===========================================================
+# BULK CREATE
+# ===========================================================
+def bulk_create_evaluations(rows, user=None):
+    """
+    Validate and insert a list of evaluation dicts.
+
+    Returns a result dict with created rows (id/emp_id/rank), per-row
+    errors keyed by input index, and rank-queue flush stats.
+    """
+    errors = []
+    valid = []  # (index, attrs)
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "errors": {"row": "Each evaluation must be an object."}})
+            continue
+        row_serializer = EvaluationRowSerializer(data=row)
+        if row_serializer.is_valid():
+            valid.append((index, row_serializer.validated_data))
+        else:
+            errors.append({
+                "index": index,
+                "emp_id": row.get("employee") or row.get("employee_emp_id"),
+                "errors": {f: m[0] if isinstance(m, list) else m for f, m in row_serializer.errors.items()},
+            })
+
+    lookups = EvaluationLookups.for_rows([attrs for _, attrs in valid])
+
+    pending = []  # (index, instance)
+    for index, attrs in valid:
+        instance, row_errors = build_evaluation(attrs, lookups, default_evaluator=user)
+        if row_errors:
+            errors.append({"index": index, "emp_id": attrs["employee"], "errors": row_errors})
+        else:
+            pending.append((index, instance))
+
+    # Duplicate detection: stored rows + repeats inside this batch
+    stored = existing_keys(
+        {i.employee_id for _, i in pending},
+        {i.week_number for _, i in pending},
+        {i.year for _, i in pending},
+    )
+    seen = set()
+    to_insert = []
+    for index, instance in pending:
+        key = (instance.employee_id, instance.week_number, instance.year, instance.evaluation_type)
+        if key in stored or key in seen:
+            errors.append({
+                "index": index,
+                "emp_id": instance.employee.user.emp_id,
+                "errors": {"duplicate": (
+                    f"Evaluation already exists for {instance.employee.user.emp_id} "
+                    f"(Week {instance.week_number}, {instance.year}, {instance.evaluation_type})."
+                )},
+            })
+            continue
+        seen.add(key)
+        to_insert.append((index, instance))
+
+    created = []
+    with rank_queue.deferred():
+        created = _insert(to_insert, errors)
+
+        # bulk_create skips post_save, so mark each bucket explicitly
+        for _, instance in created:
+            rank_queue.mark(bucket_for(instance), instance.employee_id)
+        ranking = rank_queue.flush()
+
+    if created:
+        try:
+            Notification.objects.bulk_create([_notification_for(i) for _, i in created])
+        except Exception as e:
+            logger.warning("Bulk notification creation failed: %s", e)
+
+    ranks = dict(
+        PerformanceEvaluation.objects.filter(pk__in=[i.pk for _, i in created]).values_list("pk", "rank")
+    ) if created else {}
+
+    errors.sort(key=lambda e: e["index"])
+    return {
+        "created": len(created),
+        "failed": len(errors),
+        "results": [
+            {
+                "index": index,
+                "id": instance.pk,
+                "emp_id": instance.employee.user.emp_id,
+                "evaluation_period": instance.evaluation_period,
+                "average_score": instance.average_score,
+                "rank": ranks.get(instance.pk),
+            }
+            for index, instance in created
+        ],
+        "errors": errors,
+        "ranking": ranking,
+    }
+
+
+def _insert(to_insert, errors):
+    """bulk_create the batch; on a concurrent-duplicate race fall back to row-by-row inserts."""
+    if not to_insert:
+        return []
+    try:
+        with transaction.atomic():
+            PerformanceEvaluation.objects.bulk_create([i for _, i in to_insert])
+        _resolve_missing_pks([i for _, i in to_insert])
+        return to_insert
+    except IntegrityError:
+        logger.warning("Bulk evaluation insert hit a duplicate; retrying row by row.")
+
+    created = []
+    for index, instance in to_insert:
+        instance.pk = None
+        try:
+            with transaction.atomic():
+                PerformanceEvaluation.objects.bulk_create([instance])
+            created.append((index, instance))
+        except IntegrityError:
+            errors.append({
+                "index": index,
+                "emp_id": instance.employee.user.emp_id,
+                "errors": {"duplicate": "Performance record already exists for this week and evaluator."},
+            })
+    _resolve_missing_pks([i for _, i in created])
+    return created
+
+
+def _resolve_missing_pks(instances):
+    """Backends that cannot return ids from bulk inserts (MySQL): look them up by unique key."""
+    missing = [i for i in instances if i.pk is None]
+    if not missing:
+        return
+    pk_map = {
+        (employee_id, week, year, evaluation_type): pk
+        for pk, employee_id, week, year, evaluation_type in PerformanceEvaluation.objects.filter(
+            employee_id__in={i.employee_id for i in missing},
+            week_number__in={i.week_number for i in missing},
+            year__in={i.year for i in missing},
+        ).values_list("pk", "employee_id", "week_number", "year", "evaluation_type")
+    }
+    for i in missing:
+        i.pk = pk_map.get((i.employee_id, i.week_number, i.year, i.evaluation_type))
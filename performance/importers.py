@@ -0,0 +1,221 @@
+# ===========================================================
+# performance/importers.py
+# ===========================================================
+# Purpose:
+# Streaming import of weekly evaluation spreadsheets (CSV / XLSX).
+#
+# • Rows are streamed (csv reader / openpyxl read-only mode) and
+#   processed in fixed-size chunks, so memory stays flat no
+#   matter how many rows the file has
+# • emp_id / department code maps are built once per import
+# • Each chunk is upserted on the (employee, week_number, year,
+#   evaluation_type) unique key with one bulk statement
+# • Ranking buckets are re-ranked once, after the last chunk
+# • Chunks commit independently: if the file breaks off midway
+#   (unreadable row, failed chunk), the import stops there and
+#   reports the committed counts plus where it stopped ("aborted")
+# • dry_run validates everything without writing
+#
+# Imports do not create per-employee notifications: they are
+# usually back-filled history keyed in by team leads.
+# ===========================================================
+
+from datetime import datetime
+from itertools import islice
+from rest_framework import serializers
+from django.db import transaction
+import csv
+import io
+import os
+import time
+import logging
+
+from .models import PerformanceEvaluation
+from .bulk import METRIC_FIELDS, EvaluationRowSerializer, EvaluationLookups, build_evaluation
+from .rank_queue import rank_queue
+from .ranking import bucket_for, upsert_options
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+MAX_REPORTED_ERRORS = 100
+
+# Spreadsheet headers that map onto row fields
+HEADER_ALIASES = {
+    "emp_id": "employee",
+    "employee_id": "employee",
+    "department": "department_code",
+    "evaluator": "evaluator_emp_id",
+    "type": "evaluation_type",
+    "date": "review_date",
+}
+
+UPSERT_FIELDS = [
+    "evaluator", "department", "review_date", "evaluation_period", "remarks",
+    "total_score", "average_score", "updated_at",
+] + METRIC_FIELDS
+
+
+def _normalize_header(value, aliases=HEADER_ALIASES):
+    key = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return aliases.get(key, key)
+
+
+def _clean_value(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        value = value.strip()
+    return value
+
+
+def _clean_row(row):
+    """Drop blank cells so serializer defaults apply."""
+    return {k: _clean_value(v) for k, v in row.items() if k and v is not None and v != ""}
+
+
+# ===========================================================
+# ROW READERS (generators — never load the whole file)
+# ===========================================================
+def iter_csv_rows(fileobj, aliases=HEADER_ALIASES):
+    stream = fileobj if isinstance(fileobj, io.TextIOBase) else io.TextIOWrapper(fileobj, encoding="utf-8-sig")
+    reader = csv.reader(stream)
+    headers = [_normalize_header(h, aliases) for h in next(reader, [])]
+    for values in reader:
+        if any(values):
+            yield _clean_row(dict(zip(headers, values)))
+
+
+def iter_xlsx_rows(fileobj, aliases=HEADER_ALIASES):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = [_normalize_header(h, aliases) for h in next(rows, ())]
+        for values in rows:
+            if any(v not in (None, "") for v in values):
+                yield _clean_row(dict(zip(headers, values)))
+    finally:
+        wb.close()
+
+
+def iter_rows(fileobj, filename, aliases=HEADER_ALIASES):
+    """Stream cleaned row dicts; `aliases` maps spreadsheet headers onto row fields."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".csv":
+        return iter_csv_rows(fileobj, aliases)
+    if ext == ".xlsx":
+        return iter_xlsx_rows(fileobj, aliases)
+    raise ValueError(f"Unsupported file type '{ext}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}.")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ===========================================================
+# IMPORTER
+# ===========================================================
+class EvaluationImporter:
+    """Streams rows from a CSV/XLSX file and upserts them chunk by chunk."""
+
+    def __init__(self, chunk_size=1000, dry_run=False, evaluator=None):
+        self.chunk_size = max(1, int(chunk_size))
+        self.dry_run = dry_run
+        self.evaluator = evaluator
+        self.stats = {
+            "rows": 0, "created": 0, "updated": 0, "failed": 0,
+            "chunks": 0, "dry_run": dry_run, "errors": [], "aborted": None,
+        }
+
+    def _error(self, line, emp_id, errors):
+        self.stats["failed"] += 1
+        if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+            self.stats["errors"].append({"row": line, "emp_id": emp_id, "errors": errors})
+
+    def run(self, fileobj, filename):
+        started = time.perf_counter()
+        lookups = EvaluationLookups.preload_all()
+        # One serializer for the whole file: building its fields per row dominates otherwise
+        validator = EvaluationRowSerializer()
+        line = committed_line = 1  # header row
+
+        with rank_queue.deferred():
+            try:
+                for chunk in chunked(iter_rows(fileobj, filename), self.chunk_size):
+                    instances = {}
+                    for row in chunk:
+                        line += 1
+                        self.stats["rows"] += 1
+                        try:
+                            attrs = validator.run_validation(row)
+                        except serializers.ValidationError as exc:
+                            self._error(line, row.get("employee"), {
+                                f: m[0] if isinstance(m, list) else m for f, m in exc.detail.items()
+                            })
+                            continue
+                        instance, errors = build_evaluation(attrs, lookups, self.evaluator)
+                        if errors:
+                            self._error(line, row.get("employee"), errors)
+                            continue
+                        # Later rows for the same key win, as they would on re-import
+                        key = (instance.employee_id, instance.week_number, instance.year, instance.evaluation_type)
+                        instances[key] = instance
+
+                    self._upsert_chunk(instances)
+                    self.stats["chunks"] += 1
+                    committed_line = line
+            except Exception as exc:
+                # Earlier chunks stay committed (and are still re-ranked below): report where the import stopped
+                logger.exception("[EvaluationImport] Stopped after row %s: %s", committed_line, exc)
+                self.stats["aborted"] = {"first_unimported_row": committed_line + 1, "error": str(exc)}
+
+            self.stats["ranking"] = rank_queue.flush()
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_seconds"] = round(elapsed, 3)
+        self.stats["rows_per_second"] = round(self.stats["rows"] / elapsed, 1) if elapsed else None
+        logger.info(
+            "[EvaluationImport] %s rows | created=%s updated=%s failed=%s | %.1f rows/s | dry_run=%s",
+            self.stats["rows"], self.stats["created"], self.stats["updated"], self.stats["failed"],
+            self.stats["rows_per_second"] or 0, self.dry_run,
+        )
+        return self.stats
+
+    def _upsert_chunk(self, instances):
+        if not instances:
+            return
+        stored = {
+            (employee_id, week_number, year, evaluation_type): department_id
+            for employee_id, week_number, year, evaluation_type, department_id in PerformanceEvaluation.objects.filter(
+                employee_id__in={k[0] for k in instances},
+                week_number__in={k[1] for k in instances},
+                year__in={k[2] for k in instances},
+            ).values_list("employee_id", "week_number", "year", "evaluation_type", "department_id")
+        }
+        updated = sum(1 for key in instances if key in stored)
+        if not self.dry_run:
+            with transaction.atomic():
+                PerformanceEvaluation.objects.bulk_create(
+                    list(instances.values()),
+                    **upsert_options(["employee", "week_number", "year", "evaluation_type"], UPSERT_FIELDS),
+                )
+        # Counted once committed, so an aborted import reports only what it wrote
+        self.stats["updated"] += updated
+        self.stats["created"] += len(instances) - updated
+        if self.dry_run:
+            return
+
+        # bulk_create skips post_save, so mark buckets explicitly —
+        # including the old bucket of rows that moved department
+        for key, instance in instances.items():
+            rank_queue.mark(bucket_for(instance), instance.employee_id)
+            previous_department = stored.get(key)
+            if previous_department and previous_department != instance.department_id:
+                rank_queue.mark((previous_department,) + key[1:])
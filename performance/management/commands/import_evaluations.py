@@ -0,0 +1,66 @@
+# ===========================================================
+# performance/management/commands/import_evaluations.py
+# ===========================================================
+# Usage:
+#   python manage.py import_evaluations evaluations.csv
+#   python manage.py import_evaluations week41.xlsx --dry-run
+#   python manage.py import_evaluations big.csv --chunk-size 2000 --evaluator EMP0001
+# ===========================================================
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from performance.importers import EvaluationImporter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV/XLSX file of weekly evaluations and upsert it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .xlsx file.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+        parser.add_argument(
+            "--chunk-size", type=int,
+            default=getattr(settings, "PERFORMANCE_IMPORT_CHUNK_SIZE", 1000),
+            help="Rows per upsert statement.",
+        )
+        parser.add_argument("--evaluator", help="emp_id used when a row has no evaluator column.")
+
+    def handle(self, *args, **options):
+        evaluator = None
+        if options.get("evaluator"):
+            evaluator = User.objects.filter(emp_id__iexact=options["evaluator"]).first()
+            if not evaluator:
+                raise CommandError(f"Evaluator '{options['evaluator']}' not found.")
+
+        importer = EvaluationImporter(
+            chunk_size=options["chunk_size"], dry_run=options["dry_run"], evaluator=evaluator
+        )
+        path = options["path"]
+        try:
+            with open(path, "rb") as fh:
+                stats = importer.run(fh, path)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in stats["errors"]:
+            self.stderr.write(f"Row {error['row']} ({error['emp_id']}): {error['errors']}")
+        if stats["failed"] > len(stats["errors"]):
+            self.stderr.write(f"... {stats['failed'] - len(stats['errors'])} more error(s) not shown.")
+
+        verb = "Validated" if stats["dry_run"] else "Imported"
+        summary = (
+            f"{verb} {stats['rows']} row(s) in {stats['chunks']} chunk(s): "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['failed']} failed | "
+            f"{stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)."
+        )
+        if stats["aborted"]:
+            self.stdout.write(self.style.WARNING(summary))
+            raise CommandError(
+                f"Import stopped at row {stats['aborted']['first_unimported_row']} "
+                f"(earlier rows were kept): {stats['aborted']['error']}"
+            )
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,49 @@
+# ===========================================================
+# performance/management/commands/recompute_ranks.py
+# ===========================================================
+# Usage:
+#   python manage.py recompute_ranks
+#   python manage.py recompute_ranks --year 2025 --week 41
+#   python manage.py recompute_ranks --department ENG01
+# ===========================================================
+
+from django.core.management.base import BaseCommand
+import time
+
+from performance.models import PerformanceEvaluation
+from performance.rank_queue import rank_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-rank performance evaluation buckets (each bucket once) through the rank queue, "
+        "refreshing the leaderboard, weekly rollups and employee stats they feed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Only buckets for this year.")
+        parser.add_argument("--week", type=int, help="Only buckets for this ISO week number.")
+        parser.add_argument("--department", help="Only buckets for this department code.")
+
+    def handle(self, *args, **options):
+        qs = PerformanceEvaluation.objects.exclude(department__isnull=True)
+        if options.get("year"):
+            qs = qs.filter(year=options["year"])
+        if options.get("week"):
+            qs = qs.filter(week_number=options["week"])
+        if options.get("department"):
+            qs = qs.filter(department__code__iexact=options["department"])
+
+        started = time.perf_counter()
+        with rank_queue.deferred():
+            for *key, employee_id in qs.values_list(
+                "department_id", "week_number", "year", "evaluation_type", "employee_id"
+            ).iterator():
+                rank_queue.mark(tuple(key), employee_id)
+            stats = rank_queue.flush()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-ranked {stats['buckets']} bucket(s) from {stats['marked']} evaluation(s) "
+            f"(coalesced {stats['coalesced']}, failed {stats['failed']}) in {elapsed:.2f}s."
+        ))
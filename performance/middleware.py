@@ -0,0 +1,22 @@
+# ===========================================================
+# performance/middleware.py
+# ===========================================================
+# Purpose:
+# Run each request inside a deferred rank-queue block so that
+# every evaluation saved during the request re-ranks its bucket
+# only once, at the end of the request.
+# ===========================================================
+
+from .rank_queue import rank_queue
+
+
+class RankQueueMiddleware:
+    """Flushes dirty ranking buckets once per request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with rank_queue.deferred():
+            response = self.get_response(request)
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-16 18:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0011_employee_project_name_and_more'),
+        ('performance', '0004_performanceevaluation_performance_evaluat_5fdec2_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_number', models.PositiveSmallIntegerField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('evaluation_type', models.CharField(choices=[('Admin', 'Admin'), ('Manager', 'Manager'), ('Client', 'Client'), ('Self', 'Self')], max_length=20)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('department_rank', models.PositiveIntegerField(blank=True, help_text='Rank within department/week.', null=True)),
+                ('org_rank', models.PositiveIntegerField(help_text='Organization-wide rank for the week.')),
+                ('percentile', models.FloatField(default=0.0, help_text='Share of the organization scoring at or below (0–100).')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leaderboard_entries', to='employee.department')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='employee.employee')),
+                ('evaluation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='performance.performanceevaluation')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'ordering': ['-year', '-week_number', 'evaluation_type', 'org_rank'],
+                'indexes': [models.Index(fields=['year', 'week_number', 'evaluation_type', 'org_rank'], name='performance_year_783937_idx'), models.Index(fields=['department', 'year', 'week_number', 'evaluation_type', 'department_rank'], name='performance_departm_3dc7bf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-16 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0011_employee_project_name_and_more'),
+        ('performance', '0005_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_number', models.PositiveSmallIntegerField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('evaluation_count', models.PositiveIntegerField(default=0)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('min_score', models.FloatField(default=0.0)),
+                ('max_score', models.FloatField(default=0.0)),
+                ('top_evaluations', models.JSONField(blank=True, default=list)),
+                ('bottom_evaluations', models.JSONField(blank=True, default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('department_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Weekly Rollup',
+                'verbose_name_plural': 'Weekly Rollups',
+                'ordering': ['-year', '-week_number'],
+                'constraints': [models.UniqueConstraint(fields=('week_number', 'year'), name='unique_weekly_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DepartmentWeekRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_number', models.PositiveSmallIntegerField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('evaluation_count', models.PositiveIntegerField(default=0)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('min_score', models.FloatField(default=0.0)),
+                ('max_score', models.FloatField(default=0.0)),
+                ('top_evaluations', models.JSONField(blank=True, default=list)),
+                ('bottom_evaluations', models.JSONField(blank=True, default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_rollups', to='employee.department')),
+            ],
+            options={
+                'verbose_name': 'Department Week Rollup',
+                'verbose_name_plural': 'Department Week Rollups',
+                'ordering': ['-year', '-week_number', '-average_score'],
+                'indexes': [models.Index(fields=['year', 'week_number'], name='performance_year_c09109_idx')],
+                'constraints': [models.UniqueConstraint(fields=('department', 'week_number', 'year'), name='unique_department_week_rollup')],
+            },
+        ),
+    ]
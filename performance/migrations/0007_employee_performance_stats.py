@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 18:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0011_employee_project_name_and_more'),
+        ('performance', '0006_weekly_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeePerformanceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evaluation_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('best_score', models.FloatField(default=0.0)),
+                ('best_period', models.CharField(blank=True, default='', max_length=120)),
+                ('latest_score', models.FloatField(default=0.0)),
+                ('latest_period', models.CharField(blank=True, default='', max_length=120)),
+                ('latest_week_number', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('latest_year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('rolling_4_week_average', models.FloatField(blank=True, null=True)),
+                ('rolling_12_week_average', models.FloatField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('best_evaluation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='performance.performanceevaluation')),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='performance_stats', to='employee.employee')),
+                ('latest_evaluation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='performance.performanceevaluation')),
+            ],
+            options={
+                'verbose_name': 'Employee Performance Stats',
+                'verbose_name_plural': 'Employee Performance Stats',
+            },
+        ),
+    ]
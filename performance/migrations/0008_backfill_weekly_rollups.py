@@ -0,0 +1,120 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:10
+
+from django.conf import settings
+from django.db import migrations
+import heapq
+
+ROLLUP_BATCH_SIZE = 500
+
+
+def _rank_key(entry):
+    # Score desc, then first name, then emp_id (the ranking order of 0008's time)
+    return (-entry["average_score"], entry["first_name"] or "", entry["emp_id"] or "")
+
+
+def _rank_employees(scores, top_k, bottom_k):
+    """Per-employee top/bottom-k from (employee_id, id, score, first_name, emp_id) rows."""
+    employees = {}
+    for employee_id, pk, score, first_name, emp_id in scores:
+        employee = employees.setdefault(employee_id, {
+            "employee_id": employee_id, "first_name": first_name, "emp_id": emp_id,
+            "total": 0.0, "count": 0, "best": (score, pk), "worst": (score, pk),
+        })
+        employee["total"] += score
+        employee["count"] += 1
+        employee["best"] = max(employee["best"], (score, pk))
+        employee["worst"] = min(employee["worst"], (score, pk))
+
+    def entry(employee, pk):
+        return {
+            "id": pk,
+            "employee_id": employee["employee_id"],
+            "average_score": round(employee["total"] / employee["count"], 2),
+            "first_name": employee["first_name"],
+            "emp_id": employee["emp_id"],
+        }
+
+    ranked = [(entry(e, e["best"][1]), entry(e, e["worst"][1])) for e in employees.values()]
+    top = [best for best, _ in heapq.nsmallest(top_k, ranked, key=lambda pair: _rank_key(pair[0]))]
+    bottom = [worst for _, worst in heapq.nlargest(bottom_k, ranked, key=lambda pair: _rank_key(pair[1]))]
+    return top, bottom, len(employees)
+
+
+def _stats(scores):
+    values = [score for _, _, score, _, _ in scores]
+    return {
+        "evaluation_count": len(values),
+        "score_sum": sum(values),
+        "min_score": min(values),
+        "max_score": max(values),
+    }
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Build the department-week / weekly rollups of evaluations that existed
+    before the rollup tables (the dashboards read only the rollups).
+    Self-contained on the historical models: one query per week.
+    """
+    PerformanceEvaluation = apps.get_model("performance", "PerformanceEvaluation")
+    DepartmentWeekRollup = apps.get_model("performance", "DepartmentWeekRollup")
+    WeeklyRollup = apps.get_model("performance", "WeeklyRollup")
+    top_k = getattr(settings, "TOP_PERFORMERS_COUNT", 5)
+    bottom_k = getattr(settings, "WEAK_PERFORMERS_COUNT", 5)
+
+    DepartmentWeekRollup.objects.all().delete()
+    WeeklyRollup.objects.all().delete()
+
+    evaluations = PerformanceEvaluation.objects.filter(department__isnull=False)
+    weeks = evaluations.values_list("week_number", "year").distinct().order_by("year", "week_number")
+
+    department_rows, weekly_rows = [], []
+    for week_number, year in weeks:
+        by_department = {}
+        for department_id, *score in evaluations.filter(week_number=week_number, year=year).values_list(
+            "department_id", "employee_id", "id", "average_score",
+            "employee__user__first_name", "employee__user__emp_id",
+        ).order_by():
+            by_department.setdefault(department_id, []).append(tuple(score))
+
+        for department_id, scores in by_department.items():
+            top, bottom, employee_count = _rank_employees(scores, top_k, bottom_k)
+            stats = _stats(scores)
+            department_rows.append(DepartmentWeekRollup(
+                department_id=department_id,
+                week_number=week_number,
+                year=year,
+                employee_count=employee_count,
+                average_score=round(stats["score_sum"] / stats["evaluation_count"], 2),
+                top_evaluations=top,
+                bottom_evaluations=bottom,
+                **stats,
+            ))
+
+        scores = [score for rows in by_department.values() for score in rows]
+        top, bottom, employee_count = _rank_employees(scores, top_k, bottom_k)
+        stats = _stats(scores)
+        weekly_rows.append(WeeklyRollup(
+            week_number=week_number,
+            year=year,
+            department_count=len(by_department),
+            employee_count=employee_count,
+            average_score=round(stats["score_sum"] / stats["evaluation_count"], 2),
+            top_evaluations=top,
+            bottom_evaluations=bottom,
+            **stats,
+        ))
+
+    DepartmentWeekRollup.objects.bulk_create(department_rows, batch_size=ROLLUP_BATCH_SIZE)
+    WeeklyRollup.objects.bulk_create(weekly_rows, batch_size=ROLLUP_BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0007_employee_performance_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:20
+
+from django.db import migrations
+
+STATS_BATCH_SIZE = 500
+ROLLING_WINDOWS = (4, 12)
+
+
+def _employee_stats(EmployeePerformanceStats, employee_id, rows):
+    """
+    Stats row of one employee from their evaluations, newest first:
+    (id, average_score, evaluation_period, review_date, week_number, year).
+    """
+    scores = [score for _, score, *_ in rows]
+    best_pk, best_score, best_period, *_ = max(rows, key=lambda r: (r[1], r[3], r[0]))
+    latest_pk, latest_score, latest_period, _, latest_week, latest_year = rows[0]
+
+    weeks = []  # evaluated (year, week_number), newest first
+    for *_, week_number, year in rows:
+        if not weeks or weeks[-1] != (year, week_number):
+            weeks.append((year, week_number))
+    rolling = {}
+    for count in ROLLING_WINDOWS:
+        recent = set(weeks[:count])
+        window = [score for _, score, _, _, week_number, year in rows if (year, week_number) in recent]
+        rolling[count] = round(sum(window) / len(window), 2)
+
+    return EmployeePerformanceStats(
+        employee_id=employee_id,
+        evaluation_count=len(scores),
+        score_sum=sum(scores),
+        average_score=round(sum(scores) / len(scores), 2),
+        best_evaluation_id=best_pk,
+        best_score=best_score,
+        best_period=best_period or "",
+        latest_evaluation_id=latest_pk,
+        latest_score=latest_score,
+        latest_period=latest_period or "",
+        latest_week_number=latest_week,
+        latest_year=latest_year,
+        rolling_4_week_average=rolling[4],
+        rolling_12_week_average=rolling[12],
+    )
+
+
+def backfill_employee_stats(apps, schema_editor):
+    """
+    Build EmployeePerformanceStats for employees evaluated before the table
+    existed (the employee dashboard reads only the stats row).
+    Self-contained on the historical models, batched by employee.
+    """
+    PerformanceEvaluation = apps.get_model("performance", "PerformanceEvaluation")
+    EmployeePerformanceStats = apps.get_model("performance", "EmployeePerformanceStats")
+
+    EmployeePerformanceStats.objects.all().delete()
+    employee_ids = sorted(set(PerformanceEvaluation.objects.values_list("employee_id", flat=True).order_by()))
+    for offset in range(0, len(employee_ids), STATS_BATCH_SIZE):
+        rows = {}
+        for employee_id, *row in (
+            PerformanceEvaluation.objects.filter(employee_id__in=employee_ids[offset:offset + STATS_BATCH_SIZE])
+            .order_by("employee_id", "-year", "-week_number", "-review_date", "-id")
+            .values_list("employee_id", "id", "average_score", "evaluation_period", "review_date", "week_number", "year")
+        ):
+            rows.setdefault(employee_id, []).append(row)
+        EmployeePerformanceStats.objects.bulk_create(
+            [_employee_stats(EmployeePerformanceStats, employee_id, r) for employee_id, r in rows.items()],
+            batch_size=STATS_BATCH_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0008_backfill_weekly_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_employee_stats, migrations.RunPython.noop),
+    ]
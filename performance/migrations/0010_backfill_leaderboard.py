@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:30
+
+from bisect import bisect_right
+from django.db import migrations
+
+LEADERBOARD_BATCH_SIZE = 500
+
+
+def backfill_leaderboard(apps, schema_editor):
+    """
+    Build the leaderboard rows of periods ranked before LeaderboardEntry existed
+    (rank reads no longer refresh a missing period). Self-contained on the
+    historical models: one query per week/year/evaluation_type, ranked in Python
+    (score desc, then first name, then emp_id; percentile = share at or below).
+    """
+    PerformanceEvaluation = apps.get_model("performance", "PerformanceEvaluation")
+    LeaderboardEntry = apps.get_model("performance", "LeaderboardEntry")
+
+    LeaderboardEntry.objects.all().delete()
+    periods = (
+        PerformanceEvaluation.objects.values_list("week_number", "year", "evaluation_type")
+        .distinct()
+        .order_by("year", "week_number", "evaluation_type")
+    )
+    for week_number, year, evaluation_type in periods:
+        rows = sorted(
+            PerformanceEvaluation.objects.filter(
+                week_number=week_number, year=year, evaluation_type=evaluation_type
+            ).values_list(
+                "id", "employee_id", "department_id", "average_score",
+                "employee__user__first_name", "employee__user__emp_id",
+            ),
+            key=lambda r: (-r[3], r[4] or "", r[5] or ""),
+        )
+        scores = sorted(r[3] for r in rows)
+        department_ranks = {}
+        entries = []
+        for org_rank, (pk, employee_id, department_id, average_score, *_) in enumerate(rows, start=1):
+            department_rank = None
+            if department_id:
+                department_rank = department_ranks[department_id] = department_ranks.get(department_id, 0) + 1
+            entries.append(LeaderboardEntry(
+                evaluation_id=pk,
+                employee_id=employee_id,
+                department_id=department_id,
+                week_number=week_number,
+                year=year,
+                evaluation_type=evaluation_type,
+                average_score=average_score,
+                department_rank=department_rank,
+                org_rank=org_rank,
+                percentile=round(bisect_right(scores, average_score) / len(scores) * 100, 2),
+            ))
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=LEADERBOARD_BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0009_backfill_employee_performance_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
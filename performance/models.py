@@ -31,6 +31,15 @@ def get_week_range(date):
     return start, end
 
 
+# The 15 evaluation metrics (0–100 each), in form order
+METRIC_FIELDS = [
+    "communication_skills", "multitasking", "team_skills", "technical_skills",
+    "job_knowledge", "productivity", "creativity", "work_quality",
+    "professionalism", "work_consistency", "attitude", "cooperation",
+    "dependability", "attendance", "punctuality",
+]
+
+
 # -----------------------------------------------------------
 # PERFORMANCE EVALUATION MODEL
 # -----------------------------------------------------------
@@ -185,23 +194,9 @@ class PerformanceEvaluation(models.Model):
         Compute rank within the same department/week and evaluation_type.
         Sets self.rank for this instance and returns it.
         """
-        qs = PerformanceEvaluation.objects.filter(
-            department=self.department,
-            week_number=self.week_number,
-            year=self.year,
-            evaluation_type=self.evaluation_type,
-        ).order_by("-average_score", "employee__user__first_name", "employee__user__emp_id")
-
-        # Build ordered list of pks and set ranks
-        ordered_pks = [obj.pk for obj in qs]
-        for index, pk in enumerate(ordered_pks, start=1):
-            if pk == self.pk:
-                self.rank = index
-                self.save(update_fields=["rank"])
-            else:
-                # ensure other records have correct rank value
-                PerformanceEvaluation.objects.filter(pk=pk).update(rank=index)
-        return self.rank
+        from .ranking import recompute_for
+
+        return recompute_for(self)
 
     # -------------------------------------------------------
     # Auto-Ranking Helper (Used by Signals)
@@ -209,20 +204,13 @@ class PerformanceEvaluation(models.Model):
     def auto_rank_trigger(self):
         """
         Recalculate ranking for this record's department/week/evaluation_type.
-        Use this from a post_save signal or management command.
+        Delegates to the shared ranking engine (performance/ranking.py).
         """
-        if not self.department:
+        if not self.department_id:
             return
-        evaluations = PerformanceEvaluation.objects.filter(
-            department=self.department,
-            week_number=self.week_number,
-            year=self.year,
-            evaluation_type=self.evaluation_type,
-        ).order_by("-average_score", "employee__user__first_name", "employee__user__emp_id")
+        from .ranking import recompute_for
 
-        for i, record in enumerate(evaluations, start=1):
-            if record.rank != i:
-                PerformanceEvaluation.objects.filter(pk=record.pk).update(rank=i)
+        recompute_for(self)
 
     # -------------------------------------------------------
     # Helpers
@@ -240,39 +228,33 @@ class PerformanceEvaluation(models.Model):
             "rank": self.rank,
         }
 
-    def department_rank(self):
-        """Return department rank position (1-based) for this employee, robustly using PKs."""
-        qs = PerformanceEvaluation.objects.filter(
-            department=self.department,
-            week_number=self.week_number,
-            year=self.year,
-            evaluation_type=self.evaluation_type,
-        ).order_by("-average_score", "employee__user__emp_id")
-        ordered_pks = [o.pk for o in qs]
+    def _leaderboard_entry(self):
+        """
+        Return the materialized leaderboard row, or None if the period has not
+        been ranked yet (read-only: `recompute_ranks` fills missing periods).
+        """
         try:
-            return ordered_pks.index(self.pk) + 1
-        except ValueError:
+            return self.leaderboard
+        except LeaderboardEntry.DoesNotExist:
             return None
 
+    def department_rank(self):
+        """Return department rank position (1-based) for this employee, from the leaderboard table."""
+        entry = self._leaderboard_entry()
+        return entry.department_rank if entry else None
+
     def overall_rank(self):
         """Return overall organization-wide rank (1-based) for this employee for the week/year/evaluation_type)."""
-        qs = PerformanceEvaluation.objects.filter(
-            week_number=self.week_number,
-            year=self.year,
-            evaluation_type=self.evaluation_type,
-        ).order_by("-average_score", "employee__user__emp_id")
-        ordered_pks = [o.pk for o in qs]
-        try:
-            return ordered_pks.index(self.pk) + 1
-        except ValueError:
-            return None
+        entry = self._leaderboard_entry()
+        return entry.org_rank if entry else None
 
     # -------------------------------------------------------
     # Save Override
     # -------------------------------------------------------
-    def save(self, *args, **kwargs):
+    def populate_derived_fields(self):
         """
-        Auto-calculate total, average, week/year (from review_date), and readable period before saving.
+        Fill week/year (from review_date), department fallback, scores and readable period.
+        Shared by save() and bulk inserts, which bypass save().
         """
         # Ensure week_number/year reflect review_date
         if self.review_date:
@@ -283,8 +265,8 @@ class PerformanceEvaluation(models.Model):
             self.year = iso[0]
 
         # Department fallback (if not manually set)
-        if not self.department and getattr(self.employee, "department", None):
-            self.department = self.employee.department
+        if not self.department_id and getattr(self.employee, "department_id", None):
+            self.department_id = self.employee.department_id
 
         # Calculate scores
         self.calculate_total_score()
@@ -296,6 +278,20 @@ class PerformanceEvaluation(models.Model):
                 f"Week {self.week_number} ({start.strftime('%d %b')} - {end.strftime('%d %b %Y')})"
             )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ranking bucket as loaded: a save that moves the row re-ranks the bucket it left
+        instance._loaded_bucket = tuple(
+            instance.__dict__.get(f) for f in ("department_id", "week_number", "year", "evaluation_type")
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Auto-calculate total, average, week/year (from review_date), and readable period before saving.
+        """
+        self.populate_derived_fields()
         super().save(*args, **kwargs)
 
         # Log saving for debugging (use logger instead of print)
@@ -316,3 +312,169 @@ class PerformanceEvaluation(models.Model):
             else "Unknown Employee"
         )
         return f"{emp_name} - {self.evaluation_type} ({self.average_score}%)"
+
+
+# -----------------------------------------------------------
+# MATERIALIZED LEADERBOARD
+# -----------------------------------------------------------
+class LeaderboardEntry(models.Model):
+    """
+    Materialized department/organization ranking for one evaluation.
+    Refreshed by the ranking engine (performance/ranking.py) per
+    week/year/evaluation_type; read-only for everything else.
+    """
+
+    evaluation = models.OneToOneField(
+        PerformanceEvaluation,
+        on_delete=models.CASCADE,
+        related_name="leaderboard",
+    )
+    employee = models.ForeignKey(
+        "employee.Employee",
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+    )
+    department = models.ForeignKey(
+        "employee.Department",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="leaderboard_entries",
+    )
+
+    week_number = models.PositiveSmallIntegerField()
+    year = models.PositiveSmallIntegerField()
+    evaluation_type = models.CharField(max_length=20, choices=PerformanceEvaluation.EVALUATION_TYPE_CHOICES)
+
+    average_score = models.FloatField(default=0.0)
+    department_rank = models.PositiveIntegerField(null=True, blank=True, help_text="Rank within department/week.")
+    org_rank = models.PositiveIntegerField(help_text="Organization-wide rank for the week.")
+    percentile = models.FloatField(default=0.0, help_text="Share of the organization scoring at or below (0–100).")
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-year", "-week_number", "evaluation_type", "org_rank"]
+        verbose_name = "Leaderboard Entry"
+        verbose_name_plural = "Leaderboard Entries"
+        indexes = [
+            models.Index(fields=["year", "week_number", "evaluation_type", "org_rank"]),
+            models.Index(fields=["department", "year", "week_number", "evaluation_type", "department_rank"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.org_rank} (Week {self.week_number}, {self.year}, {self.evaluation_type})"
+
+
+# ===========================================================
+# WEEKLY ROLLUPS (Dashboard aggregates)
+# ===========================================================
+class RollupStats(models.Model):
+    """
+    Shared aggregate columns for weekly rollups.
+    top_evaluations / bottom_evaluations hold the best and worst
+    employees in rank order (one entry each, scored by their average for
+    the week): [{"id", "employee_id", "average_score", "first_name", "emp_id"}, ...],
+    "id" being their best (top) or worst (bottom) evaluation of the week.
+    """
+
+    week_number = models.PositiveSmallIntegerField()
+    year = models.PositiveSmallIntegerField()
+
+    evaluation_count = models.PositiveIntegerField(default=0)
+    employee_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    average_score = models.FloatField(default=0.0)
+    min_score = models.FloatField(default=0.0)
+    max_score = models.FloatField(default=0.0)
+    top_evaluations = models.JSONField(default=list, blank=True)
+    bottom_evaluations = models.JSONField(default=list, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class DepartmentWeekRollup(RollupStats):
+    """Per-department weekly aggregates. Maintained by performance/rollups.py."""
+
+    department = models.ForeignKey(
+        "employee.Department",
+        on_delete=models.CASCADE,
+        related_name="weekly_rollups",
+    )
+
+    class Meta:
+        ordering = ["-year", "-week_number", "-average_score"]
+        verbose_name = "Department Week Rollup"
+        verbose_name_plural = "Department Week Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=["department", "week_number", "year"], name="unique_department_week_rollup"),
+        ]
+        indexes = [models.Index(fields=["year", "week_number"])]
+
+    def __str__(self):
+        return f"{self.department} - Week {self.week_number}, {self.year} ({self.average_score}%)"
+
+
+class WeeklyRollup(RollupStats):
+    """Organization-wide weekly aggregates, built from the department rows."""
+
+    department_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-year", "-week_number"]
+        verbose_name = "Weekly Rollup"
+        verbose_name_plural = "Weekly Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=["week_number", "year"], name="unique_weekly_rollup"),
+        ]
+
+    def __str__(self):
+        return f"Week {self.week_number}, {self.year} ({self.average_score}%)"
+
+
+# ===========================================================
+# EMPLOYEE RUNNING STATS (Self-service dashboard)
+# ===========================================================
+class EmployeePerformanceStats(models.Model):
+    """
+    Running performance statistics for one employee.
+    Maintained by performance/rollups.py whenever the employee's
+    evaluations are written; read-only for everything else.
+    Rolling averages cover the employee's last 4 / 12 evaluated weeks.
+    """
+
+    employee = models.OneToOneField(
+        "employee.Employee",
+        on_delete=models.CASCADE,
+        related_name="performance_stats",
+    )
+
+    evaluation_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    average_score = models.FloatField(default=0.0)
+
+    best_evaluation = models.ForeignKey(
+        PerformanceEvaluation, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    best_score = models.FloatField(default=0.0)
+    best_period = models.CharField(max_length=120, blank=True, default="")
+
+    latest_evaluation = models.ForeignKey(
+        PerformanceEvaluation, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    latest_score = models.FloatField(default=0.0)
+    latest_period = models.CharField(max_length=120, blank=True, default="")
+    latest_week_number = models.PositiveSmallIntegerField(null=True, blank=True)
+    latest_year = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    rolling_4_week_average = models.FloatField(null=True, blank=True)
+    rolling_12_week_average = models.FloatField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Employee Performance Stats"
+        verbose_name_plural = "Employee Performance Stats"
+
+    def __str__(self):
+        return f"{self.employee} - {self.evaluation_count} evaluation(s), avg {self.average_score}%"
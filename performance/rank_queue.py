@@ -0,0 +1,189 @@
+# ===========================================================
+# performance/rank_queue.py
+# ===========================================================
+# Purpose:
+# Coalesce rank recalculation for bursts of evaluation writes.
+#
+# Saves only mark their (department, week_number, year,
+# evaluation_type) bucket dirty (after commit). Inside a
+# `rank_queue.deferred()` block — every request, via
+# RankQueueMiddleware, and the recompute_ranks command — dirty
+# buckets are collected and re-ranked once each on flush; the
+# leaderboard, weekly rollups and employee stats of those buckets
+# are refreshed in the same pass, then `buckets_flushed` is sent
+# so other apps (cached reports) can react to the changed weeks.
+# Outside a deferred block a mark is flushed immediately, so
+# shell scripts and tests keep the old "rank on save" behaviour.
+#
+# Evaluations without a department have no rank bucket, but the
+# organization leaderboard and the weekly / monthly reports still
+# include them: their week is kept as (None, week_number, year)
+# for the leaderboard refresh and `buckets_flushed`.
+# ===========================================================
+
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.utils import OperationalError, ProgrammingError
+from django.dispatch import Signal
+import threading
+import logging
+
+from .ranking import bucket_for, recompute_bucket, refresh_leaderboard
+from .rollups import refresh_rollups, refresh_employee_stats
+
+logger = logging.getLogger(__name__)
+
+# Sent after every flush that refreshed something, with
+# department_weeks = {(department_id, week_number, year), ...}
+# (department_id is None for evaluations without a department)
+buckets_flushed = Signal()
+
+
+class RankQueue:
+    """Thread-local queue of dirty rank buckets."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    # -------------------------------------------------------
+    # Internal state (per thread)
+    # -------------------------------------------------------
+    def _state(self):
+        state = self._local
+        if not hasattr(state, "buckets"):
+            state.buckets = set()
+            state.unbucketed = set()
+            state.employees = set()
+            state.marks = 0
+            state.depth = 0
+        return state
+
+    @property
+    def is_deferred(self):
+        return self._state().depth > 0
+
+    # -------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------
+    @contextmanager
+    def deferred(self):
+        """Collect dirty buckets for the duration of the block, flush once on exit."""
+        state = self._state()
+        state.depth += 1
+        try:
+            yield self
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                self.flush()
+
+    def mark(self, key, employee_id=None):
+        """
+        Mark a bucket (and optionally the employee whose stats it affects)
+        dirty; flushes straight away when not deferred.
+        """
+        state = self._state()
+        if employee_id:
+            state.employees.add(employee_id)
+
+        department_id, week_number, year, _ = key
+        if not week_number or not year:
+            logger.warning(
+                f"[Auto-Rank] Skipped invalid bucket (Dept={department_id}, Week={week_number}, Year={year})."
+            )
+        elif not department_id:
+            # Nothing to rank, but the week's leaderboard and reports include the row
+            state.unbucketed.add(key)
+        else:
+            state.buckets.add(key)
+            state.marks += 1
+
+        if state.depth == 0:
+            self.flush()
+
+    def mark_on_commit(self, evaluation):
+        """
+        Mark the evaluation's bucket dirty once the surrounding transaction commits —
+        plus the bucket it was loaded from, if the save moved it elsewhere.
+        """
+        key = bucket_for(evaluation)
+        employee_id = evaluation.employee_id
+        keys = {key}
+        previous = getattr(evaluation, "_loaded_bucket", None)
+        if previous and all(previous[:3]):
+            keys.add(previous)
+        evaluation._loaded_bucket = key
+
+        def mark_all():
+            for k in keys:
+                self.mark(k, employee_id)
+
+        transaction.on_commit(mark_all)
+
+    def flush(self):
+        """
+        Re-rank every dirty bucket exactly once, then refresh the leaderboard
+        once per affected week/year/evaluation_type.
+
+        Returns a stats dict: marks received, distinct buckets re-ranked,
+        and how many redundant re-ranks were coalesced away.
+        """
+        state = self._state()
+        buckets, unbucketed, marks, employees = state.buckets, state.unbucketed, state.marks, state.employees
+        state.buckets, state.unbucketed, state.marks, state.employees = set(), set(), 0, set()
+
+        stats = {"marked": marks, "buckets": len(buckets), "coalesced": marks - len(buckets), "failed": 0}
+        for key in sorted(buckets, key=lambda k: tuple(str(part) for part in k)):
+            try:
+                recompute_bucket(*key)
+            except (OperationalError, ProgrammingError) as db_err:
+                # Happens during migrations or early setup — safely ignored
+                stats["failed"] += 1
+                logger.warning(f"[Auto-Rank] Skipped during migration: {db_err}")
+            except Exception as e:
+                stats["failed"] += 1
+                logger.exception(f"[Auto-Rank] Unexpected error for bucket {key}: {e}")
+
+        periods = {
+            (week_number, year, evaluation_type) for _, week_number, year, evaluation_type in buckets | unbucketed
+        }
+        for period in sorted(periods):
+            try:
+                refresh_leaderboard(*period)
+            except (OperationalError, ProgrammingError) as db_err:
+                logger.warning(f"[Leaderboard] Skipped during migration: {db_err}")
+            except Exception as e:
+                logger.exception(f"[Leaderboard] Unexpected error for period {period}: {e}")
+
+        department_weeks = {(department_id, week_number, year) for department_id, week_number, year, _ in buckets}
+        if department_weeks:
+            try:
+                refresh_rollups(department_weeks)
+            except (OperationalError, ProgrammingError) as db_err:
+                logger.warning(f"[Rollup] Skipped during migration: {db_err}")
+            except Exception as e:
+                logger.exception(f"[Rollup] Unexpected error refreshing weekly rollups: {e}")
+
+        flushed_weeks = department_weeks | {(None, week_number, year) for _, week_number, year, _ in unbucketed}
+        if flushed_weeks:
+            for receiver, result in buckets_flushed.send_robust(sender=self.__class__, department_weeks=flushed_weeks):
+                if isinstance(result, Exception):
+                    logger.error(f"[Auto-Rank] buckets_flushed receiver {receiver} failed: {result}")
+
+        if employees:
+            try:
+                refresh_employee_stats(employees)
+            except (OperationalError, ProgrammingError) as db_err:
+                logger.warning(f"[EmployeeStats] Skipped during migration: {db_err}")
+            except Exception as e:
+                logger.exception(f"[EmployeeStats] Unexpected error refreshing employee stats: {e}")
+
+        if buckets:
+            logger.info(
+                "[Auto-Rank] Flushed %s bucket(s) from %s mark(s) | Coalesced=%s | Failed=%s",
+                stats["buckets"], stats["marked"], stats["coalesced"], stats["failed"],
+            )
+        return stats
+
+
+rank_queue = RankQueue()
@@ -0,0 +1,177 @@
+# ===========================================================
+# performance/ranking.py
+# ===========================================================
+# Purpose:
+# Single ranking engine for PerformanceEvaluation buckets.
+#
+# A bucket is (department, week_number, year, evaluation_type).
+# Ranks are recomputed with one windowed SELECT and one
+# bulk UPDATE of the rows whose rank actually changed, so the
+# cost of a re-rank does not grow in queries with team size.
+#
+# The same engine refreshes the materialized LeaderboardEntry
+# table (department rank, org rank, percentile) per
+# week/year/evaluation_type.
+# ===========================================================
+
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import CumeDist, RowNumber
+import logging
+
+from .models import PerformanceEvaluation, LeaderboardEntry
+
+logger = logging.getLogger(__name__)
+
+# Rank 1 = highest average score; ties broken by name, then emp_id.
+RANK_ORDERING = [
+    F("average_score").desc(),
+    F("employee__user__first_name").asc(),
+    F("employee__user__emp_id").asc(),
+]
+
+
+def upsert_options(unique_fields, update_fields):
+    """
+    bulk_create(...) kwargs for an upsert. MySQL resolves conflicts on any
+    unique key and rejects an explicit conflict target, so it is omitted there.
+    """
+    options = {"update_conflicts": True, "update_fields": update_fields}
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = unique_fields
+    return options
+
+
+def bucket_for(evaluation):
+    """Return the (department_id, week_number, year, evaluation_type) key of an evaluation."""
+    return (
+        evaluation.department_id,
+        evaluation.week_number,
+        evaluation.year,
+        evaluation.evaluation_type,
+    )
+
+
+def recompute_bucket(department_id, week_number, year, evaluation_type):
+    """
+    Re-rank every evaluation in one bucket.
+
+    Returns a {pk: rank} map for the whole bucket so callers can refresh
+    in-memory instances without another query.
+    """
+    if not department_id or not week_number or not year:
+        return {}
+
+    rows = (
+        PerformanceEvaluation.objects.filter(
+            department_id=department_id,
+            week_number=week_number,
+            year=year,
+            evaluation_type=evaluation_type,
+        )
+        .annotate(new_rank=Window(expression=RowNumber(), order_by=RANK_ORDERING))
+        .values_list("pk", "rank", "new_rank")
+    )
+
+    ranks = {}
+    changed = []
+    for pk, old_rank, new_rank in rows:
+        ranks[pk] = new_rank
+        if old_rank != new_rank:
+            changed.append(PerformanceEvaluation(pk=pk, rank=new_rank))
+
+    if changed:
+        PerformanceEvaluation.objects.bulk_update(changed, ["rank"])
+
+    logger.debug(
+        "[Auto-Rank] Dept=%s | Week=%s | Year=%s | Type=%s | Size=%s | Updated=%s",
+        department_id, week_number, year, evaluation_type, len(ranks), len(changed),
+    )
+    return ranks
+
+
+def recompute_for(evaluation):
+    """Re-rank the bucket of the given evaluation and refresh its in-memory rank."""
+    ranks = recompute_bucket(*bucket_for(evaluation))
+    if evaluation.pk in ranks:
+        evaluation.rank = ranks[evaluation.pk]
+    return evaluation.rank
+
+
+def refresh_leaderboard(week_number, year, evaluation_type):
+    """
+    Rebuild the leaderboard rows of one week/year/evaluation_type.
+
+    One windowed SELECT computes department rank, org rank and percentile
+    for the whole period; rows that changed are upserted in bulk.
+    Returns the number of upserted rows.
+    """
+    if not week_number or not year:
+        return 0
+
+    rows = (
+        PerformanceEvaluation.objects.filter(
+            week_number=week_number,
+            year=year,
+            evaluation_type=evaluation_type,
+        )
+        .annotate(
+            new_department_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F("department_id")],
+                order_by=RANK_ORDERING,
+            ),
+            new_org_rank=Window(expression=RowNumber(), order_by=RANK_ORDERING),
+            new_percentile=Window(expression=CumeDist(), order_by=F("average_score").asc()),
+        )
+        .values_list(
+            "pk", "employee_id", "department_id", "average_score",
+            "new_department_rank", "new_org_rank", "new_percentile",
+        )
+    )
+
+    existing = {
+        evaluation_id: (department_id, department_rank, org_rank, percentile, average_score)
+        for evaluation_id, department_id, department_rank, org_rank, percentile, average_score in (
+            LeaderboardEntry.objects.filter(
+                week_number=week_number, year=year, evaluation_type=evaluation_type
+            ).values_list("evaluation_id", "department_id", "department_rank", "org_rank", "percentile", "average_score")
+        )
+    }
+
+    changed = []
+    for pk, employee_id, department_id, average_score, dept_rank, org_rank, cume_dist in rows:
+        dept_rank = dept_rank if department_id else None
+        percentile = round(cume_dist * 100, 2)
+        if existing.get(pk) == (department_id, dept_rank, org_rank, percentile, average_score):
+            continue
+        changed.append(LeaderboardEntry(
+            evaluation_id=pk,
+            employee_id=employee_id,
+            department_id=department_id,
+            week_number=week_number,
+            year=year,
+            evaluation_type=evaluation_type,
+            average_score=average_score,
+            department_rank=dept_rank,
+            org_rank=org_rank,
+            percentile=percentile,
+        ))
+
+    if changed:
+        LeaderboardEntry.objects.bulk_create(
+            changed,
+            **upsert_options(
+                unique_fields=["evaluation"],
+                update_fields=[
+                    "employee", "department", "week_number", "year", "evaluation_type",
+                    "average_score", "department_rank", "org_rank", "percentile", "refreshed_at",
+                ],
+            ),
+        )
+
+    logger.debug(
+        "[Leaderboard] Week=%s | Year=%s | Type=%s | Upserted=%s",
+        week_number, year, evaluation_type, len(changed),
+    )
+    return len(changed)
@@ -0,0 +1,316 @@
+# ===========================================================
+# performance/rollups.py
+# ===========================================================
+# Purpose:
+# Maintain the dashboard rollups.
+#
+# • DepartmentWeekRollup — count / sum / avg / min / max /
+#   distinct employees and top/bottom-k employees per
+#   department-week
+# • WeeklyRollup — the same for the whole organization: totals
+#   merged from the department rows, distinct employees and the
+#   top/bottom-k from one pass over the week's scores
+#
+# Top/bottom lists rank employees, not evaluations: each employee
+# appears once, scored by the average of their evaluations for the
+# week (as the dashboard always ranked them).
+# • EmployeePerformanceStats — running per-employee totals, best
+#   and latest week, rolling 4/12-week averages
+#
+# The rank queue calls refresh_rollups() / refresh_employee_stats()
+# on flush with the department-weeks and employees it saw change,
+# so every save/delete keeps them current. Only dirty
+# department-weeks and employees are recomputed.
+# ===========================================================
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Max, Min, Sum, Window
+from django.db.models.functions import DenseRank, RowNumber
+import heapq
+import logging
+
+from .models import PerformanceEvaluation, DepartmentWeekRollup, WeeklyRollup, EmployeePerformanceStats
+from .ranking import upsert_options
+
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = ["employee_id", "id", "average_score", "employee__user__first_name", "employee__user__emp_id"]
+
+ROLLUP_FIELDS = [
+    "evaluation_count", "employee_count", "score_sum", "average_score",
+    "min_score", "max_score", "top_evaluations", "bottom_evaluations", "refreshed_at",
+]
+
+
+def top_k():
+    return getattr(settings, "TOP_PERFORMERS_COUNT", 5)
+
+
+def bottom_k():
+    return getattr(settings, "WEAK_PERFORMERS_COUNT", 5)
+
+
+def _rank_key(entry):
+    # Same order as ranking.RANK_ORDERING: score desc, then first name, then emp_id
+    return (-entry["average_score"], entry["first_name"] or "", entry["emp_id"] or "")
+
+
+def rank_employees(scores):
+    """
+    Per-employee top/bottom-k from (employee_id, evaluation_id, score,
+    first_name, emp_id) rows. Each employee is scored by the average of
+    their rows; "id" is their best evaluation in the top list and their
+    worst in the bottom list. Returns (top, bottom, employee_count).
+    """
+    employees = {}
+    for employee_id, pk, score, first_name, emp_id in scores:
+        employee = employees.get(employee_id)
+        if employee is None:
+            employees[employee_id] = employee = {
+                "employee_id": employee_id, "first_name": first_name, "emp_id": emp_id,
+                "total": 0.0, "count": 0, "best": (score, pk), "worst": (score, pk),
+            }
+        employee["total"] += score
+        employee["count"] += 1
+        employee["best"] = max(employee["best"], (score, pk))
+        employee["worst"] = min(employee["worst"], (score, pk))
+
+    def entry(employee, pk):
+        return {
+            "id": pk,
+            "employee_id": employee["employee_id"],
+            "average_score": round(employee["total"] / employee["count"], 2),
+            "first_name": employee["first_name"],
+            "emp_id": employee["emp_id"],
+        }
+
+    ranked = [(entry(e, e["best"][1]), entry(e, e["worst"][1])) for e in employees.values()]
+    top = [best for best, _ in heapq.nsmallest(top_k(), ranked, key=lambda pair: _rank_key(pair[0]))]
+    bottom = [worst for _, worst in heapq.nlargest(bottom_k(), ranked, key=lambda pair: _rank_key(pair[1]))]
+    return top, bottom, len(employees)
+
+
+def refresh_rollups(department_weeks):
+    """
+    Recompute the given (department_id, week_number, year) rollups and the
+    organization rollup of every week they belong to.
+    """
+    weeks = {}
+    for department_id, week_number, year in department_weeks:
+        if department_id and week_number and year:
+            weeks.setdefault((week_number, year), set()).add(department_id)
+
+    for (week_number, year), department_ids in sorted(weeks.items()):
+        refresh_department_weeks(week_number, year, department_ids)
+        refresh_weekly_rollup(week_number, year)
+
+
+def refresh_department_weeks(week_number, year, department_ids):
+    """
+    Rebuild the rollups of several departments for one week:
+    one grouped aggregate, one pass over the scores for the
+    per-employee top/bottom-k, one upsert.
+    """
+    qs = PerformanceEvaluation.objects.filter(
+        week_number=week_number, year=year, department_id__in=department_ids
+    )
+
+    aggregates = {
+        row["department_id"]: row
+        for row in qs.values("department_id").annotate(
+            evaluation_count=Count("id"),
+            employee_count=Count("employee", distinct=True),
+            score_sum=Sum("average_score"),
+            avg_score=Avg("average_score"),
+            min_score=Min("average_score"),
+            max_score=Max("average_score"),
+        ).order_by()
+    }
+
+    scores = {}
+    for department_id, *row in qs.values_list("department_id", *SCORE_FIELDS).order_by():
+        scores.setdefault(department_id, []).append(row)
+
+    rollups = []
+    for department_id, row in aggregates.items():
+        top, bottom, _ = rank_employees(scores.get(department_id, []))
+        rollups.append(DepartmentWeekRollup(
+            department_id=department_id,
+            week_number=week_number,
+            year=year,
+            evaluation_count=row["evaluation_count"],
+            employee_count=row["employee_count"],
+            score_sum=row["score_sum"] or 0.0,
+            average_score=round(row["avg_score"] or 0, 2),
+            min_score=row["min_score"] or 0.0,
+            max_score=row["max_score"] or 0.0,
+            top_evaluations=top,
+            bottom_evaluations=bottom,
+        ))
+    if rollups:
+        DepartmentWeekRollup.objects.bulk_create(
+            rollups, **upsert_options(["department", "week_number", "year"], ROLLUP_FIELDS)
+        )
+
+    # Departments whose last evaluation for the week was deleted
+    emptied = set(department_ids) - set(aggregates)
+    if emptied:
+        DepartmentWeekRollup.objects.filter(
+            week_number=week_number, year=year, department_id__in=emptied
+        ).delete()
+
+    logger.debug(
+        "[Rollup] Week=%s | Year=%s | Departments refreshed=%s | Removed=%s",
+        week_number, year, len(rollups), len(emptied),
+    )
+
+
+def refresh_weekly_rollup(week_number, year):
+    """
+    Rebuild the organization rollup of one week: totals merged from its
+    department rows; distinct employees and the per-employee top/bottom-k
+    from the week's scores (an employee can be evaluated in more than one
+    department, so neither can be summed across departments).
+    """
+    departments = list(DepartmentWeekRollup.objects.filter(week_number=week_number, year=year))
+    if not departments:
+        WeeklyRollup.objects.filter(week_number=week_number, year=year).delete()
+        return None
+
+    evaluation_count = sum(d.evaluation_count for d in departments)
+    score_sum = sum(d.score_sum for d in departments)
+    top, bottom, employee_count = rank_employees(
+        PerformanceEvaluation.objects.filter(week_number=week_number, year=year, department__isnull=False)
+        .values_list(*SCORE_FIELDS).order_by()
+    )
+
+    rollup = WeeklyRollup(
+        week_number=week_number,
+        year=year,
+        department_count=len(departments),
+        evaluation_count=evaluation_count,
+        employee_count=employee_count,
+        score_sum=score_sum,
+        average_score=round(score_sum / evaluation_count, 2) if evaluation_count else 0.0,
+        min_score=min(d.min_score for d in departments),
+        max_score=max(d.max_score for d in departments),
+        top_evaluations=top,
+        bottom_evaluations=bottom,
+    )
+    WeeklyRollup.objects.bulk_create(
+        [rollup], **upsert_options(["week_number", "year"], ROLLUP_FIELDS + ["department_count"])
+    )
+    return rollup
+
+
+def rebuild_rollups():
+    """Rebuild every department-week and weekly rollup from the evaluations (backfill)."""
+    department_weeks = set(
+        PerformanceEvaluation.objects.exclude(department__isnull=True)
+        .values_list("department_id", "week_number", "year").distinct().order_by()
+    )
+    refresh_rollups(department_weeks)
+    return len(department_weeks)
+
+
+def latest_weekly_rollup():
+    return WeeklyRollup.objects.order_by("-year", "-week_number").first()
+
+
+# ===========================================================
+# EMPLOYEE RUNNING STATS
+# ===========================================================
+ROLLING_WINDOWS = (4, 12)
+
+EMPLOYEE_STATS_FIELDS = [
+    "evaluation_count", "score_sum", "average_score",
+    "best_evaluation", "best_score", "best_period",
+    "latest_evaluation", "latest_score", "latest_period", "latest_week_number", "latest_year",
+    "rolling_4_week_average", "rolling_12_week_average", "refreshed_at",
+]
+
+
+def refresh_employee_stats(employee_ids):
+    """
+    Rebuild EmployeePerformanceStats for the given employees with three
+    queries in total (totals, best evaluation, last 12 evaluated weeks)
+    and one upsert, however many employees are dirty.
+    """
+    employee_ids = {e for e in employee_ids if e}
+    if not employee_ids:
+        return 0
+
+    qs = PerformanceEvaluation.objects.filter(employee_id__in=employee_ids)
+
+    totals = {
+        row["employee_id"]: row
+        for row in qs.values("employee_id").annotate(
+            evaluation_count=Count("id"), score_sum=Sum("average_score")
+        ).order_by()
+    }
+
+    best = {
+        employee_id: (pk, score, period)
+        for employee_id, pk, score, period in qs.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("employee_id")],
+                order_by=[F("average_score").desc(), F("review_date").desc(), F("id").desc()],
+            )
+        ).filter(position=1).values_list("employee_id", "id", "average_score", "evaluation_period")
+    }
+
+    # Evaluations of each employee's most recent evaluated weeks, newest first
+    recent = {}
+    window = max(ROLLING_WINDOWS)
+    for employee_id, week_position, pk, score, period, week_number, year in (
+        qs.annotate(
+            week_position=Window(
+                DenseRank(),
+                partition_by=[F("employee_id")],
+                order_by=[F("year").desc(), F("week_number").desc()],
+            )
+        )
+        .filter(week_position__lte=window)
+        .order_by("employee_id", "-year", "-week_number", "-review_date", "-id")
+        .values_list("employee_id", "week_position", "id", "average_score", "evaluation_period", "week_number", "year")
+    ):
+        recent.setdefault(employee_id, []).append((week_position, pk, score, period, week_number, year))
+
+    stats = []
+    for employee_id, row in totals.items():
+        rows = recent.get(employee_id, [])
+        _, latest_pk, latest_score, latest_period, latest_week, latest_year = rows[0]
+        best_pk, best_score, best_period = best[employee_id]
+        rolling = {}
+        for weeks in ROLLING_WINDOWS:
+            scores = [score for position, _, score, *_ in rows if position <= weeks]
+            rolling[weeks] = round(sum(scores) / len(scores), 2) if scores else None
+
+        stats.append(EmployeePerformanceStats(
+            employee_id=employee_id,
+            evaluation_count=row["evaluation_count"],
+            score_sum=row["score_sum"] or 0.0,
+            average_score=round((row["score_sum"] or 0) / row["evaluation_count"], 2),
+            best_evaluation_id=best_pk,
+            best_score=best_score,
+            best_period=best_period or "",
+            latest_evaluation_id=latest_pk,
+            latest_score=latest_score,
+            latest_period=latest_period or "",
+            latest_week_number=latest_week,
+            latest_year=latest_year,
+            rolling_4_week_average=rolling[4],
+            rolling_12_week_average=rolling[12],
+        ))
+
+    if stats:
+        EmployeePerformanceStats.objects.bulk_create(stats, **upsert_options(["employee"], EMPLOYEE_STATS_FIELDS))
+
+    # Employees whose last evaluation was deleted
+    emptied = employee_ids - set(totals)
+    if emptied:
+        EmployeePerformanceStats.objects.filter(employee_id__in=emptied).delete()
+
+    logger.debug("[EmployeeStats] Refreshed=%s | Removed=%s", len(stats), len(emptied))
+    return len(stats)
@@ -4,7 +4,7 @@
 from rest_framework import serializers
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import PerformanceEvaluation
+from .models import METRIC_FIELDS, PerformanceEvaluation, LeaderboardEntry
 from employee.models import Department, Employee
 
 User = get_user_model()
@@ -147,13 +147,31 @@ class PerformanceCreateUpdateSerializer(serializers.ModelSerializer):
             "attitude", "cooperation", "dependability", "attendance",
             "punctuality", "remarks",
         ]
+        # Metrics are 0–100 integers (the model fields only bound them at 0)
+        extra_kwargs = {
+            name: {
+                "min_value": 0,
+                "max_value": 100,
+                "error_messages": {
+                    "invalid": "Metric must be an integer between 0–100.",
+                    "min_value": "Metric must be between 0–100.",
+                    "max_value": "Metric must be between 0–100.",
+                },
+            }
+            for name in METRIC_FIELDS
+        }
 
     # ---------------------- Validations ----------------------
-    def validate(self, attrs):
-        # Accept employee via either "employee" or "employee_emp_id"
+    def employee_value(self, attrs):
+        """The submitted emp_id ("employee" or "employee_emp_id"); no database access."""
         emp_value = attrs.get("employee") or attrs.get("employee_emp_id")
         if not emp_value:
             raise serializers.ValidationError({"employee": "Employee ID is required."})
+        return emp_value.strip()
+
+    def validate(self, attrs):
+        # Accept employee via either "employee" or "employee_emp_id"
+        emp_value = self.employee_value(attrs)
 
         try:
             emp = Employee.objects.select_related("user", "department").get(user__emp_id__iexact=emp_value)
@@ -202,20 +220,6 @@ class PerformanceCreateUpdateSerializer(serializers.ModelSerializer):
                 "duplicate": f"Evaluation already exists for {emp.user.emp_id} (Week {week_number}, {year}, {evaluation_type})."
             })
 
-        # Metric validation — ensure 0–100 integer values
-        for field, value in attrs.items():
-            if field.endswith("_skills") or field in [
-                "job_knowledge", "productivity", "creativity",
-                "work_quality", "professionalism", "work_consistency",
-                "attitude", "cooperation", "dependability", "attendance", "punctuality"
-            ]:
-                try:
-                    num = int(value)
-                except (TypeError, ValueError):
-                    raise serializers.ValidationError({field: "Metric must be an integer between 0–100."})
-                if not (0 <= num <= 100):
-                    raise serializers.ValidationError({field: "Metric must be between 0–100."})
-
         # Role restriction: Only Admin or Manager can evaluate
         request = self.context.get("request")
         if request and hasattr(request.user, "role"):
@@ -239,8 +243,6 @@ class PerformanceCreateUpdateSerializer(serializers.ModelSerializer):
             department=department,
             **validated_data,
         )
-
-        instance.auto_rank_trigger()
         return instance
 
     # ---------------------- Update ----------------------
@@ -248,7 +250,6 @@ class PerformanceCreateUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        instance.auto_rank_trigger()
         return instance
 
 
@@ -332,3 +333,22 @@ class PerformanceRankSerializer(serializers.ModelSerializer):
             return "Below Average"
         else:
             return "Poor"
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    emp_id = serializers.ReadOnlyField(source="employee.user.emp_id")
+    full_name = serializers.SerializerMethodField()
+    department_name = serializers.ReadOnlyField(source="department.name", default=None)
+    evaluation_id = serializers.ReadOnlyField()
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = [
+            "evaluation_id", "emp_id", "full_name", "department_name",
+            "week_number", "year", "evaluation_type", "average_score",
+            "department_rank", "org_rank", "percentile",
+        ]
+
+    def get_full_name(self, obj):
+        u = obj.employee.user
+        return f"{u.first_name} {u.last_name}".strip()
@@ -1,3 +1,163 @@
 from django.test import TestCase
+from datetime import date
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import User
+from employee.models import Employee, Department
+from .models import (
+    PerformanceEvaluation,
+    LeaderboardEntry,
+    DepartmentWeekRollup,
+    WeeklyRollup,
+    EmployeePerformanceStats,
+)
+from .rank_queue import rank_queue, buckets_flushed
+
+METRICS = [
+    "communication_skills", "multitasking", "team_skills", "technical_skills", "job_knowledge",
+    "productivity", "creativity", "work_quality", "professionalism", "work_consistency",
+    "attitude", "cooperation", "dependability", "attendance", "punctuality",
+]
+
+
+class RankQueueFlushTests(TestCase):
+    """Saves inside rank_queue.deferred() only mark buckets; the flush re-ranks and refreshes once."""
+
+    REVIEW_DATE = date(2025, 10, 8)  # ISO week 41 of 2025
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(code="ENG01", name="Engineering")
+        cls.sales = Department.objects.create(code="SAL01", name="Sales")
+        cls.admin = User.objects.create(
+            emp_id="EMP0000", username="admin", email="admin@example.com", role="Admin",
+            first_name="Ada", last_name="Admin",
+        )
+        cls.employees = []
+        for i, name in enumerate(["Alice", "Bruno", "Chen", "Dara"], start=1):
+            user = User.objects.create(
+                emp_id=f"EMP{i:04d}", username=f"emp{i}", email=f"emp{i}@example.com", role="Employee",
+                first_name=name, last_name="Test", department=cls.engineering,
+            )
+            cls.employees.append(
+                Employee.objects.create(user=user, department=cls.engineering, joining_date=date(2024, 1, 1))
+            )
+
+    def setUp(self):
+        self.flushed = []
+        buckets_flushed.connect(self.record_flush)
+        self.addCleanup(buckets_flushed.disconnect, self.record_flush)
+
+    def record_flush(self, sender, department_weeks, **kwargs):
+        self.flushed.append(department_weeks)
+
+    def evaluate(self, employee, score, department=None):
+        return PerformanceEvaluation.objects.create(
+            employee=employee,
+            evaluator=self.admin,
+            department=department or self.engineering,
+            review_date=self.REVIEW_DATE,
+            **{metric: score for metric in METRICS},
+        )
+
+    def ranks(self, department=None):
+        return dict(
+            PerformanceEvaluation.objects.filter(department=department or self.engineering)
+            .values_list("employee__user__emp_id", "rank")
+        )
+
+    def test_deferred_saves_rank_once_on_flush(self):
+        scores = [60, 90, 75, 90]  # Bruno and Dara tie: first name breaks it
+        with rank_queue.deferred() as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                for employee, score in zip(self.employees, scores):
+                    self.evaluate(employee, score)
+            self.assertEqual(set(self.ranks().values()), {None})
+            self.assertFalse(LeaderboardEntry.objects.exists())
+            self.assertEqual(self.flushed, [])
+            stats = queue.flush()
+
+        self.assertEqual((stats["marked"], stats["buckets"], stats["coalesced"]), (4, 1, 3))
+        self.assertEqual(self.ranks(), {"EMP0002": 1, "EMP0004": 2, "EMP0003": 3, "EMP0001": 4})
+        self.assertEqual(self.flushed, [{(self.engineering.id, 41, 2025)}])
+
+        leaderboard = LeaderboardEntry.objects.filter(week_number=41, year=2025).order_by("org_rank")
+        self.assertEqual(
+            [e.evaluation.employee.user.emp_id for e in leaderboard],
+            ["EMP0002", "EMP0004", "EMP0003", "EMP0001"],
+        )
+        rollup = DepartmentWeekRollup.objects.get(department=self.engineering, week_number=41, year=2025)
+        self.assertEqual((rollup.evaluation_count, rollup.employee_count, rollup.max_score), (4, 4, 90.0))
+        self.assertEqual(rollup.top_evaluations[0]["emp_id"], "EMP0002")
+        self.assertTrue(WeeklyRollup.objects.filter(week_number=41, year=2025).exists())
+        self.assertEqual(EmployeePerformanceStats.objects.count(), 4)
+
+    def test_flush_on_block_exit_covers_the_bucket_a_save_left(self):
+        with rank_queue.deferred():
+            with self.captureOnCommitCallbacks(execute=True):
+                evaluations = [self.evaluate(e, s) for e, s in zip(self.employees[:3], [80, 70, 60])]
+        self.assertEqual(self.ranks(), {"EMP0001": 1, "EMP0002": 2, "EMP0003": 3})
+
+        moved = PerformanceEvaluation.objects.get(pk=evaluations[0].pk)
+        moved.department = self.sales
+        self.flushed.clear()
+        with rank_queue.deferred():
+            with self.captureOnCommitCallbacks(execute=True):
+                moved.save()
+
+        self.assertEqual(self.ranks(), {"EMP0002": 1, "EMP0003": 2})
+        self.assertEqual(self.ranks(self.sales), {"EMP0001": 1})
+        self.assertEqual(self.flushed, [{(self.engineering.id, 41, 2025), (self.sales.id, 41, 2025)}])
+        self.assertEqual(
+            DepartmentWeekRollup.objects.get(department=self.engineering, week_number=41, year=2025).evaluation_count, 2
+        )
+
+    def test_save_outside_deferred_block_ranks_immediately(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation = self.evaluate(self.employees[0], 50)
+        evaluation.refresh_from_db()
+        self.assertEqual(evaluation.rank, 1)
+        self.assertEqual(len(self.flushed), 1)
+
+    def test_evaluation_without_department_still_flushes_its_week(self):
+        loner = self.employees[3]
+        Employee.objects.filter(pk=loner.pk).update(department=None)  # e.g. their department was deleted
+        loner.refresh_from_db()
+        with rank_queue.deferred():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.evaluate(self.employees[0], 70)
+                evaluation = PerformanceEvaluation.objects.create(
+                    employee=loner, evaluator=self.admin, review_date=self.REVIEW_DATE,
+                    **{metric: 95 for metric in METRICS},
+                )
+        self.assertIsNone(evaluation.department_id)
+        self.assertEqual(self.flushed, [{(self.engineering.id, 41, 2025), (None, 41, 2025)}])
+        entry = LeaderboardEntry.objects.get(evaluation=evaluation)
+        self.assertEqual((entry.org_rank, entry.department_rank), (1, None))
+
+        self.flushed.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation.delete()
+        self.assertEqual(self.flushed, [{(None, 41, 2025)}])
+
+
+class LeaderboardViewTests(TestCase):
+    """Query parameters of the leaderboard are validated before they reach the ORM."""
+
+    def setUp(self):
+        admin = User.objects.create(
+            emp_id="EMP0000", username="admin", email="admin@example.com", role="Admin", first_name="Ada",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_invalid_period_is_rejected(self):
+        for params in ({"week": "abc", "year": "2025"}, {"week": "41", "year": "20x5"}, {"week": "54", "year": "2025"}):
+            response = self.client.get("/api/performance/leaderboard/", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+
+    def test_valid_period_without_entries(self):
+        response = self.client.get("/api/performance/leaderboard/", {"week": "41", "year": "2025", "limit": "9999"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 0)
@@ -10,6 +10,7 @@ from .views import (
     EmployeeDashboardView,
     EmployeePerformanceView,
     PerformanceDashboardView,
+    LeaderboardView,
 )
 
 router = DefaultRouter()
@@ -21,6 +22,9 @@ urlpatterns = [
     # Admin/Manager summary
     path("summary/", PerformanceSummaryView.as_view(), name="performance_summary"),
 
+    # Materialized department / organization leaderboard
+    path("leaderboard/", LeaderboardView.as_view(), name="performance_leaderboard"),
+
     # Organization-level dashboard (Admin / Manager)
     path("dashboard/organization/", PerformanceDashboardView.as_view(), name="performance_dashboard"),
 
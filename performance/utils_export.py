@@ -2,8 +2,6 @@
 # performance/utils_export.py
 # ===========================================================
 import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -11,49 +9,52 @@ from reportlab.lib.styles import getSampleStyleSheet
 from django.http import HttpResponse
 from django.utils import timezone
 
+from reports.utils.excel_export import SheetSpec, excel_response
+from reports.utils.pdf_cache import cache_key, cached_pdf_response
+
 
 # ===========================================================
 # Excel Export Utility
 # ===========================================================
 def generate_excel_report(evaluations, filename="performance_report.xlsx"):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Performance Report"
-
+    """Stream an evaluation queryset into a write-only workbook (see reports/utils/excel_export.py)."""
     headers = [
         "Emp ID", "Employee Name", "Department", "Manager",
         "Week", "Year", "Total Score", "Average Score (%)", "Rank", "Remarks"
     ]
-    ws.append(headers)
 
-    for col in range(1, len(headers) + 1):
-        ws.cell(row=1, column=col).font = Font(bold=True)
-        ws.cell(row=1, column=col).alignment = Alignment(horizontal="center")
+    rows = (
+        [
+            emp_id,
+            f"{first_name} {last_name}",
+            department or "-",
+            manager_first_name or "-",
+            week_number,
+            year,
+            total_score,
+            round(average_score, 2),
+            rank,
+            remarks or "",
+        ]
+        for emp_id, first_name, last_name, department, manager_first_name,
+        week_number, year, total_score, average_score, rank, remarks in evaluations.values_list(
+            "employee__user__emp_id", "employee__user__first_name", "employee__user__last_name",
+            "department__name", "employee__manager__user__first_name",
+            "week_number", "year", "total_score", "average_score", "rank", "remarks",
+        ).iterator(chunk_size=2000)
+    )
 
-    for e in evaluations:
-        ws.append([
-            e.employee.user.emp_id,
-            f"{e.employee.user.first_name} {e.employee.user.last_name}",
-            e.department.name if e.department else "-",
-            e.employee.manager.user.first_name if e.employee.manager else "-",
-            e.week_number,
-            e.year,
-            e.total_score,
-            round(e.average_score, 2),
-            e.rank,
-            e.remarks or "",
-        ])
-
-    response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
+    return excel_response([SheetSpec("Performance Report", headers, rows)], filename)
 
 
 # ===========================================================
 # PDF Export Utility (Single Employee Report)
 # ===========================================================
-def generate_pdf_report(employee, evaluations):
+def render_pdf_report(employee, evaluations, stamped=True):
+    """
+    Render the employee's evaluation history table to PDF bytes.
+    stamped=False leaves out the "Generated on" line (for cached renders).
+    """
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -68,7 +69,8 @@ def generate_pdf_report(employee, evaluations):
     story.append(Spacer(1, 12))
     story.append(Paragraph(f"<b>Employee:</b> {employee.user.first_name} {employee.user.last_name}", styles["Normal"]))
     story.append(Paragraph(f"<b>Department:</b> {employee.department.name if employee.department else '-'}", styles["Normal"]))
-    story.append(Paragraph(f"<b>Generated on:</b> {timezone.now().strftime('%d %b %Y, %H:%M')}", styles["Normal"]))
+    if stamped:
+        story.append(Paragraph(f"<b>Generated on:</b> {timezone.now().strftime('%d %b %Y, %H:%M')}", styles["Normal"]))
     story.append(Spacer(1, 12))
 
     # Table data
@@ -94,9 +96,34 @@ def generate_pdf_report(employee, evaluations):
 
     story.append(table)
     doc.build(story)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def pdf_report_filename(employee):
+    return f"{employee.user.emp_id}_performance_report.pdf"
+
 
-    response = HttpResponse(buffer, content_type="application/pdf")
-    filename = f"{employee.user.emp_id}_performance_report.pdf"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+def generate_pdf_report(employee, evaluations):
+    response = HttpResponse(render_pdf_report(employee, evaluations), content_type="application/pdf")
+    response["Content-Disposition"] = f'attachment; filename="{pdf_report_filename(employee)}"'
     return response
+
+
+def cached_pdf_report(employee, evaluations):
+    """
+    generate_pdf_report() served through the on-disk PDF cache: keyed on the
+    evaluations' id / updated_at and rank (re-ranking does not touch updated_at).
+    """
+    evaluations = list(evaluations)
+    key = cache_key(
+        "employee-history",
+        employee.user.emp_id,
+        "all",
+        [(e.id, e.updated_at, e.rank) for e in evaluations],
+        None,
+        name=f"{employee.user.first_name} {employee.user.last_name}",
+        department=employee.department.name if employee.department else None,
+    )
+    return cached_pdf_response(
+        key, lambda: render_pdf_report(employee, evaluations, stamped=False), pdf_report_filename(employee)
+    )
@@ -5,18 +5,26 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
-from django.db.models import Max, F, Avg, Window, Count
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import F, Window
 from django.db.models.functions import Rank
 from django.db import IntegrityError
+from django.conf import settings
 from django.utils import timezone
+import os
 import logging
 
-from .models import PerformanceEvaluation
+from .models import PerformanceEvaluation, LeaderboardEntry, DepartmentWeekRollup, WeeklyRollup
+from .rank_queue import rank_queue
+from .rollups import latest_weekly_rollup
+from .bulk import bulk_create_evaluations
+from .importers import EvaluationImporter, SUPPORTED_EXTENSIONS
 from .serializers import (
     PerformanceEvaluationSerializer,
     PerformanceCreateUpdateSerializer,
     PerformanceDashboardSerializer,
     PerformanceRankSerializer,
+    LeaderboardEntrySerializer,
 )
 from employee.models import Employee, Department
 from notifications.models import Notification
@@ -60,7 +68,7 @@ class PerformanceEvaluationViewSet(viewsets.ModelViewSet):
         return qs
 
     # --------------------------------------------------------
-    # CREATE — Auto Rank Trigger + Notification
+    # CREATE — Auto Rank (via signal) + Notification
     # --------------------------------------------------------
     def create(self, request, *args, **kwargs):
         role = getattr(request.user, "role", "").lower()
@@ -74,8 +82,11 @@ class PerformanceEvaluationViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         try:
+            # post_save marks the ranking bucket dirty; flush it now so the
+            # response carries the final rank.
             instance = serializer.save()
-            instance.auto_rank_trigger()
+            rank_queue.flush()
+            instance.refresh_from_db(fields=["rank"])
         except IntegrityError:
             return Response(
                 {"error": "Performance record already exists for this week and evaluator."},
@@ -114,6 +125,132 @@ class PerformanceEvaluationViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    # --------------------------------------------------------
+    # BULK CREATE — Batched lookups, single-pass ranking
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST /api/performance/evaluations/bulk/
+        Body: [{...evaluation...}, ...]  or  {"evaluations": [...]}
+        Good rows are saved; bad rows are reported per index.
+        """
+        role = getattr(request.user, "role", "").lower()
+        if role not in ["admin", "manager"]:
+            return Response(
+                {"error": "Only Admin or Manager can create evaluations."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        rows = request.data.get("evaluations") if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"error": "Provide a non-empty list of evaluations."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_rows = getattr(settings, "PERFORMANCE_BULK_MAX_ROWS", 500)
+        if len(rows) > max_rows:
+            return Response(
+                {"error": f"A batch may contain at most {max_rows} evaluations."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            result = bulk_create_evaluations(rows, user=request.user)
+        except Exception as exc:
+            logger.exception("Error saving bulk performance evaluations: %s", exc)
+            return Response(
+                {"error": "An unexpected error occurred while saving evaluations."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(
+            "[BulkEvaluation] %s created, %s failed by %s",
+            result["created"], result["failed"], getattr(request.user, "emp_id", request.user),
+        )
+        return Response(
+            {
+                "message": f"{result['created']} evaluation(s) recorded, {result['failed']} failed.",
+                **result,
+            },
+            status=status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST,
+        )
+
+    # --------------------------------------------------------
+    # IMPORT — Streaming CSV / XLSX upsert
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_file(self, request):
+        """
+        POST /api/performance/evaluations/import/   (multipart)
+        file=<.csv|.xlsx>, dry_run=true|false, chunk_size=<int>
+        Rows are upserted on (employee, week_number, year, evaluation_type).
+        Chunks commit as they go: if the import stops midway the response is
+        207 with the committed counts and `aborted` (first row not imported).
+        """
+        role = getattr(request.user, "role", "").lower()
+        if role not in ["admin", "manager"]:
+            return Response(
+                {"error": "Only Admin or Manager can import evaluations."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "Upload a file in the 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ext = os.path.splitext(upload.name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            return Response(
+                {"error": f"Unsupported file type '{ext}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_size = getattr(settings, "MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+        if upload.size > max_size:
+            return Response(
+                {"error": f"File exceeds the {max_size // (1024 * 1024)} MB upload limit."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ["1", "true", "yes"]
+        try:
+            chunk_size = int(request.data.get("chunk_size") or getattr(settings, "PERFORMANCE_IMPORT_CHUNK_SIZE", 1000))
+        except (TypeError, ValueError):
+            return Response({"error": "chunk_size must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = EvaluationImporter(chunk_size=chunk_size, dry_run=dry_run, evaluator=request.user)
+        try:
+            stats = importer.run(upload.file, upload.name)
+        except Exception as exc:
+            logger.exception("Error importing performance evaluations: %s", exc)
+            return Response(
+                {"error": "The file could not be imported.", "details": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        aborted = stats["aborted"]
+        if aborted and not stats["chunks"]:
+            return Response(
+                {"error": "The file could not be imported.", "details": aborted["error"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        logger.info(
+            "[EvaluationImport] %s by %s | created=%s updated=%s failed=%s | aborted=%s",
+            upload.name, getattr(request.user, "emp_id", request.user),
+            stats["created"], stats["updated"], stats["failed"], bool(aborted),
+        )
+        verb = "validated" if dry_run else "imported"
+        message = f"{stats['created'] + stats['updated']} evaluation(s) {verb}, {stats['failed']} failed."
+        if aborted:
+            # Earlier chunks are committed: report them with where the import stopped
+            message += f" Import stopped at row {aborted['first_unimported_row']}; later rows were not {verb}."
+        return Response(
+            {"message": message, **stats},
+            status=status.HTTP_207_MULTI_STATUS if aborted else status.HTTP_200_OK,
+        )
+
 
 # ===========================================================
 # GET PERFORMANCE RECORDS BY EMPLOYEE ID
@@ -174,7 +311,12 @@ class EmployeePerformanceByIdView(APIView):
 # PERFORMANCE SUMMARY (Admin / Manager Dashboard)
 # ===========================================================
 class PerformanceSummaryView(APIView):
-    """Weekly summary of departments and leaderboard."""
+    """
+    Weekly summary of departments and leaderboard.
+    Served from the weekly rollups; ?week=&year= pick a week (default: latest).
+    ?include_rankings=true adds the top 10 of the materialized leaderboard
+    (?evaluation_type=, default Manager).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -182,71 +324,107 @@ class PerformanceSummaryView(APIView):
         if role not in ["admin", "manager"]:
             return Response({"error": "Access denied."}, status=status.HTTP_403_FORBIDDEN)
 
-        latest_year = PerformanceEvaluation.objects.aggregate(max_year=Max("year"))["max_year"]
-        if not latest_year:
+        rollup, error = _weekly_rollup_from_params(request)
+        if error:
+            return error
+        if not rollup:
             return Response({"message": "No performance data yet."}, status=status.HTTP_200_OK)
 
-        latest_week = PerformanceEvaluation.objects.filter(year=latest_year).aggregate(max_week=Max("week_number"))[
-            "max_week"
-        ]
-        if not latest_week:
-            return Response({"message": "No weekly data found."}, status=status.HTTP_200_OK)
-
-        qs = PerformanceEvaluation.objects.filter(year=latest_year, week_number=latest_week).select_related(
-            "employee__user", "department"
-        )
-
-        overall_avg = round(qs.aggregate(Avg("average_score"))["average_score__avg"] or 0, 2)
-        dept_summary = qs.values("department__name").annotate(avg_score=Avg("average_score")).order_by("-avg_score")
-
         departments = [
-            {"department_name": d["department__name"] or "N/A", "average_score": round(d["avg_score"], 2)}
-            for d in dept_summary
+            {"department_name": d.department.name, "average_score": d.average_score}
+            for d in DepartmentWeekRollup.objects.filter(week_number=rollup.week_number, year=rollup.year)
+            .select_related("department")
+            .order_by("-average_score")
         ]
 
-        top_3 = qs.order_by("-average_score")[:3]
-        weak_3 = qs.order_by("average_score")[:3]
-
-        top_serialized = PerformanceRankSerializer(top_3, many=True).data
-        weak_serialized = PerformanceRankSerializer(weak_3, many=True).data
+        top_ids = [e["id"] for e in rollup.top_evaluations[:3]]
+        weak_ids = [e["id"] for e in rollup.bottom_evaluations[:3]]
+        evaluations = _evaluations_by_id(top_ids + weak_ids)
 
         response = {
-            "evaluation_period": f"Week {latest_week}, {latest_year}",
-            "overall_average": overall_avg,
+            "evaluation_period": f"Week {rollup.week_number}, {rollup.year}",
+            "overall_average": rollup.average_score,
             "department_summary": departments,
-            "top_3": top_serialized,
-            "weak_3": weak_serialized,
+            "top_3": PerformanceRankSerializer([evaluations[i] for i in top_ids if i in evaluations], many=True).data,
+            "weak_3": PerformanceRankSerializer([evaluations[i] for i in weak_ids if i in evaluations], many=True).data,
         }
 
         if request.query_params.get("include_rankings", "false").lower() == "true":
-            ranked_qs = qs.annotate(rank_position=Window(expression=Rank(), order_by=F("average_score").desc()))
-            leaderboard = PerformanceRankSerializer(ranked_qs[:10], many=True).data
-            response["leaderboard"] = leaderboard
+            # Served from the materialized leaderboard (org rank per evaluation type)
+            entries = (
+                LeaderboardEntry.objects.filter(
+                    year=rollup.year,
+                    week_number=rollup.week_number,
+                    evaluation_type=request.query_params.get("evaluation_type", "Manager"),
+                )
+                .select_related("employee__user", "department")
+                .order_by("org_rank")
+            )
+            response["leaderboard"] = LeaderboardEntrySerializer(entries[:10], many=True).data
 
         return Response(response, status=status.HTTP_200_OK)
 
 
+def _weekly_rollup_from_params(request):
+    """Resolve ?week=&year= to a WeeklyRollup (latest week when omitted). Returns (rollup, error_response)."""
+    week = request.query_params.get("week")
+    year = request.query_params.get("year")
+    if not week and not year:
+        return latest_weekly_rollup(), None
+    try:
+        week = int(week)
+        year = int(year)
+    except (TypeError, ValueError):
+        return None, Response(
+            {"error": "Provide both 'week' and 'year' as integers."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return WeeklyRollup.objects.filter(week_number=week, year=year).first(), None
+
+
+def _evaluations_by_id(ids):
+    """Load the few evaluations referenced by a rollup's top/bottom lists in one query."""
+    if not ids:
+        return {}
+    return PerformanceEvaluation.objects.select_related("employee__user", "department").in_bulk(ids)
+
+
 # ===========================================================
 # EMPLOYEE DASHBOARD (Self Performance Trend)
 # ===========================================================
+class TrendPagination(PageNumberPagination):
+    page_size = 12
+    page_size_query_param = "page_size"
+    max_page_size = 52
+
+
 class EmployeeDashboardView(APIView):
-    """Displays logged-in employee’s personal performance trend."""
+    """
+    Displays logged-in employee’s personal performance trend.
+    Headline numbers come from EmployeePerformanceStats; the trend is a
+    paginated window of weeks, newest first (?page=&page_size=).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
         try:
-            employee = Employee.objects.select_related("user").get(user=user)
+            employee = Employee.objects.select_related("user", "performance_stats").get(user=user)
         except Employee.DoesNotExist:
             return Response({"error": "Employee profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        records = PerformanceEvaluation.objects.filter(employee=employee).order_by("-review_date")
-        if not records.exists():
+        stats = getattr(employee, "performance_stats", None)
+        if not stats or not stats.evaluation_count:
             return Response({"message": "No performance data found."}, status=status.HTTP_200_OK)
 
-        avg_score = round(records.aggregate(Avg("average_score"))["average_score__avg"] or 0, 2)
-        best = records.order_by("-average_score").first()
-        serializer = PerformanceDashboardSerializer(records, many=True)
+        records = (
+            PerformanceEvaluation.objects.filter(employee=employee)
+            .select_related("employee__user", "employee__manager__user", "department")
+            .order_by("-year", "-week_number", "-review_date")
+        )
+        paginator = TrendPagination()
+        page = paginator.paginate_queryset(records, request, view=self)
+        serializer = PerformanceDashboardSerializer(page, many=True)
 
         return Response(
             {
@@ -254,13 +432,28 @@ class EmployeeDashboardView(APIView):
                     "emp_id": user.emp_id,
                     "employee_name": f"{user.first_name} {user.last_name}".strip(),
                 },
-                "overall_average": avg_score,
+                "overall_average": stats.average_score,
+                "evaluation_count": stats.evaluation_count,
+                "rolling_4_week_average": stats.rolling_4_week_average,
+                "rolling_12_week_average": stats.rolling_12_week_average,
                 "best_week": {
-                    "evaluation_period": best.evaluation_period,
-                    "average_score": best.average_score,
+                    "evaluation_period": stats.best_period,
+                    "average_score": stats.best_score,
                 },
-                "trend_data": list(records.values("week_number", "average_score").order_by("week_number")),
+                "latest_week": {
+                    "evaluation_period": stats.latest_period,
+                    "average_score": stats.latest_score,
+                },
+                "trend_data": [
+                    {"week_number": r.week_number, "year": r.year, "average_score": r.average_score}
+                    for r in reversed(page)
+                ],
                 "evaluations": serializer.data,
+                "pagination": {
+                    "count": paginator.page.paginator.count,
+                    "next": paginator.get_next_link(),
+                    "previous": paginator.get_previous_link(),
+                },
             },
             status=status.HTTP_200_OK,
         )
@@ -314,75 +507,57 @@ class EmployeePerformanceView(APIView):
 # ===========================================================
 class PerformanceDashboardView(APIView):
     """
-    GET /api/performance/dashboard/
-    Returns top performers, weak performers, and department-level averages.
+    GET /api/performance/dashboard/?week=41&year=2025
+    Returns top performers, weak performers, and department-level averages
+    for one week (default: latest), served from the weekly rollups.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         try:
-            evaluations = PerformanceEvaluation.objects.select_related("employee__user", "department")
-            if not evaluations.exists():
+            rollup, error = _weekly_rollup_from_params(request)
+            if error:
+                return error
+            if not rollup:
                 return Response({"message": "No performance data available."}, status=status.HTTP_200_OK)
 
-            total_employees = evaluations.values("employee").distinct().count()
             total_departments = Department.objects.filter(is_active=True).count()
-            org_avg = round(evaluations.aggregate(avg=Avg("average_score"))["avg"] or 0, 2)
 
-            # Department averages
-            dept_scores = (
-                evaluations.values("department__name")
-                .annotate(avg_score=Avg("average_score"))
-                .order_by("-avg_score")
-            )
             department_average_scores = [
-                {
-                    "department": d["department__name"],
-                    "avg_score": round(d["avg_score"], 2) if d["avg_score"] else 0,
-                }
-                for d in dept_scores
-                if d["department__name"]
+                {"department": d["department__name"], "avg_score": d["average_score"]}
+                for d in DepartmentWeekRollup.objects.filter(week_number=rollup.week_number, year=rollup.year)
+                .values("department__name", "average_score")
+                .order_by("-average_score")
             ]
 
-            # Top and weak performers
-            employee_scores = (
-                evaluations.values(
-                    "employee__user__emp_id",
-                    "employee__user__first_name",
-                    "employee__user__last_name",
-                    "department__name",
-                )
-                .annotate(avg_score=Avg("average_score"))
-                .order_by("-avg_score")
-            )
-
-            top_3_employees = [
-                {
-                    "emp_id": e["employee__user__emp_id"],
-                    "name": f"{e['employee__user__first_name']} {e['employee__user__last_name']}".strip(),
-                    "department": e["department__name"],
-                    "average_score": round(e["avg_score"], 2),
-                }
-                for e in employee_scores[:3]
-            ]
-
-            weak_3_employees = [
-                {
-                    "emp_id": e["employee__user__emp_id"],
-                    "name": f"{e['employee__user__first_name']} {e['employee__user__last_name']}".strip(),
-                    "department": e["department__name"],
-                    "average_score": round(e["avg_score"], 2),
-                }
-                for e in employee_scores.reverse()[:3]
-            ]
+            # Top and weak performers (one entry per employee, scored by their weekly average)
+            top = rollup.top_evaluations[:3]
+            weak = rollup.bottom_evaluations[:3]
+            evaluations = _evaluations_by_id([e["id"] for e in top + weak])
+
+            def performers(entries):
+                result = []
+                for entry in entries:
+                    evaluation = evaluations.get(entry["id"])
+                    if not evaluation:
+                        continue
+                    u = evaluation.employee.user
+                    result.append({
+                        "emp_id": u.emp_id,
+                        "name": f"{u.first_name} {u.last_name}".strip(),
+                        "department": getattr(evaluation.department, "name", None),
+                        "average_score": entry["average_score"],
+                    })
+                return result
 
             return Response(
                 {
-                    "organization_average_score": org_avg,
+                    "evaluation_period": f"Week {rollup.week_number}, {rollup.year}",
+                    "organization_average_score": rollup.average_score,
                     "total_departments": total_departments,
-                    "total_employees": total_employees,
-                    "top_3_employees": top_3_employees,
-                    "weak_3_employees": weak_3_employees,
+                    "total_employees": rollup.employee_count,
+                    "top_3_employees": performers(top),
+                    "weak_3_employees": performers(weak),
                     "department_average_scores": department_average_scores,
                 },
                 status=status.HTTP_200_OK,
@@ -390,3 +565,67 @@ class PerformanceDashboardView(APIView):
         except Exception as e:
             logger.exception("Error generating performance dashboard: %s", e)
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ===========================================================
+# LEADERBOARD (Materialized department / organization ranks)
+# ===========================================================
+LEADERBOARD_MAX_LIMIT = 500
+
+
+class LeaderboardView(APIView):
+    """
+    GET /api/performance/leaderboard/?week=41&year=2025&evaluation_type=Manager&department=ENG01&limit=50
+    Reads the materialized leaderboard table maintained by the ranking engine.
+    Defaults to the latest ranked week for the evaluation type.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        role = getattr(request.user, "role", "").lower()
+        if role not in ["admin", "manager"]:
+            return Response({"error": "Access denied."}, status=status.HTTP_403_FORBIDDEN)
+
+        evaluation_type = request.query_params.get("evaluation_type", "Manager")
+        week = request.query_params.get("week")
+        year = request.query_params.get("year")
+        department = request.query_params.get("department")
+
+        try:
+            limit = int(request.query_params.get("limit", 50))
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), LEADERBOARD_MAX_LIMIT)
+
+        try:
+            week = int(week) if week else None
+            year = int(year) if year else None
+        except ValueError:
+            return Response({"error": "week and year must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if week is not None and not 1 <= week <= 53:
+            return Response({"error": "week must be between 1 and 53."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = LeaderboardEntry.objects.filter(evaluation_type=evaluation_type)
+        if not (week and year):
+            latest = qs.order_by("-year", "-week_number").values("year", "week_number").first()
+            if not latest:
+                return Response({"message": "No ranked performance data yet."}, status=status.HTTP_200_OK)
+            week, year = latest["week_number"], latest["year"]
+
+        qs = qs.filter(week_number=week, year=year).select_related("employee__user", "department")
+        if department:
+            qs = qs.filter(department__code__iexact=department).order_by("department_rank")
+        else:
+            qs = qs.order_by("org_rank")
+
+        entries = LeaderboardEntrySerializer(qs[:limit], many=True).data
+        return Response(
+            {
+                "evaluation_period": f"Week {week}, {year}",
+                "evaluation_type": evaluation_type,
+                "department": department,
+                "count": len(entries),
+                "leaderboard": entries,
+            },
+            status=status.HTTP_200_OK,
+        )
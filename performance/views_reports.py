@@ -10,7 +10,7 @@ from django.utils import timezone
 from .models import PerformanceEvaluation
 from employee.models import Employee, Department
 from .serializers import PerformanceEvaluationSerializer
-from .utils_export import generate_excel_report, generate_pdf_report
+from .utils_export import generate_excel_report, cached_pdf_report
 
 
 # ===========================================================
@@ -83,4 +83,4 @@ class EmployeePerformancePDFView(generics.GenericAPIView):
     def get(self, request, emp_id):
         employee = get_object_or_404(Employee, user__emp_id__iexact=emp_id)
         evaluations = PerformanceEvaluation.objects.filter(employee=employee).order_by("-year", "-week_number")
-        return generate_pdf_report(employee, evaluations)
+        return cached_pdf_report(employee, evaluations)
@@ -12,7 +12,7 @@
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import CachedReport
+from .models import CachedReport, ReportJob
 
 
 @admin.register(CachedReport)
@@ -33,6 +33,8 @@ class CachedReportAdmin(admin.ModelAdmin):
         "get_department_name",
         "get_generated_by",
         "is_active",
+        "row_count",
+        "payload_bytes",
         "generated_at",
         "file_link",
     )
@@ -54,7 +56,12 @@ class CachedReportAdmin(admin.ModelAdmin):
     # ------------------------------------------------------
     # 🔹 Read-only and Protected Fields
     # ------------------------------------------------------
-    readonly_fields = ("generated_at", "file_path")
+    readonly_fields = ("generated_at", "file_path", "payload_encoding", "row_count", "payload_bytes")
+    # Payload columns are written through CachedReport.payload only
+    exclude = ("payload_json", "payload_blob")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("payload_json", "payload_blob")
 
     # ------------------------------------------------------
     # 🔹 Custom Display Methods
@@ -130,3 +137,17 @@ class CachedReportAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         """Restrict delete access to superusers."""
         return request.user.is_superuser
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    """Read-only view of background report jobs."""
+
+    list_display = ("id", "job_type", "export_format", "status", "progress", "requested_by", "created_at", "finished_at")
+    list_filter = ("status", "job_type", "export_format")
+    ordering = ("-created_at",)
+    list_per_page = 25
+    readonly_fields = [f.name for f in ReportJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -13,3 +13,6 @@ class ReportsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reports"
     verbose_name = "Reports & Analytics"
+
+    def ready(self):
+        import reports.signals  # noqa: F401  (cached report invalidation)
@@ -0,0 +1,250 @@
+# ===========================================================
+# reports/builders.py
+# ===========================================================
+# Purpose:
+# Shared row builders for report endpoints, so the JSON views
+# and the Excel exports compute identical numbers the same way.
+#
+# • monthly_report_rows — avg score, best week and best-week
+#   score for every employee of a month in one windowed query,
+#   plus one batched feedback-average query
+# • iter_* variants — the same rows streamed from a server-side
+#   iterator, with feedback averages fetched per chunk, so
+#   memory stays constant for streaming exports
+# • department_report_rows — one department's ranked week
+# • *_excel_sheets — the same rows as write-only Excel sheets
+# ===========================================================
+
+from django.conf import settings
+from django.db.models import Avg, F, Window
+from django.db.models.functions import Rank, RowNumber
+from datetime import date, timedelta
+from itertools import groupby, islice
+from operator import itemgetter
+import calendar
+
+from performance.models import PerformanceEvaluation
+from feedback.aggregates import feedback_average_map
+from reports.utils.excel_export import SheetSpec
+
+
+def month_bounds(month, year):
+    """First and last day of a calendar month."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def week_bounds(week_number, year):
+    """Monday and Sunday of an ISO week."""
+    start = date.fromisocalendar(year, week_number, 1)
+    return start, start + timedelta(days=6)
+
+
+def stream_chunk_size():
+    return getattr(settings, "REPORT_STREAM_CHUNK_SIZE", 2000)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _with_feedback(rows, chunk_size, start_date=None, end_date=None):
+    """Attach feedback_avg to each row dict, one batched feedback query per chunk."""
+    for chunk in _chunks(rows, chunk_size):
+        feedback_map = feedback_average_map(
+            {r["employee_id"] for r in chunk}, start_date=start_date, end_date=end_date
+        )
+        for r in chunk:
+            r["feedback_avg"] = feedback_map.get(r["employee_id"], 0.0)
+            yield r
+
+
+# ===========================================================
+# WEEKLY / DEPARTMENT
+# ===========================================================
+WEEKLY_COLUMNS = [
+    "emp_id", "employee_full_name", "department", "total_score", "average_score",
+    "feedback_avg", "week_number", "year", "rank", "remarks",
+]
+
+
+def iter_weekly_report_rows(evaluations, chunk_size=None, columns=WEEKLY_COLUMNS):
+    """
+    Stream weekly report rows for an evaluation queryset (one week, or a
+    whole year). Rank is by total_score within each week, as in the
+    weekly report; rows are ordered by week, then rank. Feedback
+    averages are the employee's overall average, as on the printed
+    report and bulk PDFs. `columns` may also name employee_id
+    and evaluation_type.
+    """
+    chunk_size = chunk_size or stream_chunk_size()
+    rows = (
+        evaluations.annotate(
+            computed_rank=Window(
+                Rank(), partition_by=[F("year"), F("week_number")], order_by=F("total_score").desc()
+            )
+        )
+        .order_by("year", "week_number", "computed_rank", "employee__user__emp_id")
+        .values_list(
+            "employee_id", "employee__user__emp_id", "employee__user__first_name",
+            "employee__user__last_name", "department__name", "total_score", "average_score",
+            "week_number", "year", "computed_rank", "remarks", "evaluation_type",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    dicts = (
+        {
+            "employee_id": employee_id,
+            "emp_id": emp_id,
+            "employee_full_name": f"{first_name} {last_name}".strip(),
+            "department": department or "-",
+            "total_score": float(total_score),
+            "average_score": float(average_score),
+            "week_number": week_number,
+            "year": year,
+            "rank": int(rank),
+            "remarks": remarks or "",
+            "evaluation_type": evaluation_type,
+        }
+        for employee_id, emp_id, first_name, last_name, department, total_score, average_score,
+        week_number, year, rank, remarks, evaluation_type in rows
+    )
+    for row in _with_feedback(dicts, chunk_size):
+        yield {column: row[column] for column in columns}
+
+
+DEPARTMENT_COLUMNS = [
+    "department_name", "emp_id", "employee_full_name", "total_score",
+    "average_score", "feedback_avg", "rank", "remarks",
+]
+
+
+def department_evaluations(department, week_number, year):
+    return PerformanceEvaluation.objects.filter(employee__department=department, week_number=week_number, year=year)
+
+
+def department_report_rows(department, week_number, year, rows=None):
+    """
+    Department-wise weekly report rows: the department's employees ranked
+    by total_score for the week, with their overall feedback averages.
+    rows: weekly report rows of the department-week, if already computed.
+    """
+    rows = iter_weekly_report_rows(department_evaluations(department, week_number, year)) if rows is None else rows
+    return [
+        {"department_name": department.name, **{column: row[column] for column in DEPARTMENT_COLUMNS[1:]}}
+        for row in rows
+    ]
+
+
+# ===========================================================
+# MONTHLY
+# ===========================================================
+MONTHLY_COLUMNS = [
+    "emp_id", "employee_full_name", "department", "month", "year",
+    "avg_score", "feedback_avg", "best_week", "best_week_score",
+]
+
+
+def monthly_report_rows(month, year):
+    """One row per evaluated employee for the calendar month, ordered by emp_id."""
+    return list(iter_monthly_report_rows(month, year))
+
+
+def iter_monthly_report_rows(month, year, chunk_size=None, columns=MONTHLY_COLUMNS):
+    """
+    Stream the monthly report rows.
+
+    Evaluations are selected with a review_date range (index friendly);
+    the per-employee average and best week come from window functions
+    over the same partition, so the whole month is a single SELECT.
+    """
+    chunk_size = chunk_size or stream_chunk_size()
+    month_start, month_end = month_bounds(month, year)
+
+    rows = (
+        PerformanceEvaluation.objects.filter(review_date__gte=month_start, review_date__lte=month_end)
+        .annotate(
+            month_avg=Window(Avg("average_score"), partition_by=[F("employee_id")]),
+            best_position=Window(
+                RowNumber(),
+                partition_by=[F("employee_id")],
+                order_by=[F("average_score").desc(), F("week_number").asc()],
+            ),
+        )
+        .filter(best_position=1)
+        .order_by("employee__user__emp_id")
+        .values_list(
+            "employee_id", "employee__user__emp_id", "employee__user__first_name",
+            "employee__user__last_name", "employee__department__name",
+            "month_avg", "week_number", "average_score",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    dicts = (
+        {
+            "employee_id": employee_id,
+            "emp_id": emp_id,
+            "employee_full_name": f"{first_name} {last_name}".strip(),
+            "department": department or "-",
+            "month": month,
+            "year": year,
+            "avg_score": round(month_avg, 2),
+            "best_week": week_number,
+            "best_week_score": average_score,
+        }
+        for employee_id, emp_id, first_name, last_name, department, month_avg, week_number, average_score in rows
+    )
+    for row in _with_feedback(dicts, chunk_size, start_date=month_start, end_date=month_end):
+        yield {column: row[column] for column in columns}
+
+
+# ===========================================================
+# EXCEL SHEETS
+# ===========================================================
+WEEKLY_EXCEL_COLUMNS = [
+    ("emp_id", "Emp ID"),
+    ("employee_full_name", "Employee Name"),
+    ("department", "Department"),
+    ("total_score", "Total Score"),
+    ("average_score", "Average Score"),
+    ("feedback_avg", "Feedback Avg"),
+    ("rank", "Rank"),
+    ("remarks", "Remarks"),
+]
+
+MONTHLY_EXCEL_COLUMNS = [
+    ("emp_id", "Emp ID"),
+    ("employee_full_name", "Employee Name"),
+    ("department", "Department"),
+    ("avg_score", "Average Score"),
+    ("feedback_avg", "Feedback Avg"),
+    ("best_week", "Best Week"),
+    ("best_week_score", "Best Week Score"),
+]
+
+
+def _excel_rows(rows, columns):
+    keys = [key for key, _ in columns]
+    return ([row[key] for key in keys] for row in rows)
+
+
+def weekly_excel_sheets(evaluations, rows=None):
+    """One SheetSpec per week of the queryset (rows arrive ordered by week, so each is one group)."""
+    headers = [title for _, title in WEEKLY_EXCEL_COLUMNS]
+    rows = iter_weekly_report_rows(evaluations) if rows is None else rows
+    return (
+        SheetSpec(f"Week_{week_number}_{year}", headers, _excel_rows(group, WEEKLY_EXCEL_COLUMNS))
+        for (week_number, year), group in groupby(rows, key=itemgetter("week_number", "year"))
+    )
+
+
+def monthly_excel_sheet(month, year, rows=None):
+    headers = [title for _, title in MONTHLY_EXCEL_COLUMNS]
+    rows = iter_monthly_report_rows(month, year) if rows is None else rows
+    return SheetSpec(
+        f"Month_{month}_{year}", headers, _excel_rows(rows, MONTHLY_EXCEL_COLUMNS), header_color="70AD47"
+    )
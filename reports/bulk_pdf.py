@@ -0,0 +1,106 @@
+# ===========================================================
+# reports/bulk_pdf.py
+# ===========================================================
+# Purpose:
+# Weekly performance PDFs for a whole department (or the whole
+# organization) in one go.
+#
+# • bulk_report_data() — every evaluated employee of the week with
+#   their evaluations (from the shared report dataset) and
+#   feedback average
+# • render_reports() — renders the PDFs in a process pool across
+#   CPU cores (REPORT_PDF_WORKERS); small batches stay in-process
+#   where the pool start-up would cost more than it saves. Workers
+#   are spawned, not forked: the pool is started from report job
+#   threads, and forking a threaded process can copy held locks
+# • write_zip() — one ZIP of per-employee PDFs; a single merged
+#   PDF comes from pdf_generator.render_merged_pdf()
+# ===========================================================
+
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.utils import timezone
+from operator import itemgetter
+import multiprocessing
+import os
+import zipfile
+
+from feedback.aggregates import feedback_average_map
+from reports.utils.pdf_generator import employee_report_data, render_performance_pdf
+from .dataset import department_dataset, weekly_dataset
+
+
+def pdf_workers():
+    return getattr(settings, "REPORT_PDF_WORKERS", None) or os.cpu_count() or 1
+
+
+def parallel_threshold():
+    return getattr(settings, "REPORT_PDF_PARALLEL_MIN", 8)
+
+
+def bulk_report_data(week, year, department=None):
+    """
+    Renderer input for every employee evaluated in the week, ordered by emp_id.
+    department=None covers the whole organization. Rows come from the shared
+    report dataset; feedback averages match the single-employee print view.
+    """
+    dataset = weekly_dataset(week, year) if department is None else department_dataset(department, week, year)
+
+    employees = {}
+    for row in sorted(
+        dataset.rows(["employee_id", "emp_id", "employee_full_name", "department", "evaluation_type", "average_score"]),
+        key=itemgetter("emp_id", "evaluation_type"),
+    ):
+        entry = employees.setdefault(row["employee_id"], {
+            "emp_id": row["emp_id"],
+            "full_name": row["employee_full_name"],
+            "department": row["department"],
+            "evaluations": [],
+        })
+        entry["evaluations"].append((row["evaluation_type"], row["average_score"], "-", "-"))
+
+    feedback_map = feedback_average_map(employees.keys())
+    generated_on = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        employee_report_data(
+            entry["emp_id"], entry["full_name"], entry["department"], entry["evaluations"],
+            week=f"Week {week}, {year}", feedback_avg=feedback_map[employee_id], generated_on=generated_on,
+        )
+        for employee_id, entry in employees.items()
+    ]
+
+
+def render_reports(reports, workers=None):
+    """
+    Yield (report, pdf_bytes) in input order. Uses a process pool of
+    `workers` processes when the batch is large enough to benefit.
+    """
+    workers = workers or pdf_workers()
+    if workers <= 1 or len(reports) < parallel_threshold():
+        for data in reports:
+            yield data, render_performance_pdf(data)
+        return
+
+    chunksize = max(1, len(reports) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(reports)), mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        yield from zip(reports, pool.map(render_performance_pdf, reports, chunksize=chunksize))
+
+
+def report_filename(data, week, year):
+    return f"Performance_Report_{data['emp_id']}_Week{week}_{year}.pdf"
+
+
+def write_zip(reports, fileobj, week, year, workers=None, on_rendered=None):
+    """Write one PDF per report into a ZIP; on_rendered(count) is called after each file."""
+    count = 0
+    # PDFs are already compressed — storing them avoids a second, useless deflate pass
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        for data, content in render_reports(reports, workers=workers):
+            archive.writestr(report_filename(data, week, year), content)
+            count += 1
+            if on_rendered:
+                on_rendered(count)
+    return count
+
@@ -0,0 +1,183 @@
+# ===========================================================
+# reports/cache.py
+# ===========================================================
+# Purpose:
+# Read-through CachedReport serving for the report endpoints.
+#
+# • fresh_report() — the cached JSON payload of a period, if it
+#   has not been invalidated and is younger than
+#   REPORT_CACHE_TTL_SECONDS (safety net; None = no expiry)
+# • store_report() — write/refresh the payload after a miss
+# • invalidate_*() — stamp invalidated_at on the entries of the
+#   periods (and departments) touched by evaluation / feedback
+#   changes, and of manager reports when a reporting line
+#   changes; called from reports/signals.py
+# ===========================================================
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from datetime import date, timedelta
+import logging
+
+from employee.models import Employee
+from performance.models import PerformanceEvaluation
+from .models import CachedReport
+
+logger = logging.getLogger(__name__)
+
+
+STORE_ATTEMPTS = 3
+
+
+def cache_ttl():
+    return getattr(settings, "REPORT_CACHE_TTL_SECONDS", 24 * 3600)
+
+
+# ===========================================================
+# READ / WRITE
+# ===========================================================
+def fresh_report(report_type, year, **period):
+    """Return the fresh JSON CachedReport of a period (week_number= / month= / department=), or None."""
+    qs = CachedReport.objects.filter(
+        report_type=report_type,
+        export_format="json",
+        year=year,
+        is_active=True,
+        invalidated_at__isnull=True,
+        **period,
+    )
+    ttl = cache_ttl()
+    if ttl is not None:
+        qs = qs.filter(generated_at__gte=timezone.now() - timedelta(seconds=ttl))
+    return qs.order_by("-generated_at").first()
+
+
+def store_report(report_type, year, payload, user=None, **period):
+    """
+    Upsert the JSON entry of a period, keyed on its non-null period_key.
+    Two concurrent misses may both try to insert it: the loser's insert hits
+    the unique constraint and is retried as an update of the winner's row.
+    """
+    defaults = {"payload": payload, "generated_by": user, "invalidated_at": None, "is_active": True}
+    for attempt in range(STORE_ATTEMPTS):
+        try:
+            report, _ = CachedReport.objects.update_or_create(
+                report_type=report_type,
+                export_format="json",
+                period_key=CachedReport.key_for(year, **period),
+                defaults=defaults,
+                create_defaults={**defaults, "year": year, **period},
+            )
+            return report
+        except (IntegrityError, ValidationError):
+            # full_clean() reports a row committed meanwhile as a ValidationError
+            if attempt == STORE_ATTEMPTS - 1:
+                raise
+            logger.debug("[ReportCache] Concurrent store of %s %s %s; retrying as update.", report_type, year, period)
+
+
+def cache_info(report=None):
+    """Cache block for responses: hit/miss and the age of the entry served."""
+    if report is None:
+        return {"hit": False, "generated_at": None, "age_seconds": 0}
+    return {
+        "hit": True,
+        "generated_at": report.generated_at,
+        "age_seconds": int((timezone.now() - report.generated_at).total_seconds()),
+    }
+
+
+def with_cache_headers(response, info):
+    response["X-Report-Cache"] = "HIT" if info["hit"] else "MISS"
+    response["Age"] = str(info["age_seconds"])
+    return response
+
+
+# ===========================================================
+# INVALIDATION
+# ===========================================================
+def week_months(week_number, year):
+    """(year, month) pairs an ISO week overlaps (one or two)."""
+    start = date.fromisocalendar(year, week_number, 1)
+    end = start + timedelta(days=6)
+    return {(start.year, start.month), (end.year, end.month)}
+
+
+def invalidate_periods(department_weeks=(), department_months=()):
+    """
+    Mark cached reports stale for the given periods.
+
+    department_weeks:  (department_id, week_number, year) — weekly/manager
+                       reports of the week, department reports of that
+                       department-week, monthly reports of the months it spans;
+                       a None department_id (evaluations without one) stales
+                       every department report of the week
+    department_months: (department_id, year, month) — monthly reports
+    One UPDATE per distinct week and month. Returns the number of entries invalidated.
+    """
+    weeks, months = {}, set()
+    for department_id, week_number, year in department_weeks:
+        weeks.setdefault((week_number, year), set()).add(department_id)
+        months |= week_months(week_number, year)
+    months |= {(year, month) for _, year, month in department_months}
+
+    stale = CachedReport.objects.filter(invalidated_at__isnull=True)
+    now = timezone.now()
+    count = 0
+    for (week_number, year), department_ids in sorted(weeks.items(), key=lambda item: item[0]):
+        departments = Q(report_type="department")
+        if None not in department_ids:
+            departments &= Q(department_id__in=department_ids)
+        count += stale.filter(year=year, week_number=week_number).filter(
+            Q(report_type__in=["weekly", "manager"]) | departments
+        ).update(invalidated_at=now)
+    for year, month in sorted(months):
+        count += stale.filter(report_type="monthly", year=year, month=month).update(invalidated_at=now)
+
+    if count:
+        logger.debug("[ReportCache] Invalidated %s cached report(s).", count)
+    return count
+
+
+def invalidate_manager_reports():
+    """A reporting line changed: every cached manager report may have a different team now."""
+    return CachedReport.objects.filter(report_type="manager", invalidated_at__isnull=True).update(
+        invalidated_at=timezone.now()
+    )
+
+
+def invalidate_for_feedback(changes):
+    """
+    Invalidate what changed feedback feeds into. `changes` are
+    (employee_id, feedback_date) pairs of created / edited / deleted feedback.
+
+    Weekly, manager and department reports show each employee's overall
+    feedback average, so every week the employees were evaluated in is stale
+    (one UPDATE); monthly reports average the month's feedback, so only the
+    months of the feedback dates are.
+    """
+    employee_ids, months = set(), set()
+    for employee_id, day in changes:
+        if employee_id:
+            employee_ids.add(employee_id)
+        if day:
+            day = date.fromisoformat(day) if isinstance(day, str) else day
+            months.add((None, day.year, day.month))
+    if not employee_ids:
+        return invalidate_periods(department_months=months)
+
+    department_ids = set(
+        Employee.objects.filter(pk__in=employee_ids, department__isnull=False).values_list("department_id", flat=True)
+    )
+    evaluated = PerformanceEvaluation.objects.filter(
+        employee_id__in=employee_ids, week_number=OuterRef("week_number"), year=OuterRef("year")
+    )
+    count = CachedReport.objects.filter(invalidated_at__isnull=True).filter(
+        Q(report_type__in=["weekly", "manager"])
+        | Q(report_type="department", department_id__in=department_ids),
+        Exists(evaluated),
+    ).update(invalidated_at=timezone.now())
+    return count + invalidate_periods(department_months=months)
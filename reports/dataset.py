@@ -0,0 +1,191 @@
+# ===========================================================
+# reports/dataset.py
+# ===========================================================
+# Purpose:
+# One query layer for the weekly / department / monthly row
+# sets, shared by the JSON views, CSV/NDJSON and Excel exports,
+# background jobs and bulk PDFs.
+#
+# • ReportDataset — the rows of one period stored column-wise
+#   (one list per column instead of one dict per row), built
+#   once from the builders' iterators
+# • weekly_dataset / department_dataset / monthly_dataset —
+#   memoized per period in this process, so a period rendered
+#   as JSON, then Excel, then PDF is computed once
+# • Each memoized entry carries a fingerprint (row count and
+#   latest updated_at of the period's evaluations and of the
+#   feedback its averages cover — all feedback of the evaluated
+#   employees for weekly rows, the month's for monthly rows —
+#   a few aggregate queries); a changed fingerprint rebuilds it,
+#   so other processes' writes are picked up too; names are not
+#   fingerprinted, so entries also expire after
+#   REPORT_DATASET_MEMO_SECONDS
+# ===========================================================
+
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import Count, Max
+import threading
+import time
+
+from performance.models import PerformanceEvaluation
+from feedback.aggregates import FEEDBACK_MODELS
+from .builders import (
+    department_evaluations,
+    iter_monthly_report_rows,
+    iter_weekly_report_rows,
+    month_bounds,
+    MONTHLY_COLUMNS,
+    WEEKLY_COLUMNS,
+)
+
+# Kept beyond the public columns for the PDF renderers and department filters
+WEEKLY_DATASET_COLUMNS = ["employee_id", "evaluation_type"] + WEEKLY_COLUMNS
+MONTHLY_DATASET_COLUMNS = ["employee_id"] + MONTHLY_COLUMNS
+
+
+class ReportDataset:
+    """
+    Column-oriented rows of one report period.
+
+    `columns` are all stored columns; rows() yields dicts of
+    `output_columns` (the report's public columns) unless asked for others.
+    """
+
+    __slots__ = ("key", "columns", "output_columns", "fingerprint", "built_at", "_data", "_index")
+
+    def __init__(self, key, columns, rows, output_columns=None, fingerprint=None):
+        self.key = key
+        self.columns = tuple(columns)
+        self.output_columns = tuple(output_columns or columns)
+        self.fingerprint = fingerprint
+        self.built_at = time.monotonic()
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._data = tuple([] for _ in self.columns)
+        appenders = [column.append for column in self._data]
+        for row in rows:
+            for append, name in zip(appenders, self.columns):
+                append(row[name])
+
+    def __len__(self):
+        return len(self._data[0]) if self._data else 0
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def column(self, name):
+        """The values of one column, in row order (do not mutate)."""
+        return self._data[self._index[name]]
+
+    def rows(self, columns=None):
+        """Yield one dict per row with the given (default: output) columns."""
+        names = tuple(columns or self.output_columns)
+        for values in zip(*(self.column(name) for name in names)):
+            yield dict(zip(names, values))
+
+
+# ===========================================================
+# FINGERPRINTS
+# ===========================================================
+def _fingerprint(evaluations, start_date=None, end_date=None, employee_filter=None):
+    """(count, latest updated_at) of the evaluations plus each feedback source in the window (None = all)."""
+    parts = [tuple(evaluations.aggregate(count=Count("id"), latest=Max("updated_at")).values())]
+    for model in FEEDBACK_MODELS:
+        feedback = model.objects.all()
+        if start_date and end_date:
+            feedback = feedback.filter(feedback_date__gte=start_date, feedback_date__lte=end_date)
+        if employee_filter:
+            feedback = feedback.filter(**employee_filter)
+        parts.append(tuple(feedback.aggregate(count=Count("id"), latest=Max("updated_at")).values()))
+    return tuple(parts)
+
+
+# ===========================================================
+# MEMO
+# ===========================================================
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def memo_size():
+    return getattr(settings, "REPORT_DATASET_MEMO_SIZE", 32)
+
+
+def memo_max_age():
+    return getattr(settings, "REPORT_DATASET_MEMO_SECONDS", 300)
+
+
+def _memoized(key, fingerprint, build):
+    """Return the memoized dataset for key if its fingerprint still matches, else build and keep it."""
+    with _memo_lock:
+        dataset = _memo.get(key)
+        if (
+            dataset is not None
+            and dataset.fingerprint == fingerprint
+            and time.monotonic() - dataset.built_at < memo_max_age()
+        ):
+            _memo.move_to_end(key)
+            return dataset
+
+    dataset = build()
+    dataset.fingerprint = fingerprint
+    with _memo_lock:
+        _memo[key] = dataset
+        _memo.move_to_end(key)
+        while len(_memo) > memo_size():
+            _memo.popitem(last=False)
+    return dataset
+
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
+
+
+# ===========================================================
+# DATASETS
+# ===========================================================
+def weekly_dataset(week_number, year):
+    """Every evaluation of the ISO week, ranked organization-wide."""
+    evaluations = PerformanceEvaluation.objects.filter(week_number=week_number, year=year)
+    key = ("weekly", week_number, year)
+    return _memoized(
+        key,
+        _fingerprint(evaluations, employee_filter={"employee__in": evaluations.values("employee_id")}),
+        lambda: ReportDataset(
+            key, WEEKLY_DATASET_COLUMNS,
+            iter_weekly_report_rows(evaluations, columns=WEEKLY_DATASET_COLUMNS),
+            output_columns=WEEKLY_COLUMNS,
+        ),
+    )
+
+
+def department_dataset(department, week_number, year):
+    """The department's evaluations of the ISO week, ranked within the department."""
+    evaluations = department_evaluations(department, week_number, year)
+    key = ("department", department.pk, week_number, year)
+    return _memoized(
+        key,
+        _fingerprint(evaluations, employee_filter={"employee__in": evaluations.values("employee_id")}),
+        lambda: ReportDataset(
+            key, WEEKLY_DATASET_COLUMNS,
+            iter_weekly_report_rows(evaluations, columns=WEEKLY_DATASET_COLUMNS),
+            output_columns=WEEKLY_COLUMNS,
+        ),
+    )
+
+
+def monthly_dataset(month, year):
+    """One row per employee evaluated in the calendar month."""
+    month_start, month_end = month_bounds(month, year)
+    evaluations = PerformanceEvaluation.objects.filter(review_date__gte=month_start, review_date__lte=month_end)
+    key = ("monthly", month, year)
+    return _memoized(
+        key,
+        _fingerprint(evaluations, month_start, month_end),
+        lambda: ReportDataset(
+            key, MONTHLY_DATASET_COLUMNS,
+            iter_monthly_report_rows(month, year, columns=MONTHLY_DATASET_COLUMNS),
+            output_columns=MONTHLY_COLUMNS,
+        ),
+    )
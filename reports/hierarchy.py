@@ -0,0 +1,180 @@
+# ===========================================================
+# reports/hierarchy.py
+# ===========================================================
+# Purpose:
+# Manager-wise weekly report over the whole reporting hierarchy.
+#
+# • One SQL statement: a recursive CTE walks Employee.manager
+#   down from the manager (direct + indirect reports, depth
+#   capped so a cyclic chain cannot loop), then a grouped LEFT
+#   JOIN aggregates each member's evaluations of the week —
+#   count, total, average and every metric average
+# • One query for names, one batched feedback query (overall
+#   averages, as in the weekly report); team
+#   average, score distribution, top/weak members and per-metric
+#   averages are derived from the per-member rows
+# ===========================================================
+
+from django.db import connection
+
+from employee.models import Employee
+from performance.bulk import METRIC_FIELDS
+from performance.models import PerformanceEvaluation
+from performance.rollups import bottom_k, top_k
+from feedback.aggregates import feedback_average_map
+
+MAX_HIERARCHY_DEPTH = 32
+
+# Same bands as the performance serializers' score_category
+SCORE_BANDS = [
+    (90, "Excellent"),
+    (80, "Good"),
+    (70, "Average"),
+    (60, "Below Average"),
+    (0, "Poor"),
+]
+
+
+def score_band(score):
+    for floor, label in SCORE_BANDS:
+        if score >= floor:
+            return label
+    return SCORE_BANDS[-1][1]
+
+
+def _team_cte():
+    """SQL for the `members (employee_id, depth)` CTE; takes (manager_id, max_depth, manager_id) params."""
+    qn = connection.ops.quote_name
+    employee_table = qn(Employee._meta.db_table)
+    manager_col = qn(Employee._meta.get_field("manager").column)
+    return (
+        f"WITH RECURSIVE team (employee_id, depth) AS ("
+        f" SELECT id, 1 FROM {employee_table} WHERE {manager_col} = %s"
+        f" UNION ALL"
+        f" SELECT e.id, team.depth + 1 FROM {employee_table} e"
+        f" INNER JOIN team ON e.{manager_col} = team.employee_id"
+        f" WHERE team.depth < %s"
+        f"), members AS ("
+        f" SELECT employee_id, MIN(depth) AS depth FROM team WHERE employee_id <> %s GROUP BY employee_id"
+        f")"
+    )
+
+
+def team_members(manager_id):
+    """{employee_id: depth} of every direct (depth 1) and indirect report."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _team_cte() + " SELECT employee_id, depth FROM members",
+            [manager_id, MAX_HIERARCHY_DEPTH, manager_id],
+        )
+        return dict(cursor.fetchall())
+
+
+def team_aggregates(manager_id, week_number, year):
+    """
+    One row per team member (evaluated or not) for the week:
+    employee_id, depth, evaluation_count, total_score, average_score, {metric: avg}.
+    """
+    qn = connection.ops.quote_name
+    meta = PerformanceEvaluation._meta
+
+    def column(field):
+        return "pe." + qn(meta.get_field(field).column)
+
+    metric_sql = ", ".join(f"AVG({column(m)})" for m in METRIC_FIELDS)
+    sql = (
+        _team_cte()
+        + f" SELECT members.employee_id, members.depth, COUNT({column('id')}), SUM({column('total_score')}),"
+        f" AVG({column('average_score')}), {metric_sql}"
+        f" FROM members LEFT JOIN {qn(meta.db_table)} pe"
+        f" ON {column('employee')} = members.employee_id"
+        f" AND {column('week_number')} = %s AND {column('year')} = %s"
+        f" GROUP BY members.employee_id, members.depth"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [manager_id, MAX_HIERARCHY_DEPTH, manager_id, week_number, year])
+        return [
+            {
+                "employee_id": employee_id,
+                "depth": depth,
+                "evaluation_count": count,
+                "total_score": float(total or 0),
+                "average_score": float(average or 0),
+                "metrics": dict(zip(METRIC_FIELDS, metrics)),
+            }
+            for employee_id, depth, count, total, average, *metrics in cursor.fetchall()
+        ]
+
+
+def manager_report(manager, week_number, year):
+    """Build the manager report payload for an Employee (the manager) and ISO week."""
+    members = team_aggregates(manager.id, week_number, year)
+    evaluated = [m for m in members if m["evaluation_count"]]
+
+    people = {
+        row["id"]: row
+        for row in Employee.objects.filter(id__in=[m["employee_id"] for m in evaluated]).values(
+            "id", "user__emp_id", "user__first_name", "user__last_name",
+            "department__name", "manager__user__first_name", "manager__user__last_name",
+        )
+    }
+    feedback_map = feedback_average_map(people.keys())
+
+    # Rank within the team by weekly average (ties share a rank)
+    evaluated.sort(key=lambda m: (-m["average_score"], people[m["employee_id"]]["user__emp_id"]))
+    records, previous_score, rank = [], None, 0
+    for position, member in enumerate(evaluated, start=1):
+        if member["average_score"] != previous_score:
+            rank, previous_score = position, member["average_score"]
+        person = people[member["employee_id"]]
+        records.append({
+            "manager_full_name": f"{person['manager__user__first_name'] or ''} {person['manager__user__last_name'] or ''}".strip(),
+            "emp_id": person["user__emp_id"],
+            "employee_full_name": f"{person['user__first_name']} {person['user__last_name']}".strip(),
+            "department": person["department__name"] or "-",
+            "total_score": member["total_score"],
+            "average_score": round(member["average_score"], 2),
+            "feedback_avg": feedback_map.get(member["employee_id"], 0.0),
+            "week_number": week_number,
+            "year": year,
+            "rank": rank,
+            "depth": member["depth"],
+            "evaluation_count": member["evaluation_count"],
+            "remarks": "",
+        })
+
+    # Team-wide figures are weighted by evaluation count, i.e. over all evaluations
+    evaluation_count = sum(m["evaluation_count"] for m in evaluated)
+    team_average = (
+        round(sum(m["average_score"] * m["evaluation_count"] for m in evaluated) / evaluation_count, 2)
+        if evaluation_count else 0.0
+    )
+    metric_averages = {
+        metric: round(
+            sum((m["metrics"][metric] or 0) * m["evaluation_count"] for m in evaluated) / evaluation_count, 2
+        ) if evaluation_count else 0.0
+        for metric in METRIC_FIELDS
+    }
+    distribution = {label: 0 for _, label in SCORE_BANDS}
+    for record in records:
+        distribution[score_band(record["average_score"])] += 1
+
+    return {
+        "manager": {
+            "emp_id": manager.user.emp_id,
+            "full_name": f"{manager.user.first_name} {manager.user.last_name}".strip(),
+            "department": manager.department.name if manager.department else "-",
+        },
+        "evaluation_period": f"Week {week_number}, {year}",
+        "team_size": len(members),
+        "direct_reports": sum(1 for m in members if m["depth"] == 1),
+        "hierarchy_depth": max((m["depth"] for m in members), default=0),
+        "evaluated_members": len(records),
+        "evaluation_count": evaluation_count,
+        "team_average": team_average,
+        "distribution": distribution,
+        "metric_averages": metric_averages,
+        "top_members": records[:top_k()],
+        "weak_members": list(reversed(records[-bottom_k():])) if records else [],
+        "records": records,
+    }
@@ -0,0 +1,243 @@
+# ===========================================================
+# reports/jobs.py
+# ===========================================================
+# Purpose:
+# Run heavy report exports outside the request/response cycle.
+#
+# • submit() records a ReportJob and, once the transaction
+#   commits, hands it to a local thread pool (REPORT_JOB_RUNNER
+#   = "thread") or leaves it queued for `manage.py report_worker`
+#   (REPORT_JOB_RUNNER = "worker") — no external broker needed
+# • run_job() claims a queued job with a conditional UPDATE, so
+#   several pools/workers never run the same job twice
+# • Jobs outlive their process: recover_jobs() (first request of
+#   a web process, thread runner) re-dispatches queued jobs, and
+#   both it and the worker loop requeue jobs left "running" past
+#   REPORT_JOB_STALE_SECONDS by a crash or restart
+# • Rows come from the shared report datasets; progress is
+#   written every PROGRESS_STEP rows; the finished file is stored through
+#   CachedReport.file_path and linked to the job
+#
+# Job types / formats:
+#   weekly      → xlsx | csv        (week, year)
+#   monthly     → xlsx | csv        (month, year)
+#   department  → xlsx | csv | pdf  (department, week, year)
+#                 pdf = ZIP of one PDF per employee
+# ===========================================================
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from datetime import timedelta
+import codecs
+import logging
+import tempfile
+import threading
+
+from employee.models import Department
+from reports.utils.excel_export import write_workbook
+from .bulk_pdf import bulk_report_data, write_zip
+from .builders import monthly_excel_sheet, weekly_excel_sheets, MONTHLY_COLUMNS, WEEKLY_COLUMNS
+from .dataset import department_dataset, monthly_dataset, weekly_dataset
+from .models import CachedReport, ReportJob
+from .streaming import iter_csv
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_STEP = 500
+# Progress stays below 100 until the artifact is stored
+MAX_RUNNING_PROGRESS = 95
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "REPORT_JOB_WORKERS", 2),
+                thread_name_prefix="report-job",
+            )
+    return _executor
+
+
+# ===========================================================
+# SUBMISSION / EXECUTION
+# ===========================================================
+def submit(job_type, export_format, params, requested_by=None):
+    """Create a queued job and dispatch it when the current transaction commits."""
+    job = ReportJob.objects.create(
+        job_type=job_type,
+        export_format=export_format,
+        params=params,
+        requested_by=requested_by,
+    )
+    transaction.on_commit(lambda: dispatch(job.pk))
+    return job
+
+
+def dispatch(job_id):
+    if getattr(settings, "REPORT_JOB_RUNNER", "thread") == "thread":
+        _get_executor().submit(run_job, job_id)
+
+
+def run_job(job_id):
+    """Claim and run one queued job. Returns False if another runner already took it."""
+    close_old_connections()
+    try:
+        claimed = ReportJob.objects.filter(pk=job_id, status="queued").update(
+            status="running", started_at=timezone.now(), progress=0
+        )
+        if not claimed:
+            return False
+
+        job = ReportJob.objects.select_related("requested_by").get(pk=job_id)
+        try:
+            cached = _execute(job)
+        except Exception as e:
+            logger.exception("[ReportJob] Job #%s failed: %s", job_id, e)
+            ReportJob.objects.filter(pk=job_id).update(
+                status="failed", error=str(e), finished_at=timezone.now()
+            )
+            return True
+
+        ReportJob.objects.filter(pk=job_id).update(
+            status="completed", progress=100, cached_report=cached, finished_at=timezone.now()
+        )
+        logger.info("[ReportJob] Job #%s completed → %s", job_id, cached.file_path.name)
+        return True
+    finally:
+        close_old_connections()
+
+
+def stale_after():
+    return getattr(settings, "REPORT_JOB_STALE_SECONDS", 2 * 3600)
+
+
+def requeue_stale_jobs(timeout=None):
+    """Queue again the jobs still "running" `timeout` seconds after they started. Returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=timeout or stale_after())
+    count = ReportJob.objects.filter(status="running", started_at__lt=cutoff).update(
+        status="queued", started_at=None, progress=0, rows_processed=0
+    )
+    if count:
+        logger.warning("[ReportJob] Requeued %s job(s) left running since before %s", count, cutoff)
+    return count
+
+
+def recover_jobs():
+    """
+    Startup recovery for the thread runner: requeue stale jobs and hand every
+    queued job to the pool (jobs queued before a restart are otherwise never
+    dispatched). Returns the number of jobs dispatched.
+    """
+    requeue_stale_jobs()
+    queued = list(ReportJob.objects.filter(status="queued").order_by("created_at").values_list("pk", flat=True))
+    for job_id in queued:
+        dispatch(job_id)
+    if queued:
+        logger.info("[ReportJob] Dispatched %s queued job(s) on startup", len(queued))
+    return len(queued)
+
+
+def run_pending(limit=None):
+    """Run queued jobs oldest first (the worker loop), after requeueing stale ones. Returns the number of jobs run."""
+    requeue_stale_jobs()
+    queued = ReportJob.objects.filter(status="queued").order_by("created_at").values_list("pk", flat=True)
+    if limit:
+        queued = queued[:limit]
+    return sum(1 for job_id in list(queued) if run_job(job_id))
+
+
+# ===========================================================
+# GENERATION
+# ===========================================================
+def _tracked(job, rows, total):
+    """Yield rows unchanged, recording progress every PROGRESS_STEP rows."""
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % PROGRESS_STEP == 0:
+            ReportJob.objects.filter(pk=job.pk).update(
+                rows_processed=processed,
+                progress=min(MAX_RUNNING_PROGRESS, processed * 100 // max(total, 1)),
+            )
+    ReportJob.objects.filter(pk=job.pk).update(rows_processed=processed, progress=MAX_RUNNING_PROGRESS)
+
+
+def _write_csv(columns, rows, fileobj):
+    writer = codecs.getwriter("utf-8")(fileobj)
+    count = 0
+    for count, line in enumerate(iter_csv(columns, rows)):
+        writer.write(line)
+    return count  # header line excluded
+
+
+def _write_pdf_zip(job, department, week, year, fileobj):
+    """One PDF per evaluated employee of the department-week, rendered in the PDF process pool."""
+    reports = bulk_report_data(week, year, department=department)
+
+    def on_rendered(count):
+        if count % PROGRESS_STEP == 0 or count == len(reports):
+            ReportJob.objects.filter(pk=job.pk).update(
+                rows_processed=count,
+                progress=min(MAX_RUNNING_PROGRESS, count * 100 // max(len(reports), 1)),
+            )
+
+    return write_zip(reports, fileobj, week, year, on_rendered=on_rendered)
+
+
+def _execute(job):
+    params = job.params
+    year = int(params["year"])
+    fmt = job.export_format
+    lookup = {"report_type": job.job_type, "export_format": fmt, "year": year}
+
+    with tempfile.TemporaryFile() as output:
+        if job.job_type == "monthly":
+            month = int(params["month"])
+            lookup["month"] = month
+            dataset = monthly_dataset(month, year)
+            rows = _tracked(job, dataset.rows(), len(dataset))
+            filename = f"Monthly_Performance_Report_{month}_{year}"
+            if fmt == "xlsx":
+                row_count = sum(write_workbook([monthly_excel_sheet(month, year, rows)], output).values())
+            else:
+                row_count = _write_csv(MONTHLY_COLUMNS, rows, output)
+
+        else:
+            week = int(params["week"])
+            lookup["week_number"] = week
+            department = None
+            filename = f"Weekly_Performance_Report_Week{week}_{year}"
+
+            if job.job_type == "department":
+                department = Department.objects.get(pk=params["department_id"])
+                lookup["department"] = department
+                filename = f"Department_Report_{department.name}_Week{week}_{year}".replace(" ", "_")
+
+            if fmt == "pdf":
+                row_count = _write_pdf_zip(job, department, week, year, output)
+                filename += "_PDF"
+            else:
+                dataset = weekly_dataset(week, year) if department is None else department_dataset(department, week, year)
+                rows = _tracked(job, dataset.rows(), len(dataset))
+                if fmt == "xlsx":
+                    row_count = sum(write_workbook(weekly_excel_sheets(None, rows), output).values())
+                else:
+                    row_count = _write_csv(WEEKLY_COLUMNS, rows, output)
+
+        extension = "zip" if fmt == "pdf" else fmt
+        output.seek(0)
+        cached = CachedReport.objects.filter(**lookup).first() or CachedReport(**lookup)
+        cached.payload = {"job_id": job.pk, "row_count": row_count, "params": params}
+        cached.generated_by = job.requested_by
+        cached.is_active = True
+        # Saving the new file also removes the artifact it replaces (CachedReport.save)
+        cached.file_path.save(f"{filename}.{extension}", File(output), save=True)
+    return cached
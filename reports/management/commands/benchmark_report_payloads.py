@@ -0,0 +1,136 @@
+# ===========================================================
+# reports/management/commands/benchmark_report_payloads.py
+# ===========================================================
+# Usage:
+#   python manage.py benchmark_report_payloads
+#   python manage.py benchmark_report_payloads --rows 20000 --copies 100
+#   python manage.py benchmark_report_payloads --week 44 --year 2025   # real weekly rows
+#
+# Compares CachedReport payload storage modes (json / zlib / gzip):
+# stored bytes, encode + write time, read + decode latency, and the
+# cost of listing entries with and without the payload column.
+# Everything runs in a transaction that is rolled back.
+# ===========================================================
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from statistics import median
+import random
+import time
+
+from reports.models import CachedReport
+from reports.utils.payload_codec import ENCODINGS
+
+BENCHMARK_YEAR = 1900
+
+
+def synthetic_rows(count):
+    """Weekly-report-shaped rows with realistic value spread."""
+    rng = random.Random(42)
+    departments = ["Engineering", "Sales", "Finance", "Operations", "Support", "Marketing"]
+    return [
+        {
+            "emp_id": f"EMP{i:05d}",
+            "employee_full_name": f"Employee {i} Surname{i % 97}",
+            "department": departments[i % len(departments)],
+            "total_score": float(rng.randint(600, 1500)),
+            "average_score": round(rng.uniform(40, 100), 2),
+            "feedback_avg": round(rng.uniform(1, 5), 2),
+            "week_number": 44,
+            "year": 2025,
+            "rank": i + 1,
+            "remarks": "" if i % 3 else "Consistent delivery this week.",
+        }
+        for i in range(count)
+    ]
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.2f}"
+
+
+class Command(BaseCommand):
+    help = "Benchmark CachedReport payload storage modes (size vs. write/read latency)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Rows per synthetic payload.")
+        parser.add_argument("--copies", type=int, default=50, help="Cached entries per mode (for the listing scan).")
+        parser.add_argument("--repeat", type=int, default=20, help="Reads timed per mode.")
+        parser.add_argument("--week", type=int, help="Use the real weekly report rows of this week instead.")
+        parser.add_argument("--year", type=int, help="Year of --week.")
+
+    def handle(self, *args, **options):
+        if options.get("week"):
+            if not options.get("year"):
+                raise CommandError("--week needs --year.")
+            from reports.dataset import weekly_dataset
+
+            records = list(weekly_dataset(options["week"], options["year"]).rows())
+            if not records:
+                raise CommandError(f"No performance data for Week {options['week']}, {options['year']}.")
+        else:
+            records = synthetic_rows(options["rows"])
+        payload = {"records": records}
+
+        self.stdout.write(
+            f"Payload: {len(records)} rows, {options['copies']} entries per mode, {options['repeat']} timed reads.\n"
+        )
+        header = (
+            f"{'mode':<6} {'stored bytes':>13} {'ratio':>7} {'encode+write ms':>16} "
+            f"{'read+decode ms':>15} {'list (deferred) ms':>19} {'list (full) ms':>15}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        baseline = None
+        with transaction.atomic():
+            for encoding in ENCODINGS:
+                result = self._measure(encoding, payload, options["copies"], options["repeat"])
+                baseline = baseline or result["bytes"]
+                self.stdout.write(
+                    f"{encoding:<6} {result['bytes']:>13,} {baseline / result['bytes']:>6.1f}x "
+                    f"{_ms(result['write']):>16} {_ms(result['read']):>15} "
+                    f"{_ms(result['list_deferred']):>19} {_ms(result['list_full']):>15}"
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            "\nencode+write / read+decode are medians per entry; list times cover all entries of a mode. "
+            "Benchmark rows were rolled back."
+        ))
+
+    def _measure(self, encoding, payload, copies, repeat):
+        write_times, ids = [], []
+        for i in range(copies):
+            started = time.perf_counter()
+            report = CachedReport(report_type="weekly", export_format="json", year=BENCHMARK_YEAR + i, week_number=1)
+            report.set_payload(payload, encoding=encoding)
+            report.save()
+            write_times.append(time.perf_counter() - started)
+            ids.append(report.pk)
+        stored_bytes = report.payload_bytes
+
+        read_times = []
+        for i in range(repeat):
+            started = time.perf_counter()
+            entry = CachedReport.objects.get(pk=ids[i % len(ids)])
+            len(entry.payload["records"])
+            read_times.append(time.perf_counter() - started)
+
+        entries = CachedReport.objects.filter(pk__in=ids).order_by("-generated_at")
+        started = time.perf_counter()
+        list(entries.defer("payload_json", "payload_blob"))
+        list_deferred = time.perf_counter() - started
+
+        started = time.perf_counter()
+        list(entries)
+        list_full = time.perf_counter() - started
+
+        CachedReport.objects.filter(pk__in=ids).delete()
+        return {
+            "bytes": stored_bytes,
+            "write": median(write_times),
+            "read": median(read_times),
+            "list_deferred": list_deferred,
+            "list_full": list_full,
+        }
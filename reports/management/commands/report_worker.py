@@ -0,0 +1,44 @@
+# ===========================================================
+# reports/management/commands/report_worker.py
+# ===========================================================
+# Usage:
+#   python manage.py report_worker                 # poll forever
+#   python manage.py report_worker --once          # drain the queue and exit
+#   python manage.py report_worker --poll-interval 10
+#
+# Runs queued ReportJobs (set REPORT_JOB_RUNNER = "worker" so the
+# web process only queues them). Several workers can run side by
+# side: each job is claimed with a conditional update. Jobs left
+# "running" past REPORT_JOB_STALE_SECONDS (crashed runner) are
+# queued again before every poll.
+# ===========================================================
+
+from django.core.management.base import BaseCommand
+import time
+
+from reports.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background report jobs (exports, department PDFs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the jobs queued now, then exit.")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between queue polls.")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            count = run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} report job(s)."))
+            return
+
+        self.stdout.write(f"Report worker started (polling every {options['poll_interval']}s).")
+        try:
+            while True:
+                count = run_pending(limit=1)
+                if count:
+                    self.stdout.write(f"Ran {count} report job(s).")
+                else:
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Report worker stopped."))
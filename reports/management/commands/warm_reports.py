@@ -0,0 +1,62 @@
+# ===========================================================
+# reports/management/commands/warm_reports.py
+# ===========================================================
+# Usage:
+#   python manage.py warm_reports                       # current + previous week/month
+#   python manage.py warm_reports --force               # recompute even fresh entries
+#   python manage.py warm_reports --date 2025-10-27 --weeks 4 --workers 8
+#
+# Cron (Monday 05:30):
+#   30 5 * * 1  cd /srv/epts && python manage.py warm_reports
+# ===========================================================
+
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date
+import time
+
+from reports.warmup import warm_reports, warm_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the weekly, department and monthly report caches and the dashboard "
+        "rollups for the current and previous periods."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Anchor day (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--weeks", type=int, default=2, help="ISO weeks to warm, ending at the anchor week.")
+        parser.add_argument("--months", type=int, default=2, help="Months to warm, ending at the anchor month.")
+        parser.add_argument("--workers", type=int, help="Threads for department reports (default REPORT_WARM_WORKERS).")
+        parser.add_argument("--force", action="store_true", help="Recompute entries that are still fresh.")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["date"]) if options.get("date") else None
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD.")
+        if options["weeks"] < 0 or options["months"] < 0:
+            raise CommandError("--weeks and --months cannot be negative.")
+
+        started = time.perf_counter()
+        results = warm_reports(
+            day=day,
+            weeks=options["weeks"],
+            months=options["months"],
+            workers=options.get("workers") or warm_workers(),
+            force=options["force"],
+        )
+        elapsed = time.perf_counter() - started
+
+        for result in results:
+            line = f"{result['report']:<40} {result['status']:<7} {result['rows']:>6} rows  {result['seconds']:.3f}s"
+            self.stdout.write(self.style.ERROR(line) if result["status"] == "failed" else line)
+
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        message = f"Warmed {len(results)} report(s) in {elapsed:.2f}s ({summary or 'nothing to do'})."
+        if counts.get("failed"):
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-16 18:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0011_employee_project_name_and_more'),
+        ('reports', '0005_remove_cachedreport_reports_cac_report__a25b66_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('weekly', 'Weekly Report'), ('monthly', 'Monthly Report'), ('department', 'Department-wise Report')], max_length=20)),
+                ('export_format', models.CharField(choices=[('xlsx', 'Excel'), ('csv', 'CSV'), ('pdf', 'PDF')], max_length=10)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='week / month / year / department.')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Completion percentage (0–100).')),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Report Job',
+                'verbose_name_plural': 'Report Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='cachedreport',
+            name='unique_cached_report_per_period',
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='export_format',
+            field=models.CharField(choices=[('json', 'JSON payload'), ('xlsx', 'Excel'), ('csv', 'CSV'), ('pdf', 'PDF')], default='json', help_text='json = cached payload only; other formats carry a generated file.', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='cachedreport',
+            constraint=models.UniqueConstraint(fields=('report_type', 'export_format', 'year', 'week_number', 'month', 'manager', 'department'), name='unique_cached_report_per_period'),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='cached_report',
+            field=models.ForeignKey(blank=True, help_text='Stored artifact once the job completes.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='reports.cachedreport'),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(fields=['status', 'created_at'], name='reports_rep_status_051565_idx'),
+        ),
+    ]
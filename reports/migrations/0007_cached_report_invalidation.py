@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedreport',
+            name='invalidated_at',
+            field=models.DateTimeField(blank=True, help_text='Set when data of the period changed; the entry is recomputed on next read.', null=True),
+        ),
+    ]
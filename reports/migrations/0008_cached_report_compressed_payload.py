@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-16 21:00
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+def fill_payload_stats(apps, schema_editor):
+    """Row count and stored size for existing (uncompressed) payloads."""
+    CachedReport = apps.get_model("reports", "CachedReport")
+    for report in CachedReport.objects.only("pk", "payload_json").iterator():
+        data = report.payload_json
+        row_count = None
+        if isinstance(data, dict):
+            if isinstance(data.get("records"), list):
+                row_count = len(data["records"])
+            elif isinstance(data.get("row_count"), int):
+                row_count = data["row_count"]
+        size = len(json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")) if data is not None else 0
+        CachedReport.objects.filter(pk=report.pk).update(row_count=row_count, payload_bytes=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_cached_report_invalidation'),
+    ]
+
+    operations = [
+        # The JSON column keeps its name; only the model field is renamed
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='cachedreport',
+                    old_name='payload',
+                    new_name='payload_json',
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='cachedreport',
+            name='payload_json',
+            field=models.JSONField(blank=True, db_column='payload', help_text='Cached JSON data (aggregated summary, KPIs, and metrics) when stored uncompressed.', null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='payload_blob',
+            field=models.BinaryField(blank=True, help_text='Compressed compact-JSON payload (see payload_encoding).', null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='payload_encoding',
+            field=models.CharField(choices=[('json', 'Plain JSON'), ('zlib', 'zlib-compressed JSON'), ('gzip', 'gzip-compressed JSON')], default='json', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='row_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of report rows in the payload (for listings without loading it).', null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='payload_bytes',
+            field=models.PositiveIntegerField(default=0, help_text='Stored payload size in bytes (compressed size when compressed).'),
+        ),
+        migrations.RunPython(fill_payload_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:45
+
+from django.db import migrations, models
+
+
+def fill_period_keys(apps, schema_editor):
+    """
+    Key existing entries and drop the duplicates the old (NULL-blind)
+    constraint let through, keeping the newest entry of each period.
+    """
+    CachedReport = apps.get_model("reports", "CachedReport")
+    seen = set()
+    duplicates = []
+    for report in CachedReport.objects.order_by("-generated_at", "-pk").iterator():
+        parts = (report.year, report.week_number, report.month, report.manager_id, report.department_id)
+        report.period_key = ":".join("" if part is None else str(part) for part in parts)
+        key = (report.report_type, report.export_format, report.period_key)
+        if key in seen:
+            duplicates.append(report.pk)
+            continue
+        seen.add(key)
+        CachedReport.objects.filter(pk=report.pk).update(period_key=report.period_key)
+    if duplicates:
+        CachedReport.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0008_cached_report_compressed_payload'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='cachedreport',
+            name='unique_cached_report_per_period',
+        ),
+        migrations.AddField(
+            model_name='cachedreport',
+            name='period_key',
+            field=models.CharField(default='', editable=False, help_text='year:week:month:manager:department with empty parts for unused fields (set on save).', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_period_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cachedreport',
+            constraint=models.UniqueConstraint(fields=('report_type', 'export_format', 'period_key'), name='unique_cached_report_per_period'),
+        ),
+    ]
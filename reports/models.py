@@ -7,6 +7,18 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 import os
 
+from reports.utils.payload_codec import decode_payload, encode_payload
+
+
+def payload_row_count(data):
+    """Rows in a report payload: its "records" list, or a job artifact's row_count."""
+    if isinstance(data, dict):
+        if isinstance(data.get("records"), list):
+            return len(data["records"])
+        if isinstance(data.get("row_count"), int):
+            return data["row_count"]
+    return None
+
 
 class CachedReport(models.Model):
     """
@@ -41,6 +53,19 @@ class CachedReport(models.Model):
         help_text="Month number (used for monthly reports)",
     )
 
+    EXPORT_FORMAT_CHOICES = [
+        ("json", "JSON payload"),
+        ("xlsx", "Excel"),
+        ("csv", "CSV"),
+        ("pdf", "PDF"),
+    ]
+    export_format = models.CharField(
+        max_length=10,
+        choices=EXPORT_FORMAT_CHOICES,
+        default="json",
+        help_text="json = cached payload only; other formats carry a generated file.",
+    )
+
     # -----------------------------------------------------------
     # Relationships
     # -----------------------------------------------------------
@@ -62,16 +87,48 @@ class CachedReport(models.Model):
     )
 
     # -----------------------------------------------------------
-    # Cached Payload
+    # Cached Payload (read / write through the `payload` property)
     # -----------------------------------------------------------
-    payload = models.JSONField(
-        help_text="Cached JSON data (aggregated summary, KPIs, and metrics)."
+    PAYLOAD_ENCODING_CHOICES = [
+        ("json", "Plain JSON"),
+        ("zlib", "zlib-compressed JSON"),
+        ("gzip", "gzip-compressed JSON"),
+    ]
+    payload_json = models.JSONField(
+        null=True,
+        blank=True,
+        db_column="payload",
+        help_text="Cached JSON data (aggregated summary, KPIs, and metrics) when stored uncompressed.",
+    )
+    payload_blob = models.BinaryField(
+        null=True,
+        blank=True,
+        help_text="Compressed compact-JSON payload (see payload_encoding).",
+    )
+    payload_encoding = models.CharField(
+        max_length=10,
+        choices=PAYLOAD_ENCODING_CHOICES,
+        default="json",
+    )
+    row_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Number of report rows in the payload (for listings without loading it).",
+    )
+    payload_bytes = models.PositiveIntegerField(
+        default=0,
+        help_text="Stored payload size in bytes (compressed size when compressed).",
     )
     report_name = models.CharField(
         max_length=255,
         blank=True,
         help_text="Readable report name (auto-generated for dashboard display).",
     )
+    period_key = models.CharField(
+        max_length=64,
+        editable=False,
+        help_text="year:week:month:manager:department with empty parts for unused fields (set on save).",
+    )
 
     # -----------------------------------------------------------
     # Metadata
@@ -92,6 +149,11 @@ class CachedReport(models.Model):
         help_text="Path to generated PDF/Excel file (if available).",
     )
     is_active = models.BooleanField(default=True, help_text="Active or archived flag.")
+    invalidated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set when data of the period changed; the entry is recomputed on next read.",
+    )
 
     # -----------------------------------------------------------
     # Meta Configuration
@@ -101,8 +163,10 @@ class CachedReport(models.Model):
         verbose_name = "Cached Report"
         verbose_name_plural = "Cached Reports"
         constraints = [
+            # On the non-null period_key: a constraint over the nullable period
+            # columns never matches NULLs, so it would not stop duplicates
             models.UniqueConstraint(
-                fields=["report_type", "year", "week_number", "month", "manager", "department"],
+                fields=["report_type", "export_format", "period_key"],
                 name="unique_cached_report_per_period",
             )
         ]
@@ -126,8 +190,17 @@ class CachedReport(models.Model):
     # -----------------------------------------------------------
     # Save Override
     # -----------------------------------------------------------
+    @staticmethod
+    def key_for(year, week_number=None, month=None, manager=None, department=None):
+        """The period_key of a period; manager / department may be instances or ids."""
+        parts = (year, week_number, month, getattr(manager, "pk", manager), getattr(department, "pk", department))
+        return ":".join("" if part is None else str(part) for part in parts)
+
     def save(self, *args, **kwargs):
         """Validate, timestamp, and auto-generate report name before saving."""
+        self.period_key = self.key_for(self.year, self.week_number, self.month, self.manager_id, self.department_id)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "period_key"}
         self.full_clean()
         self.generated_at = timezone.now()
 
@@ -136,7 +209,7 @@ class CachedReport(models.Model):
 
         # Cleanup replaced file (if any)
         if self.pk:
-            old = CachedReport.objects.filter(pk=self.pk).first()
+            old = CachedReport.objects.filter(pk=self.pk).only("file_path").first()
             if old and old.file_path and old.file_path != self.file_path and os.path.isfile(old.file_path.path):
                 try:
                     os.remove(old.file_path.path)
@@ -154,6 +227,38 @@ class CachedReport(models.Model):
         timestamp = timezone.now().strftime("%Y%m%d_%H%M")
         return f"{base}_{timestamp}.{extension}".replace("__", "_")
 
+    @property
+    def payload(self):
+        """The decoded payload, whichever way it is stored."""
+        if not hasattr(self, "_payload"):
+            if self.payload_encoding == "json":
+                self._payload = self.payload_json
+            else:
+                self._payload = decode_payload(self.payload_encoding, self.payload_blob)
+        return self._payload
+
+    @payload.setter
+    def payload(self, data):
+        self.set_payload(data)
+
+    def set_payload(self, data, encoding=None):
+        """Store data per `encoding` (default REPORT_PAYLOAD_COMPRESSION) and record its row count and size."""
+        encoding, value, size = encode_payload(data, encoding)
+        self.payload_encoding = encoding
+        self.payload_json = value if encoding == "json" else None
+        self.payload_blob = None if encoding == "json" else value
+        self.payload_bytes = size
+        self.row_count = payload_row_count(data)
+        self._payload = data
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop("_payload", None)
+        super().refresh_from_db(*args, **kwargs)
+
+    @property
+    def is_fresh(self):
+        return self.is_active and self.invalidated_at is None
+
     def get_payload_summary(self):
         """Return summarized KPI stats for dashboards."""
         data = self.payload.get("records", [])
@@ -215,3 +320,69 @@ class CachedReport(models.Model):
         elif self.report_type == "department" and self.department:
             return f"Department Report — {self.department.name} ({self.get_period_display()})"
         return f"{self.report_type.title()} Report ({self.year})"
+
+
+# ===========================================================
+# ASYNCHRONOUS REPORT JOBS
+# ===========================================================
+class ReportJob(models.Model):
+    """
+    A report export queued for background generation (reports/jobs.py).
+    The finished file is stored through CachedReport.file_path.
+    """
+
+    JOB_TYPE_CHOICES = [
+        ("weekly", "Weekly Report"),
+        ("monthly", "Monthly Report"),
+        ("department", "Department-wise Report"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
+    export_format = models.CharField(max_length=10, choices=CachedReport.EXPORT_FORMAT_CHOICES[1:])
+    params = models.JSONField(default=dict, blank=True, help_text="week / month / year / department.")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Completion percentage (0–100).")
+    rows_processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_jobs",
+    )
+    cached_report = models.ForeignKey(
+        CachedReport,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        help_text="Stored artifact once the job completes.",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Report Job"
+        verbose_name_plural = "Report Jobs"
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    @property
+    def duration_seconds(self):
+        if self.started_at and self.finished_at:
+            return round((self.finished_at - self.started_at).total_seconds(), 2)
+        return None
+
+    def __str__(self):
+        return f"Job #{self.pk} — {self.get_job_type_display()} ({self.export_format}, {self.status})"
@@ -3,7 +3,10 @@ from rest_framework import serializers
 from performance.models import PerformanceEvaluation
 from feedback.models import GeneralFeedback, ManagerFeedback, ClientFeedback
 from employee.models import Employee
-from .models import CachedReport
+from .models import CachedReport, ReportJob
+from employee.models import Department
+from django.urls import reverse
+from django.utils import timezone
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict
 
@@ -136,7 +139,7 @@ class EmployeeHistorySerializer(serializers.Serializer, ScoreMixin):
 # 5. MANAGER-WISE REPORT SERIALIZER
 # =====================================================
 class ManagerReportSerializer(serializers.Serializer, ScoreMixin):
-    """Weekly report for all employees under a specific manager."""
+    """Weekly report row for an employee anywhere under a manager (direct or indirect)."""
     manager_full_name = serializers.CharField()
     emp_id = serializers.CharField()
     employee_full_name = serializers.CharField()
@@ -147,6 +150,8 @@ class ManagerReportSerializer(serializers.Serializer, ScoreMixin):
     week_number = serializers.IntegerField()
     year = serializers.IntegerField()
     rank = serializers.IntegerField(allow_null=True, required=False)
+    depth = serializers.IntegerField(required=False, help_text="1 = direct report, 2+ = indirect.")
+    evaluation_count = serializers.IntegerField(required=False)
     remarks = serializers.CharField(allow_blank=True, allow_null=True, required=False)
 
     def to_representation(self, instance):
@@ -197,15 +202,16 @@ class CachedReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = CachedReport
         fields = [
-            "id", "report_type", "year", "week_number", "month",
-            "manager", "department", "payload", "file_path",
-            "generated_at", "generated_by", "generated_by_name",
-            "generated_by_full_name", "is_active", "period_display",
+            "id", "report_type", "export_format", "year", "week_number", "month",
+            "manager", "department", "payload", "payload_encoding", "row_count",
+            "payload_bytes", "file_path", "generated_at", "generated_by", "generated_by_name",
+            "generated_by_full_name", "is_active", "invalidated_at", "period_display",
             "report_label", "export_type",
         ]
         read_only_fields = [
-            "id", "generated_at", "generated_by_name",
-            "generated_by_full_name", "period_display", "report_label", "export_type",
+            "id", "payload_encoding", "row_count", "payload_bytes", "generated_at",
+            "invalidated_at", "generated_by_name", "generated_by_full_name",
+            "period_display", "report_label", "export_type",
         ]
 
     def get_generated_by_full_name(self, obj):
@@ -235,6 +241,13 @@ class CachedReportSerializer(serializers.ModelSerializer):
             return "-"
 
 
+class CachedReportListSerializer(CachedReportSerializer):
+    """Listing variant without the payload (row_count / payload_bytes describe it)."""
+
+    class Meta(CachedReportSerializer.Meta):
+        fields = [f for f in CachedReportSerializer.Meta.fields if f != "payload"]
+
+
 # =====================================================
 # 8. COMBINED / AGGREGATED REPORT SERIALIZER
 # =====================================================
@@ -281,3 +294,102 @@ class CombinedReportSerializer(serializers.Serializer, ScoreMixin):
         fs = rep.get("feedback_summary") or {}
         rep["feedback_summary"] = {k: self.round_score(v) for k, v in fs.items()}
         return rep
+
+
+# =====================================================
+# 9. BACKGROUND REPORT JOBS
+# =====================================================
+class ReportJobCreateSerializer(serializers.Serializer):
+    """Validates a report job submission; week/month/year default to the current period."""
+
+    job_type = serializers.ChoiceField(choices=[c[0] for c in ReportJob.JOB_TYPE_CHOICES])
+    export_format = serializers.ChoiceField(choices=["xlsx", "csv", "pdf"], default="xlsx")
+    year = serializers.IntegerField(min_value=2000, max_value=2100, required=False)
+    week = serializers.IntegerField(min_value=1, max_value=53, required=False)
+    month = serializers.IntegerField(min_value=1, max_value=12, required=False)
+    department = serializers.CharField(required=False, help_text="Department name or code.")
+
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        job_type = data["job_type"]
+        now = timezone.now()
+        params = {"year": data.get("year") or now.year}
+
+        if data["export_format"] == "pdf" and job_type != "department":
+            raise serializers.ValidationError({"export_format": "PDF export is only available for department jobs."})
+
+        if job_type == "monthly":
+            params["month"] = data.get("month") or now.month
+        else:
+            params["week"] = data.get("week") or now.isocalendar()[1]
+
+        if job_type == "department":
+            name = data.get("department")
+            if not name:
+                raise serializers.ValidationError({"department": "Department is required for department jobs."})
+            department = (
+                Department.objects.filter(name__iexact=name).first()
+                or Department.objects.filter(code__iexact=name).first()
+            )
+            if not department:
+                raise serializers.ValidationError({"department": f"Department '{name}' not found."})
+            params["department_id"] = department.id
+            params["department"] = department.name
+
+        data["params"] = params
+        return data
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Job status for polling; download_url is set once the artifact exists."""
+
+    requested_by_name = serializers.CharField(source="requested_by.username", read_only=True, default="-")
+    duration_seconds = serializers.FloatField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "id", "job_type", "export_format", "params", "status", "progress",
+            "rows_processed", "error", "requested_by", "requested_by_name",
+            "cached_report", "download_url", "created_at", "started_at",
+            "finished_at", "duration_seconds",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != "completed" or not obj.cached_report_id:
+            return None
+        path = reverse("reports:report_job_download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request else path
+
+
+# =====================================================
+# 10. WEEK-OVER-WEEK TREND SERIALIZER
+# =====================================================
+class TrendReportSerializer(serializers.Serializer, ScoreMixin):
+    """This week vs. the employee's previous evaluated week, with the current improvement/decline streak."""
+    emp_id = serializers.CharField()
+    employee_full_name = serializers.CharField()
+    department = serializers.CharField()
+    week_number = serializers.IntegerField()
+    year = serializers.IntegerField()
+    average_score = serializers.FloatField()
+    total_score = serializers.FloatField()
+    rank = serializers.IntegerField()
+    previous_week = serializers.IntegerField(allow_null=True)
+    previous_year = serializers.IntegerField(allow_null=True)
+    previous_score = serializers.FloatField(allow_null=True)
+    previous_rank = serializers.IntegerField(allow_null=True)
+    score_delta = serializers.FloatField(allow_null=True)
+    rank_change = serializers.IntegerField(allow_null=True, help_text="Positive = moved up.")
+    trend = serializers.ChoiceField(choices=["improving", "declining", "steady", "new"])
+    streak = serializers.IntegerField(help_text="Consecutive weeks in the current trend (0 for new).")
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        rep["average_score"] = self.round_score(rep.get("average_score", 0))
+        rep["total_score"] = self.round_score(rep.get("total_score", 0))
+        if rep.get("previous_score") is not None:
+            rep["previous_score"] = self.round_score(rep["previous_score"])
+        return rep
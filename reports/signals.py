@@ -0,0 +1,102 @@
+# ===========================================================
+# reports/signals.py
+# ===========================================================
+# Purpose:
+# Keep read-through CachedReports honest.
+#
+# • Evaluations: the rank queue reports every department-week it
+#   flushed (saves, deletes, bulk imports alike), and those
+#   periods are invalidated
+# • Feedback: saves/deletes invalidate the weekly / manager /
+#   department reports of every week the employee was evaluated
+#   in (they show overall feedback averages) and the monthly
+#   report of the feedback date — old and new employee and date
+#   when an edit moves it
+# • Employees: a changed reporting line (manager) invalidates the
+#   cached manager reports, whose teams come from the hierarchy
+#
+# Also: the first request of a web process recovers background
+# report jobs interrupted by the previous process (reports/jobs.py).
+# ===========================================================
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DatabaseError
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+import logging
+
+from employee.models import Employee
+from feedback.models import GeneralFeedback, ManagerFeedback, ClientFeedback
+from performance.rank_queue import buckets_flushed
+from .cache import invalidate_for_feedback, invalidate_manager_reports, invalidate_periods
+from .jobs import recover_jobs
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_MODELS = (GeneralFeedback, ManagerFeedback, ClientFeedback)
+
+
+@receiver(buckets_flushed)
+def invalidate_on_rank_flush(sender, department_weeks, **kwargs):
+    invalidate_periods(department_weeks=department_weeks)
+
+
+def remember_feedback_period(sender, instance, **kwargs):
+    """Keep the stored employee / feedback date of an edited row, so what it leaves is invalidated too."""
+    if instance.pk:
+        instance._previous_feedback = (
+            sender.objects.filter(pk=instance.pk).values_list("employee_id", "feedback_date").first()
+        )
+
+
+def invalidate_on_feedback_change(sender, instance, **kwargs):
+    try:
+        changes = {(instance.employee_id, instance.feedback_date)}
+        previous = getattr(instance, "_previous_feedback", None)
+        if previous:
+            changes.add(previous)
+        invalidate_for_feedback(changes)
+    except Exception as e:
+        logger.warning(f"[ReportCache] Feedback invalidation failed: {e}")
+
+
+for model in FEEDBACK_MODELS:
+    pre_save.connect(remember_feedback_period, sender=model, dispatch_uid=f"report_cache_pre_{model.__name__}")
+    post_save.connect(invalidate_on_feedback_change, sender=model, dispatch_uid=f"report_cache_save_{model.__name__}")
+    post_delete.connect(invalidate_on_feedback_change, sender=model, dispatch_uid=f"report_cache_delete_{model.__name__}")
+
+
+@receiver(pre_save, sender=Employee)
+def remember_reporting_line(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_manager_id = (
+            Employee.objects.filter(pk=instance.pk).values_list("manager_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Employee)
+def invalidate_on_reporting_line_change(sender, instance, created, **kwargs):
+    if created:
+        changed = instance.manager_id is not None
+    else:
+        changed = getattr(instance, "_previous_manager_id", None) != instance.manager_id
+    if changed:
+        invalidate_manager_reports()
+
+
+@receiver(post_delete, sender=Employee)
+def invalidate_on_employee_delete(sender, instance, **kwargs):
+    invalidate_manager_reports()
+
+
+@receiver(request_started, dispatch_uid="reports.recover_report_jobs")
+def recover_report_jobs(sender, **kwargs):
+    """Once per process: re-dispatch queued/stale report jobs (thread runner only)."""
+    request_started.disconnect(dispatch_uid="reports.recover_report_jobs")
+    if getattr(settings, "REPORT_JOB_RUNNER", "thread") != "thread":
+        return
+    try:
+        recover_jobs()
+    except DatabaseError as e:
+        logger.warning("[ReportJob] Startup job recovery failed: %s", e)
@@ -0,0 +1,61 @@
+# ===========================================================
+# reports/streaming.py
+# ===========================================================
+# Purpose:
+# Streaming CSV / NDJSON export for report endpoints.
+#
+# Rows come from the iterator builders in reports/builders.py
+# and are written out as they are produced, so memory stays
+# constant and the first byte is sent immediately, whatever
+# the size of the export.
+#
+# Usage (on weekly / monthly / department endpoints):
+#   ?export=csv      → text/csv
+#   ?export=ndjson   → application/x-ndjson (one JSON object per line)
+# ("format" is reserved by DRF for content negotiation.)
+# ===========================================================
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+import csv
+import json
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(row) + "\n"
+
+
+def requested_export(request):
+    """Return the requested streaming format ('csv' / 'ndjson'), or None for the normal JSON response."""
+    export = (request.query_params.get("export") or "").lower()
+    return export if export in EXPORT_FORMATS else None
+
+
+def streaming_export_response(export, filename, columns, rows):
+    """Build a StreamingHttpResponse for an iterator of row dicts."""
+    content_type, extension = EXPORT_FORMATS[export]
+    body = iter_csv(columns, rows) if export == "csv" else iter_ndjson(rows)
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -1,3 +1,216 @@
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
+from datetime import date, timedelta
+from unittest import mock
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import User
+from employee.models import Employee, Department
+from feedback.models import GeneralFeedback
+from performance.models import PerformanceEvaluation
+from . import jobs
+from .cache import fresh_report, store_report
+from .models import CachedReport, ReportJob
+
+
+class ReportCacheInvalidationTests(TestCase):
+    """Evaluation and feedback writes stale the cached reports that show them, and nothing else."""
+
+    REVIEW_DATE = date(2025, 10, 8)  # ISO week 41 of 2025
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code="ENG01", name="Engineering")
+        cls.admin = User.objects.create(
+            emp_id="EMP0000", username="admin", email="admin@example.com", role="Admin", first_name="Ada",
+        )
+        user = User.objects.create(
+            emp_id="EMP0001", username="emp1", email="emp1@example.com", role="Employee",
+            first_name="Alice", last_name="Test", department=cls.department,
+        )
+        cls.employee = Employee.objects.create(user=user, department=cls.department, joining_date=date(2024, 1, 1))
+        cls.evaluation = PerformanceEvaluation.objects.create(
+            employee=cls.employee, evaluator=cls.admin, review_date=cls.REVIEW_DATE, communication_skills=70,
+        )
+
+    def setUp(self):
+        self.october = [
+            ("weekly", {"week_number": 41}),
+            ("department", {"week_number": 41, "department": self.department}),
+            ("monthly", {"month": 10}),
+        ]
+        self.elsewhere = [("weekly", {"week_number": 20}), ("monthly", {"month": 5})]
+        for report_type, period in self.october + self.elsewhere:
+            store_report(report_type, 2025, {"cached": True}, **period)
+
+    def assert_stale(self, periods):
+        for report_type, period in periods:
+            self.assertIsNone(fresh_report(report_type, 2025, **period), (report_type, period))
+
+    def assert_fresh(self, periods):
+        for report_type, period in periods:
+            self.assertIsNotNone(fresh_report(report_type, 2025, **period), (report_type, period))
+
+    def test_edited_evaluation_invalidates_its_week_and_month(self):
+        self.assert_fresh(self.october)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evaluation.communication_skills = 90
+            self.evaluation.save()
+        self.assert_stale(self.october)
+        self.assert_fresh(self.elsewhere)
+
+    def test_moved_evaluation_invalidates_the_week_it_left(self):
+        store_report("weekly", 2025, {"cached": True}, week_number=44)
+        evaluation = PerformanceEvaluation.objects.get(pk=self.evaluation.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation.review_date = date(2025, 10, 29)  # week 44
+            evaluation.save()
+        self.assert_stale(self.october + [("weekly", {"week_number": 44})])
+        self.assert_fresh(self.elsewhere)
+
+    def test_evaluation_without_department_invalidates_its_week_and_month(self):
+        Employee.objects.filter(pk=self.employee.pk).update(department=None)
+        PerformanceEvaluation.objects.filter(pk=self.evaluation.pk).update(department=None)
+        evaluation = PerformanceEvaluation.objects.get(pk=self.evaluation.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation.delete()
+        self.assert_stale(self.october)
+        self.assert_fresh(self.elsewhere)
+
+    def test_edited_feedback_invalidates_weekly_and_monthly_reports(self):
+        # Weekly reports show the employee's overall feedback average: any of their feedback counts
+        feedback = GeneralFeedback.objects.create(
+            employee=self.employee, feedback_text="Great demo", rating=8,
+            feedback_date=self.REVIEW_DATE, created_by=self.admin,
+        )
+        self.assert_stale(self.october)
+        self.assert_fresh(self.elsewhere)
+
+        for report_type, period in self.october + self.elsewhere:
+            store_report(report_type, 2025, {"cached": True}, **period)
+        feedback.feedback_date = date(2025, 5, 14)
+        feedback.save()
+        # Week 41 (evaluated) and both months the edit touched; week 20 has no evaluation of the employee
+        self.assert_stale(self.october + [("monthly", {"month": 5})])
+        self.assert_fresh([("weekly", {"week_number": 20})])
+
+    def test_store_after_invalidation_refreshes_the_same_entry(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evaluation.save()
+        self.assert_stale(self.october)
+
+        stored = store_report("weekly", 2025, {"cached": "again"}, week_number=41)
+        self.assertEqual(fresh_report("weekly", 2025, week_number=41), stored)
+        self.assertEqual(
+            CachedReport.objects.filter(report_type="weekly", export_format="json", year=2025, week_number=41).count(), 1
+        )
+
+    def test_store_retries_when_a_racing_insert_wins(self):
+        real = CachedReport.objects.update_or_create
+        calls = []
+
+        def racing(*args, **kwargs):
+            calls.append(kwargs["period_key"])
+            if len(calls) == 1:
+                raise IntegrityError("UNIQUE constraint failed")
+            return real(*args, **kwargs)
+
+        with mock.patch.object(CachedReport.objects, "update_or_create", side_effect=racing):
+            stored = store_report("weekly", 2025, {"cached": "winner"}, week_number=41)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(fresh_report("weekly", 2025, week_number=41), stored)
+
+
+class ReportJobTests(TestCase):
+    """Claiming is a conditional UPDATE; jobs left running by a dead process are requeued once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artifact = CachedReport.objects.create(report_type="weekly", year=2025, week_number=41, export_format="csv")
+
+    def job(self, status="queued", started_minutes_ago=None):
+        job = ReportJob.objects.create(job_type="weekly", export_format="csv", params={"week": 41, "year": 2025})
+        if status != "queued":
+            started_at = timezone.now() - timedelta(minutes=started_minutes_ago or 0)
+            ReportJob.objects.filter(pk=job.pk).update(status=status, started_at=started_at, progress=40)
+        return job
+
+    def test_two_workers_cannot_claim_one_job(self):
+        job = self.job()
+        executed, second_claim = [], []
+
+        def execute(claimed):
+            executed.append(claimed.pk)
+            # A second worker picks the same job while the first is still running it
+            second_claim.append(jobs.run_job(job.pk))
+            return self.artifact
+
+        with mock.patch.object(jobs, "_execute", side_effect=execute):
+            self.assertTrue(jobs.run_job(job.pk))
+            self.assertFalse(jobs.run_job(job.pk))
+
+        self.assertEqual(executed, [job.pk])
+        self.assertEqual(second_claim, [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.cached_report), ("completed", 100, self.artifact))
+
+    def test_stale_running_job_is_requeued_exactly_once(self):
+        stale = self.job("running", started_minutes_ago=3 * 60)
+        active = self.job("running", started_minutes_ago=10)
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        stale.refresh_from_db()
+        active.refresh_from_db()
+        self.assertEqual((stale.status, stale.started_at, stale.progress), ("queued", None, 0))
+        self.assertEqual(active.status, "running")
+
+        with mock.patch.object(jobs, "_execute", return_value=self.artifact) as execute:
+            self.assertEqual(jobs.run_pending(), 1)
+            self.assertEqual(jobs.run_pending(), 0)
+        execute.assert_called_once()
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "completed")
+
+    def test_recover_jobs_dispatches_queued_and_stale_jobs(self):
+        queued = self.job()
+        stale = self.job("running", started_minutes_ago=3 * 60)
+        self.job("completed", started_minutes_ago=3 * 60)
+
+        with mock.patch.object(jobs, "dispatch") as dispatch:
+            self.assertEqual(jobs.recover_jobs(), 2)
+        self.assertEqual(sorted(call.args[0] for call in dispatch.call_args_list), sorted([queued.pk, stale.pk]))
+
+
+class CachedReportDashboardTests(TestCase):
+    """The cached-report list orders by generation time; archive/restore toggle is_active."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            emp_id="EMP0000", username="admin", email="admin@example.com", role="Admin", first_name="Ada",
+        )
+        cls.older = CachedReport.objects.create(report_type="weekly", year=2025, week_number=40)
+        cls.newer = CachedReport.objects.create(report_type="weekly", year=2025, week_number=41)
+        CachedReport.objects.filter(pk=cls.older.pk).update(generated_at=timezone.now() - timedelta(days=1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_is_newest_first(self):
+        response = self.client.get("/api/reports/cache/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["id"] for r in response.json()["results"]], [self.newer.pk, self.older.pk])
+
+    def test_archive_and_restore_toggle_is_active(self):
+        response = self.client.post(f"/api/reports/cache/{self.newer.pk}/archive/")
+        self.assertEqual(response.status_code, 200)
+        self.newer.refresh_from_db()
+        self.assertFalse(self.newer.is_active)
+
+        response = self.client.post(f"/api/reports/cache/{self.newer.pk}/restore/")
+        self.assertEqual(response.status_code, 200)
+        self.newer.refresh_from_db()
+        self.assertTrue(self.newer.is_active)
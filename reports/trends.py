@@ -0,0 +1,154 @@
+# ===========================================================
+# reports/trends.py
+# ===========================================================
+# Purpose:
+# Week-over-week comparison for a department or the whole
+# organization, computed in the database in one statement.
+#
+# • weekly    — one row per employee-week (evaluation types
+#               averaged), limited to a look-back window
+# • ranked    — RANK() per week within the scope
+# • deltas    — LAG() over each employee's weeks: previous
+#               score and rank → score delta, rank movement
+# • streaks   — gaps-and-islands over the direction of each
+#               delta (up / down / flat): the running length of
+#               the current run of improvements or declines
+# Only the target week's rows leave the database.
+# ===========================================================
+
+from datetime import date, timedelta
+
+from django.db import connection
+
+from employee.models import Department, Employee
+from performance.models import PerformanceEvaluation
+
+DEFAULT_LOOKBACK_WEEKS = 12
+MAX_LOOKBACK_WEEKS = 104
+
+TREND_LABELS = {1: "improving", -1: "declining", 0: "steady"}
+
+
+def lookback_start(week_number, year, weeks):
+    """(year, week) of the first ISO week of a `weeks`-long window ending at the given week."""
+    start = date.fromisocalendar(year, week_number, 1) - timedelta(weeks=weeks - 1)
+    iso = start.isocalendar()
+    return iso[0], iso[1]
+
+
+def _trend_sql(department_scoped):
+    qn = connection.ops.quote_name
+    user_model = Employee._meta.get_field("user").related_model
+    evaluation_table = qn(PerformanceEvaluation._meta.db_table)
+    employee_table = qn(Employee._meta.db_table)
+    user_table = qn(user_model._meta.db_table)
+    department_table = qn(Department._meta.db_table)
+
+    def column(model, field):
+        return qn(model._meta.get_field(field).column)
+
+    department_filter = f" AND e.{column(Employee, 'department')} = %s" if department_scoped else ""
+    return (
+        f"WITH weekly AS ("
+        f" SELECT pe.{column(PerformanceEvaluation, 'employee')} AS employee_id,"
+        f" pe.{column(PerformanceEvaluation, 'year')} AS year,"
+        f" pe.{column(PerformanceEvaluation, 'week_number')} AS week_number,"
+        f" AVG(pe.{column(PerformanceEvaluation, 'average_score')}) AS score,"
+        f" SUM(pe.{column(PerformanceEvaluation, 'total_score')}) AS total"
+        f" FROM {evaluation_table} pe"
+        f" INNER JOIN {employee_table} e ON e.id = pe.{column(PerformanceEvaluation, 'employee')}"
+        f" WHERE pe.{column(PerformanceEvaluation, 'year')} * 100 + pe.{column(PerformanceEvaluation, 'week_number')}"
+        f" BETWEEN %s AND %s{department_filter}"
+        f" GROUP BY pe.{column(PerformanceEvaluation, 'employee')}, pe.{column(PerformanceEvaluation, 'year')},"
+        f" pe.{column(PerformanceEvaluation, 'week_number')}"
+        f"), ranked AS ("
+        f" SELECT weekly.*, RANK() OVER (PARTITION BY year, week_number ORDER BY score DESC) AS week_rank"
+        f" FROM weekly"
+        f"), deltas AS ("
+        f" SELECT ranked.*,"
+        f" LAG(year) OVER w AS previous_year,"
+        f" LAG(week_number) OVER w AS previous_week,"
+        f" LAG(score) OVER w AS previous_score,"
+        f" LAG(week_rank) OVER w AS previous_rank,"
+        f" ROW_NUMBER() OVER w AS seq"
+        f" FROM ranked WINDOW w AS (PARTITION BY employee_id ORDER BY year, week_number)"
+        f"), directions AS ("
+        f" SELECT deltas.*,"
+        f" CASE WHEN previous_score IS NULL THEN NULL"
+        f" WHEN score > previous_score THEN 1 WHEN score < previous_score THEN -1 ELSE 0 END AS direction"
+        f" FROM deltas"
+        f"), islands AS ("
+        # Consecutive weeks with the same direction share (seq - position within that direction)
+        f" SELECT directions.*,"
+        f" seq - ROW_NUMBER() OVER (PARTITION BY employee_id, direction ORDER BY year, week_number) AS island"
+        f" FROM directions"
+        f"), streaks AS ("
+        f" SELECT islands.*,"
+        f" CASE WHEN direction IS NULL THEN 0 ELSE COUNT(*) OVER ("
+        f" PARTITION BY employee_id, direction, island ORDER BY year, week_number"
+        f" ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) END AS streak"
+        f" FROM islands"
+        f")"
+        f" SELECT u.{column(user_model, 'emp_id')}, u.{column(user_model, 'first_name')},"
+        f" u.{column(user_model, 'last_name')}, d.{column(Department, 'name')},"
+        f" s.score, s.total, s.week_rank, s.previous_year, s.previous_week, s.previous_score,"
+        f" s.previous_rank, s.direction, s.streak"
+        f" FROM streaks s"
+        f" INNER JOIN {employee_table} e ON e.id = s.employee_id"
+        f" INNER JOIN {user_table} u ON u.id = e.{column(Employee, 'user')}"
+        f" LEFT JOIN {department_table} d ON d.id = e.{column(Employee, 'department')}"
+        f" WHERE s.year = %s AND s.week_number = %s"
+        f" ORDER BY s.week_rank, u.{column(user_model, 'emp_id')}"
+    )
+
+
+def trend_rows(week_number, year, department=None, weeks=DEFAULT_LOOKBACK_WEEKS):
+    """
+    Week-over-week rows for every employee evaluated in the given week.
+
+    The comparison is against each employee's previous evaluated week inside
+    the look-back window; ranks are within the department when one is given,
+    otherwise organization-wide. Rank change is positive when moving up.
+    """
+    start_year, start_week = lookback_start(week_number, year, weeks)
+    params = [start_year * 100 + start_week, year * 100 + week_number]
+    if department is not None:
+        params.append(department.pk)
+    params += [year, week_number]
+
+    with connection.cursor() as cursor:
+        cursor.execute(_trend_sql(department is not None), params)
+        rows = cursor.fetchall()
+
+    records = []
+    for (emp_id, first_name, last_name, department_name, score, total, rank,
+         previous_year, previous_week, previous_score, previous_rank, direction, streak) in rows:
+        records.append({
+            "emp_id": emp_id,
+            "employee_full_name": f"{first_name} {last_name}".strip(),
+            "department": department_name or "-",
+            "week_number": week_number,
+            "year": year,
+            "average_score": float(score or 0),
+            "total_score": float(total or 0),
+            "rank": rank,
+            "previous_week": previous_week,
+            "previous_year": previous_year,
+            "previous_score": float(previous_score) if previous_score is not None else None,
+            "previous_rank": previous_rank,
+            "score_delta": round(float(score) - float(previous_score), 2) if previous_score is not None else None,
+            "rank_change": previous_rank - rank if previous_rank is not None else None,
+            "trend": TREND_LABELS[direction] if direction is not None else "new",
+            "streak": streak,
+        })
+    return records
+
+
+def trend_summary(records):
+    """Counts per trend plus the mean score delta of employees with a previous week."""
+    summary = {label: 0 for label in ("improving", "declining", "steady", "new")}
+    for record in records:
+        summary[record["trend"]] += 1
+    deltas = [r["score_delta"] for r in records if r["score_delta"] is not None]
+    summary["average_delta"] = round(sum(deltas) / len(deltas), 2) if deltas else 0.0
+    return summary
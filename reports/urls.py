@@ -10,10 +10,15 @@ from .views import (
     ManagerReportView,
     ExportWeeklyExcelView,
     ExportMonthlyExcelView,
-    PrintPerformanceReportView, 
+    PrintPerformanceReportView,
+    BulkPerformancePDFView,
     CachedReportListView,
     CachedReportArchiveView,
     CachedReportRestoreView,
+    ReportJobListCreateView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
+    TrendReportView,
 )
 
 # Namespace
@@ -28,13 +33,18 @@ Reporting & Analytics Endpoints:
 🔹 /api/reports/weekly/                     → Weekly consolidated report
 🔹 /api/reports/monthly/                    → Monthly consolidated report
 🔹 /api/reports/department/                 → Department-wise weekly report
-🔹 /api/reports/manager/                    → Manager-wise weekly report (placeholder)
+🔹 /api/reports/manager/                    → Manager-wise weekly report (whole reporting hierarchy)
+🔹 /api/reports/trends/                     → Week-over-week deltas, rank movement and streaks
 🔹 /api/reports/export/weekly-excel/        → Weekly Excel export (.xlsx)
 🔹 /api/reports/export/monthly-excel/       → Monthly Excel export (.xlsx)
+🔹 /api/reports/print/bulk/                 → Department / organization PDFs (ZIP or merged PDF)
 🔹 /api/reports/print/<emp_id>/             → Employee-specific PDF report
 🔹 /api/reports/cache/                      → Cached report listing
 🔹 /api/reports/cache/<id>/archive/         → Archive cached report
 🔹 /api/reports/cache/<id>/restore/         → Restore cached report
+🔹 /api/reports/jobs/                       → Submit (POST) / list background report jobs
+🔹 /api/reports/jobs/<id>/                  → Job status and progress
+🔹 /api/reports/jobs/<id>/download/         → Download a completed job's file
 -------------------------------------------------------------
 All routes are authenticated (Admin/Manager access).
 """
@@ -50,16 +60,23 @@ urlpatterns = [
     # Department & Manager Reports
     path("department/", DepartmentReportView.as_view(), name="department_report"),
     path("manager/", ManagerReportView.as_view(), name="manager_report"),
+    path("trends/", TrendReportView.as_view(), name="trend_report"),
 
     # Excel Exports
     path("export/weekly-excel/", ExportWeeklyExcelView.as_view(), name="export_weekly_excel"),
     path("export/monthly-excel/", ExportMonthlyExcelView.as_view(), name="export_monthly_excel"),
 
-    # PDF Export (New)
+    # PDF Export (New) — bulk route first, <emp_id> would match "bulk"
+    path("print/bulk/", BulkPerformancePDFView.as_view(), name="print_bulk_reports"),
     path("print/<str:emp_id>/", PrintPerformanceReportView.as_view(), name="print_employee_report"),
 
     # Cached Reports
     path("cache/", CachedReportListView.as_view(), name="cached_reports_dashboard"),
     path("cache/<int:pk>/archive/", CachedReportArchiveView.as_view(), name="cached_report_archive"),
     path("cache/<int:pk>/restore/", CachedReportRestoreView.as_view(), name="cached_report_restore"),
+
+    # Background Report Jobs
+    path("jobs/", ReportJobListCreateView.as_view(), name="report_jobs"),
+    path("jobs/<int:pk>/", ReportJobDetailView.as_view(), name="report_job_detail"),
+    path("jobs/<int:pk>/download/", ReportJobDownloadView.as_view(), name="report_job_download"),
 ]
@@ -0,0 +1,117 @@
+# ===========================================================
+# reports/utils/excel_export.py
+# ===========================================================
+# Shared write-only Excel engine for report exports.
+#
+# • openpyxl write-only mode: rows are streamed to disk, never
+#   held as a cell grid in memory
+# • Column widths are measured from the row data while it is
+#   spooled to a temp file, then the sheet is written in one
+#   pass (write-only sheets need widths before the first row)
+# • Any number of sheets; the workbook is saved to a temp file
+#   and streamed back with FileResponse
+# ===========================================================
+
+from collections import namedtuple
+from django.http import FileResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+from itertools import islice
+import pickle
+import tempfile
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+SPOOL_BATCH = 1000
+WIDTH_PADDING = 3
+MAX_COLUMN_WIDTH = 60
+
+THIN_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+
+# title: sheet name; headers: column titles; rows: iterable of lists/tuples;
+# header_color: hex fill of the header row
+SheetSpec = namedtuple("SheetSpec", ["title", "headers", "rows", "header_color"], defaults=["4472C4"])
+
+
+def _cell_width(value):
+    return len(str(value)) if value is not None else 0
+
+
+def _spool(rows, widths, spool_file):
+    """Pickle rows to disk in batches while tracking the widest value per column. Returns row count."""
+    count = 0
+    iterator = iter(rows)
+    while True:
+        batch = [list(row) for row in islice(iterator, SPOOL_BATCH)]
+        if not batch:
+            return count
+        for row in batch:
+            for index, value in enumerate(row):
+                if index < len(widths):
+                    widths[index] = max(widths[index], _cell_width(value))
+        pickle.dump(batch, spool_file, protocol=pickle.HIGHEST_PROTOCOL)
+        count += len(batch)
+
+
+def _replay(spool_file):
+    spool_file.seek(0)
+    while True:
+        try:
+            batch = pickle.load(spool_file)
+        except EOFError:
+            return
+        yield from batch
+
+
+def _write_sheet(wb, spec):
+    ws = wb.create_sheet(title=str(spec.title)[:31])
+    widths = [_cell_width(h) for h in spec.headers]
+
+    with tempfile.TemporaryFile() as spool_file:
+        count = _spool(spec.rows, widths, spool_file)
+
+        for index, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = min(width + WIDTH_PADDING, MAX_COLUMN_WIDTH)
+
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color=spec.header_color, end_color=spec.header_color, fill_type="solid")
+        header = []
+        for title in spec.headers:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.border = THIN_BORDER
+            header.append(cell)
+        ws.append(header)
+
+        for row in _replay(spool_file):
+            ws.append(row)
+    return count
+
+
+def write_workbook(sheets, fileobj):
+    """Write SheetSpecs (any iterable, consumed lazily) to fileobj. Returns {sheet title: row count}."""
+    wb = Workbook(write_only=True)
+    counts = {}
+    for spec in sheets:
+        counts[spec.title] = _write_sheet(wb, spec)
+    if not counts:
+        wb.create_sheet(title="Report")
+    wb.save(fileobj)
+    return counts
+
+
+def excel_response(sheets, filename):
+    """Build the workbook in a temp file and stream it back as an attachment."""
+    output = tempfile.TemporaryFile()
+    write_workbook(sheets, output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,62 @@
+# ===========================================================
+# reports/utils/payload_codec.py
+# ===========================================================
+# Compact-JSON encoding of CachedReport payloads, optionally
+# compressed with zlib or gzip for the binary payload column.
+#
+# • json — stored in the JSON column as before
+# • zlib / gzip — compact JSON (no whitespace), compressed and
+#   stored as bytes; decoded transparently by CachedReport.payload
+# Payloads smaller than REPORT_PAYLOAD_COMPRESSION_MIN_BYTES stay
+# plain: compressing them saves nothing worth the CPU.
+# ===========================================================
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+import gzip
+import json
+import zlib
+
+ENCODINGS = ("json", "zlib", "gzip")
+
+
+def compression_mode():
+    """Configured encoding for new payloads: "zlib", "gzip" or "json" (no compression)."""
+    mode = getattr(settings, "REPORT_PAYLOAD_COMPRESSION", None) or "json"
+    if mode not in ENCODINGS:
+        raise ValueError(f"REPORT_PAYLOAD_COMPRESSION must be one of {', '.join(ENCODINGS)}; got {mode!r}.")
+    return mode
+
+
+def compression_min_bytes():
+    return getattr(settings, "REPORT_PAYLOAD_COMPRESSION_MIN_BYTES", 1024)
+
+
+def compact_json(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_payload(data, encoding=None):
+    """
+    Return (encoding, stored_value, stored_bytes) for a payload.
+    stored_value is the data itself for "json", compressed bytes otherwise.
+    """
+    encoding = encoding or compression_mode()
+    raw = compact_json(data)
+    if encoding == "json" or len(raw) < compression_min_bytes():
+        return "json", data, len(raw)
+    if encoding == "zlib":
+        blob = zlib.compress(raw, 6)
+    else:
+        # mtime=0 keeps the output deterministic for identical payloads
+        blob = gzip.compress(raw, compresslevel=6, mtime=0)
+    return encoding, blob, len(blob)
+
+
+def decode_payload(encoding, value):
+    """Inverse of encode_payload()."""
+    if encoding == "json" or value is None:
+        return value
+    value = bytes(value)  # BinaryField may come back as a memoryview
+    raw = zlib.decompress(value) if encoding == "zlib" else gzip.decompress(value)
+    return json.loads(raw)
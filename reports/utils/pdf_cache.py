@@ -0,0 +1,175 @@
+# ===========================================================
+# reports/utils/pdf_cache.py
+# ===========================================================
+# Content-addressed on-disk cache for rendered PDF reports.
+#
+# • The key is a SHA-256 over everything the PDF shows: report
+#   kind, emp_id, period, each evaluation's id + updated_at (plus
+#   any extra fields a report prints, e.g. rank) and the feedback
+#   average — any change yields a new key, so entries are never
+#   stale, only unused
+# • Hits are served straight from disk (FileResponse) and touched,
+#   so file mtime is the LRU clock
+# • Writes add to a running byte count (seeded by one directory
+#   scan per process); only when it crosses REPORT_PDF_CACHE_MAX_BYTES
+#   is the directory scanned and trimmed, oldest first
+# • Cached renders carry no "generated on" stamp: a hit may be
+#   served long after it was rendered
+# ===========================================================
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout changes so old renders are not served
+RENDER_VERSION = 2
+# Trim to this fraction of the cap, so eviction does not run on every write
+LOW_WATER_RATIO = 0.9
+
+
+# Running size of the cache directory as seen by this process (None = not scanned yet)
+_cache_bytes = None
+_cache_bytes_lock = threading.Lock()
+
+
+def cache_dir():
+    return str(getattr(settings, "REPORT_PDF_CACHE_DIR", os.path.join(settings.MEDIA_ROOT, "pdf_cache")))
+
+
+def max_cache_bytes():
+    return getattr(settings, "REPORT_PDF_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+
+
+def cache_key(kind, emp_id, period, evaluations, feedback_avg, **extra):
+    """
+    SHA-256 of the inputs of one rendered PDF.
+    evaluations: iterable of tuples starting with (id, updated_at, ...).
+    """
+    material = {
+        "version": RENDER_VERSION,
+        "kind": kind,
+        "emp_id": emp_id,
+        "period": period,
+        "evaluations": sorted(list(e) for e in evaluations),
+        "feedback_avg": feedback_avg,
+        "extra": extra,
+    }
+    encoded = json.dumps(material, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _path_for(key):
+    return os.path.join(cache_dir(), key[:2], f"{key}.pdf")
+
+
+def get_or_render(key, render):
+    """
+    Return (path, hit). On a miss, render() must return the PDF bytes; they are
+    written atomically (temp file + rename) so concurrent readers never see a
+    partial file.
+    """
+    path = _path_for(key)
+    try:
+        os.utime(path)
+        return path, True
+    except FileNotFoundError:
+        pass
+
+    content = render()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    try:
+        _record_write(len(content))
+    except OSError as e:
+        logger.warning(f"[PDFCache] Eviction failed: {e}")
+    return path, False
+
+
+def _record_write(size):
+    """Add a written PDF to the running size; evict once it crosses the cap."""
+    global _cache_bytes
+    with _cache_bytes_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _scan())
+        else:
+            _cache_bytes += size
+        if _cache_bytes > max_cache_bytes():
+            evict()
+
+
+def _scan():
+    """(mtime, size, path) of every cached PDF."""
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return []
+    entries = []
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    return entries
+
+
+def evict(max_bytes=None):
+    """
+    Delete least recently used PDFs until the cache is under its low-water mark.
+    Rescans the directory (other processes write to it too) and resets the
+    running size. Returns files removed.
+    """
+    global _cache_bytes
+    max_bytes = max_cache_bytes() if max_bytes is None else max_bytes
+    entries = _scan()
+    total = sum(size for _, size, _ in entries)
+    _cache_bytes = total
+
+    if total <= max_bytes:
+        return 0
+
+    target = int(max_bytes * LOW_WATER_RATIO)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    _cache_bytes = total
+    logger.info(f"[PDFCache] Evicted {removed} PDF(s); cache now {total} bytes.")
+    return removed
+
+
+def cached_pdf_response(key, render, filename):
+    """FileResponse for the cached PDF (rendering it first on a miss), tagged X-PDF-Cache: HIT|MISS."""
+    path, hit = get_or_render(key, render)
+    try:
+        fileobj = open(path, "rb")
+    except FileNotFoundError:
+        # Evicted by a concurrent writer between lookup and open
+        path, hit = get_or_render(key, render)
+        fileobj = open(path, "rb")
+    response = FileResponse(fileobj, as_attachment=True, filename=filename, content_type="application/pdf")
+    response["X-PDF-Cache"] = "HIT" if hit else "MISS"
+    return response
@@ -3,6 +3,10 @@
 # ===========================================================
 # Utility for generating PDF reports for employee performance
 # using ReportLab. Reusable for both individual and bulk reports.
+#
+# Rendering works on plain dicts (employee_report_data) so bulk
+# jobs can render in worker processes: render_performance_pdf /
+# render_merged_pdf need neither models nor Django settings.
 # ===========================================================
 
 from io import BytesIO
@@ -12,23 +16,38 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 
+TABLE_HEADERS = ((50, "Evaluation Type"), (200, "Average Score"), (330, "Planned Hours"), (440, "Actual Hours"))
 
-def generate_employee_performance_pdf(employee, evaluations, week=None):
-    """
-    Generates a printable PDF performance report for a given employee.
 
-    Args:
-        employee: Employee model instance
-        evaluations: Queryset of PerformanceEvaluation objects
-        week: Optional ISO week (e.g., '2025-W43')
+def employee_report_data(emp_id, full_name, department, evaluations, week=None, feedback_avg=0, generated_on=None):
+    """
+    Plain, picklable input for the renderers.
 
-    Returns:
-        HttpResponse (PDF file ready for download)
+    evaluations: iterable of (evaluation_type, average_score, planned_hours, actual_hours)
     """
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    pdf.setTitle(f"Performance Report - {employee.user.emp_id}")
+    return {
+        "emp_id": emp_id,
+        "full_name": full_name,
+        "department": department or "N/A",
+        "week": week,
+        "feedback_avg": feedback_avg,
+        # "" leaves the stamp out (cached renders outlive the moment they were made)
+        "generated_on": timezone.now().strftime("%Y-%m-%d %H:%M:%S") if generated_on is None else generated_on,
+        "evaluations": [tuple(row) for row in evaluations],
+    }
+
+
+def _draw_table_header(pdf, y):
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.setFillColor(colors.darkblue)
+    for x, title in TABLE_HEADERS:
+        pdf.drawString(x, y, title)
+    pdf.setFillColor(colors.black)
+    pdf.line(45, y - 5, 550, y - 5)
 
+
+def _draw_employee_report(pdf, data):
+    """Draw one employee's report onto the canvas (ends with its last page shown)."""
     # -----------------------------------------------------------
     # HEADER SECTION
     # -----------------------------------------------------------
@@ -36,45 +55,30 @@ def generate_employee_performance_pdf(employee, evaluations, week=None):
     pdf.drawString(160, 800, "Employee Performance Report")
 
     pdf.setFont("Helvetica", 12)
-    pdf.drawString(50, 770, f"Employee ID: {employee.user.emp_id}")
-    pdf.drawString(50, 755, f"Name: {employee.user.first_name} {employee.user.last_name}")
-    pdf.drawString(50, 740, f"Department: {employee.department.name if employee.department else 'N/A'}")
-    if week:
-        pdf.drawString(50, 725, f"Week: {week}")
-    pdf.drawString(50, 710, f"Generated On: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    pdf.drawString(50, 770, f"Employee ID: {data['emp_id']}")
+    pdf.drawString(50, 755, f"Name: {data['full_name']}")
+    pdf.drawString(50, 740, f"Department: {data['department']}")
+    if data["week"]:
+        pdf.drawString(50, 725, f"Week: {data['week']}")
+    if data["generated_on"]:
+        pdf.drawString(50, 710, f"Generated On: {data['generated_on']}")
 
     # -----------------------------------------------------------
-    # TABLE HEADER
+    # TABLE
     # -----------------------------------------------------------
     y = 680
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.setFillColor(colors.darkblue)
-    pdf.drawString(50, y, "Evaluation Type")
-    pdf.drawString(200, y, "Average Score")
-    pdf.drawString(330, y, "Planned Hours")
-    pdf.drawString(440, y, "Actual Hours")
-    pdf.setFillColor(colors.black)
-    pdf.line(45, y - 5, 550, y - 5)
-
-    # -----------------------------------------------------------
-    # TABLE DATA
-    # -----------------------------------------------------------
+    _draw_table_header(pdf, y)
     pdf.setFont("Helvetica", 11)
     y -= 25
     total_avg = 0
     count = 0
 
-    for eval_obj in evaluations:
-        try:
-            metrics = eval_obj.metrics_breakdown or {}
-            avg_score = round(sum(metrics.values()) / len(metrics), 2) if metrics else 0
-        except Exception:
-            avg_score = 0
-
-        pdf.drawString(50, y, eval_obj.evaluation_type or "N/A")
+    for evaluation_type, avg_score, planned_hours, actual_hours in data["evaluations"]:
+        avg_score = round(avg_score or 0, 2)
+        pdf.drawString(50, y, evaluation_type or "N/A")
         pdf.drawString(200, y, str(avg_score))
-        pdf.drawString(330, y, str(getattr(eval_obj, "planned_hours", "-")))
-        pdf.drawString(440, y, str(getattr(eval_obj, "actual_hours", "-")))
+        pdf.drawString(330, y, str(planned_hours))
+        pdf.drawString(440, y, str(actual_hours))
 
         y -= 20
         count += 1
@@ -84,27 +88,19 @@ def generate_employee_performance_pdf(employee, evaluations, week=None):
         if y < 80:
             pdf.showPage()
             y = 800
-            pdf.setFont("Helvetica-Bold", 12)
-            pdf.drawString(50, y, "Evaluation Type")
-            pdf.drawString(200, y, "Average Score")
-            pdf.drawString(330, y, "Planned Hours")
-            pdf.drawString(440, y, "Actual Hours")
-            pdf.line(45, y - 5, 550, y - 5)
+            _draw_table_header(pdf, y)
             pdf.setFont("Helvetica", 11)
             y -= 25
 
     # -----------------------------------------------------------
     # SUMMARY SECTION
     # -----------------------------------------------------------
-    if count > 0:
-        overall_avg = round(total_avg / count, 2)
-    else:
-        overall_avg = 0
+    overall_avg = round(total_avg / count, 2) if count > 0 else 0
 
     pdf.setFont("Helvetica-Bold", 12)
     pdf.drawString(50, y - 15, f"Total Evaluations: {count}")
     pdf.drawString(250, y - 15, f"Overall Average Score: {overall_avg}")
-    pdf.drawString(450, y - 15, f"Feedback Avg: {getattr(employee, 'latest_feedback_avg', 0)}")
+    pdf.drawString(450, y - 15, f"Feedback Avg: {data['feedback_avg']}")
 
     # -----------------------------------------------------------
     # FOOTER
@@ -113,16 +109,77 @@ def generate_employee_performance_pdf(employee, evaluations, week=None):
     pdf.setFillColor(colors.grey)
     pdf.drawString(200, 40, "Generated by Employee Performance Tracking System (EPTS)")
     pdf.setFillColor(colors.black)
-
-    # Finalize PDF
     pdf.showPage()
+
+
+def render_performance_pdf(data):
+    """Render one employee_report_data dict to PDF bytes."""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(f"Performance Report - {data['emp_id']}")
+    _draw_employee_report(pdf, data)
     pdf.save()
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def render_merged_pdf(reports, title="Performance Reports"):
+    """Render several employee_report_data dicts into one PDF, each starting on a new page."""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(title)
+    for data in reports:
+        pdf.bookmarkPage(data["emp_id"])
+        pdf.addOutlineEntry(f"{data['emp_id']} — {data['full_name']}", data["emp_id"])
+        _draw_employee_report(pdf, data)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def employee_report_data_from_models(employee, evaluations, week=None, stamped=True):
+    """
+    employee_report_data() for an Employee instance and its PerformanceEvaluations.
+    stamped=False leaves out the "Generated On" line (for cached renders).
+    """
+    return employee_report_data(
+        employee.user.emp_id,
+        f"{employee.user.first_name} {employee.user.last_name}",
+        employee.department.name if employee.department else None,
+        (
+            (
+                e.evaluation_type,
+                e.average_score,
+                getattr(e, "planned_hours", "-"),
+                getattr(e, "actual_hours", "-"),
+            )
+            for e in evaluations
+        ),
+        week=week,
+        feedback_avg=getattr(employee, "latest_feedback_avg", 0),
+        generated_on=None if stamped else "",
+    )
+
+
+def performance_pdf_filename(employee):
+    return f"Performance_Report_{employee.user.emp_id}_{timezone.now().strftime('%Y%m%d')}.pdf"
+
+
+def generate_employee_performance_pdf(employee, evaluations, week=None):
+    """
+    Generates a printable PDF performance report for a given employee.
+
+    Args:
+        employee: Employee model instance
+        evaluations: Queryset of PerformanceEvaluation objects
+        week: Optional ISO week (e.g., '2025-W43')
+
+    Returns:
+        HttpResponse (PDF file ready for download)
+    """
+    content = render_performance_pdf(employee_report_data_from_models(employee, evaluations, week=week))
 
     # -----------------------------------------------------------
     # RESPONSE
     # -----------------------------------------------------------
-    filename = f"Performance_Report_{employee.user.emp_id}_{timezone.now().strftime('%Y%m%d')}.pdf"
-    response = HttpResponse(buffer, content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response = HttpResponse(content, content_type="application/pdf")
+    response["Content-Disposition"] = f'attachment; filename="{performance_pdf_filename(employee)}"'
     return response
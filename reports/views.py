@@ -4,32 +4,45 @@
 # Handles:
 # - Weekly Consolidated Report
 # - Monthly Consolidated Report
-# - Manager-Wise Report
+# - Manager-Wise Report (direct + indirect reports)
 # - Department-Wise Report
 # - Employee Performance History
-# - CSV Export
+# - CSV / NDJSON streaming export (?export=csv|ndjson)
 # - Excel Export (Weekly + Monthly)
-# - PDF Export (Print Performance Report)
+# - PDF Export (Print Performance Report, bulk ZIP / merged PDF)
+# - Background report jobs (submit / poll / download)
+# - Week-over-week trends (score delta, rank movement, streaks)
 # ===============================================
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
-from django.db.models import Avg, F, Q, Window
-from django.db.models.functions import Rank
+from django.http import FileResponse, HttpResponse
 from django.utils import timezone
-from django.http import HttpResponse
-from datetime import timedelta, datetime
 from itertools import chain
 import csv
 import logging
+import tempfile
+import time
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
-from employee.models import Employee
+from employee.models import Department, Employee
 from performance.models import PerformanceEvaluation
-from feedback.models import GeneralFeedback, ManagerFeedback, ClientFeedback
+from feedback.aggregates import feedback_average_map
+from .builders import (
+    department_report_rows,
+    iter_monthly_report_rows,
+    iter_weekly_report_rows,
+    monthly_excel_sheet,
+    weekly_excel_sheets,
+    MONTHLY_COLUMNS,
+    WEEKLY_COLUMNS,
+)
+from .dataset import department_dataset, monthly_dataset, weekly_dataset
+from .streaming import requested_export, streaming_export_response
+from .bulk_pdf import bulk_report_data, parallel_threshold, pdf_workers, write_zip
+from .hierarchy import manager_report, team_members
+from .trends import DEFAULT_LOOKBACK_WEEKS, MAX_LOOKBACK_WEEKS, trend_rows, trend_summary
+from .cache import cache_info, fresh_report, store_report, with_cache_headers
 from .models import CachedReport
 from .serializers import (
     WeeklyReportSerializer,
@@ -38,9 +51,22 @@ from .serializers import (
     ManagerReportSerializer,
     DepartmentReportSerializer,
     CachedReportSerializer,
+    CachedReportListSerializer,
+    ReportJobCreateSerializer,
+    ReportJobSerializer,
+    TrendReportSerializer,
 )
-
-from reports.utils.pdf_generator import generate_employee_performance_pdf
+from . import jobs
+from .models import ReportJob
+
+from reports.utils.pdf_cache import cache_key, cached_pdf_response
+from reports.utils.pdf_generator import (
+    employee_report_data_from_models,
+    performance_pdf_filename,
+    render_merged_pdf,
+    render_performance_pdf,
+)
+from reports.utils.excel_export import excel_response
 from notifications.views import create_report_notification 
 
 logger = logging.getLogger(__name__)
@@ -50,18 +76,12 @@ logger = logging.getLogger(__name__)
 # Helper: Compute Feedback Average
 # ===========================================================
 def get_feedback_average(employee, start_date=None, end_date=None):
-    """Compute average rating across all feedback sources for a given employee."""
-    filters = Q(employee=employee)
-    if start_date and end_date:
-        filters &= Q(created_at__range=(start_date, end_date))
-
-    ratings = list(chain(
-        GeneralFeedback.objects.filter(filters).values_list("rating", flat=True),
-        ManagerFeedback.objects.filter(filters).values_list("rating", flat=True),
-        ClientFeedback.objects.filter(filters).values_list("rating", flat=True),
-    ))
-
-    return round(sum(ratings) / len(ratings), 2) if ratings else 0.0
+    """
+    Compute average rating across all feedback sources for a given employee.
+    Single-employee wrapper over feedback.aggregates — for more than one
+    employee call feedback_average_map() once instead.
+    """
+    return feedback_average_map([employee.id], start_date=start_date, end_date=end_date)[employee.id]
 
 
 # ===========================================================
@@ -71,59 +91,41 @@ class WeeklyReportView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        """Return consolidated weekly performance summary."""
+        """
+        Return consolidated weekly performance summary.
+        Served from the cached report of the week while it is fresh
+        (?refresh=true recomputes); the "cache" block tells hit/miss and age.
+        ?export=csv|ndjson streams the rows instead (week=all for the whole year).
+        """
         try:
+            export = requested_export(request)
+            if export:
+                year = int(request.query_params.get("year", timezone.now().year))
+                week = request.query_params.get("week", str(timezone.now().isocalendar()[1]))
+                if week.lower() == "all":
+                    rows = iter_weekly_report_rows(PerformanceEvaluation.objects.filter(year=year))
+                else:
+                    rows = weekly_dataset(int(week), year).rows()
+                return streaming_export_response(
+                    export, f"Weekly_Performance_Report_Week{week}_{year}", WEEKLY_COLUMNS, rows
+                )
+
             week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
             year = int(request.query_params.get("year", timezone.now().year))
-            save_cache = request.query_params.get("save_cache", "false").lower() == "true"
+            refresh = request.query_params.get("refresh", "false").lower() == "true"
 
-            qs = (
-                PerformanceEvaluation.objects.filter(week_number=week, year=year)
-                .select_related("employee__user", "department")
-                .annotate(emp_id=F("employee__user__emp_id"))
-            )
+            cached = None if refresh else fresh_report("weekly", year, week_number=week)
+            if cached:
+                return self._response(week, year, cached.payload["records"], cache_info(cached))
 
-            if not qs.exists():
+            result = list(weekly_dataset(week, year).rows())
+            if not result:
                 return Response(
                     {"message": f"No performance data found for Week {week}, {year}."},
                     status=status.HTTP_200_OK,
                 )
 
-            feedback_map = {
-                emp.id: get_feedback_average(emp)
-                for emp in Employee.objects.filter(id__in=qs.values_list("employee_id", flat=True))
-            }
-
-            ranked = qs.annotate(
-                computed_rank=Window(expression=Rank(), order_by=F("total_score").desc())
-            )
-
-            result = [
-                {
-                    "emp_id": p.employee.user.emp_id,
-                    "employee_full_name": f"{p.employee.user.first_name} {p.employee.user.last_name}".strip(),
-                    "department": p.department.name if p.department else "-",
-                    "total_score": float(p.total_score),
-                    "average_score": float(p.average_score),
-                    "feedback_avg": feedback_map.get(p.employee.id, 0.0),
-                    "week_number": week,
-                    "year": year,
-                    "rank": int(p.computed_rank),
-                    "remarks": p.remarks or "",
-                }
-                for p in ranked
-            ]
-
-            if save_cache:
-                CachedReport.objects.update_or_create(
-                    report_type="weekly",
-                    year=year,
-                    week_number=week,
-                    defaults={
-                        "payload": {"records": result},
-                        "generated_by": request.user,
-                    },
-                )
+            store_report("weekly", year, {"records": result}, user=request.user, week_number=week)
 
             # Create notification for weekly report generation
             try:
@@ -138,19 +140,24 @@ class WeeklyReportView(APIView):
             except Exception as e:
                 logger.error(f"Weekly report notification failed: {e}")
 
-            return Response(
-                {
-                    "evaluation_period": f"Week {week}, {year}",
-                    "total_records": len(result),
-                    "records": WeeklyReportSerializer(result, many=True).data,
-                },
-                status=status.HTTP_200_OK,
-            )
+            return self._response(week, year, result, cache_info())
 
         except Exception as e:
             logger.exception("WeeklyReport Error: %s", str(e))
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _response(self, week, year, records, cache):
+        response = Response(
+            {
+                "evaluation_period": f"Week {week}, {year}",
+                "total_records": len(records),
+                "records": WeeklyReportSerializer(records, many=True).data,
+                "cache": cache,
+            },
+            status=status.HTTP_200_OK,
+        )
+        return with_cache_headers(response, cache)
+
 
 # ===========================================================
 # 2. MONTHLY CONSOLIDATED REPORT
@@ -159,61 +166,47 @@ class MonthlyReportView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        """Return monthly average performance summary."""
+        """
+        Return monthly average performance summary.
+        Served from the cached report of the month while it is fresh
+        (?refresh=true recomputes); the "cache" block tells hit/miss and age.
+        ?export=csv|ndjson streams the rows instead (month=all for the whole year).
+        """
         try:
+            export = requested_export(request)
+            if export:
+                year = int(request.query_params.get("year", timezone.now().year))
+                month = request.query_params.get("month", str(timezone.now().month))
+                months = range(1, 13) if month.lower() == "all" else [int(month)]
+                if any(not 1 <= m <= 12 for m in months):
+                    return Response({"error": "Month must be between 1 and 12."}, status=status.HTTP_400_BAD_REQUEST)
+                if len(months) == 1:
+                    rows = monthly_dataset(months[0], year).rows()
+                else:
+                    rows = chain.from_iterable(iter_monthly_report_rows(m, year) for m in months)
+                return streaming_export_response(
+                    export, f"Monthly_Performance_Report_{month}_{year}", MONTHLY_COLUMNS, rows
+                )
+
             month = int(request.query_params.get("month", timezone.now().month))
             year = int(request.query_params.get("year", timezone.now().year))
-            save_cache = request.query_params.get("save_cache", "false").lower() == "true"
+            refresh = request.query_params.get("refresh", "false").lower() == "true"
+
+            if not 1 <= month <= 12:
+                return Response({"error": "Month must be between 1 and 12."}, status=status.HTTP_400_BAD_REQUEST)
 
-            qs = PerformanceEvaluation.objects.filter(
-                review_date__month=month, year=year
-            ).select_related("employee__user", "department")
+            cached = None if refresh else fresh_report("monthly", year, month=month)
+            if cached:
+                return self._response(month, year, cached.payload["records"], cache_info(cached))
 
-            if not qs.exists():
+            data = list(monthly_dataset(month, year).rows())
+            if not data:
                 return Response(
                     {"message": f"No performance data found for {month}/{year}."},
                     status=status.HTTP_200_OK,
                 )
 
-            data = []
-            employees = Employee.objects.filter(id__in=qs.values_list("employee_id", flat=True))
-
-            for emp in employees.select_related("user", "department"):
-                emp_qs = qs.filter(employee=emp)
-                if not emp_qs.exists():
-                    continue
-
-                avg_score = round(emp_qs.aggregate(avg=Avg("average_score"))["avg"], 2)
-                best_week_obj = emp_qs.order_by("-average_score").first()
-
-                fb_avg = get_feedback_average(
-                    emp,
-                    start_date=best_week_obj.created_at - timedelta(days=30),
-                    end_date=best_week_obj.created_at,
-                )
-
-                data.append({
-                    "emp_id": emp.user.emp_id,
-                    "employee_full_name": f"{emp.user.first_name} {emp.user.last_name}".strip(),
-                    "department": emp.department.name if emp.department else "-",
-                    "month": month,
-                    "year": year,
-                    "avg_score": avg_score,
-                    "feedback_avg": fb_avg,
-                    "best_week": best_week_obj.week_number,
-                    "best_week_score": best_week_obj.average_score,
-                })
-
-            if save_cache:
-                CachedReport.objects.update_or_create(
-                    report_type="monthly",
-                    year=year,
-                    month=month,
-                    defaults={
-                        "payload": {"records": data},
-                        "generated_by": request.user,
-                    },
-                )
+            store_report("monthly", year, {"records": data}, user=request.user, month=month)
 
             # Create notification for monthly report generation
             try:
@@ -228,61 +221,82 @@ class MonthlyReportView(APIView):
             except Exception as e:
                 logger.error(f"Monthly report notification failed: {e}")
 
-            return Response(
-                {
-                    "evaluation_period": f"Month {month}, {year}",
-                    "total_records": len(data),
-                    "records": MonthlyReportSerializer(data, many=True).data,
-                },
-                status=status.HTTP_200_OK,
-            )
+            return self._response(month, year, data, cache_info())
 
         except Exception as e:
             logger.exception("MonthlyReport Error: %s", str(e))
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _response(self, month, year, records, cache):
+        response = Response(
+            {
+                "evaluation_period": f"Month {month}, {year}",
+                "total_records": len(records),
+                "records": MonthlyReportSerializer(records, many=True).data,
+                "cache": cache,
+            },
+            status=status.HTTP_200_OK,
+        )
+        return with_cache_headers(response, cache)
+
 
 # ===========================================================
 # 3. DEPARTMENT-WISE WEEKLY REPORT (Final)
 # ===========================================================
 class DepartmentReportView(APIView):
-    """Returns department-wise weekly performance report."""
+    """
+    Returns department-wise weekly performance report.
+    Served from the cached report of the department-week while it is fresh
+    (?refresh=true recomputes).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         department_name = request.query_params.get("department_name")
-        week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
-        year = int(request.query_params.get("year", timezone.now().year))
-
         if not department_name:
             return Response({"error": "Please provide department_name."}, status=status.HTTP_400_BAD_REQUEST)
 
+        # ?export=csv|ndjson streams the rows instead (week=all for the whole year)
+        export = requested_export(request)
+        week = request.query_params.get("week", str(timezone.now().isocalendar()[1]))
         try:
-            employees = Employee.objects.filter(department__name__iexact=department_name)
-            if not employees.exists():
-                return Response({"message": f"No employees found in department {department_name}."}, status=status.HTTP_200_OK)
+            year = int(request.query_params.get("year", timezone.now().year))
+            if not (export and week.lower() == "all"):
+                week = int(week)
+        except ValueError:
+            return Response(
+                {"error": "week and year must be integers (week=all is allowed with export)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            qs = PerformanceEvaluation.objects.filter(employee__in=employees, week_number=week, year=year).select_related("employee__user", "department")
-            if not qs.exists():
-                return Response({"message": f"No performance data found for department {department_name} in Week {week}, {year}."}, status=status.HTTP_200_OK)
+        if export:
+            department = Department.objects.filter(name__iexact=department_name).first()
+            if isinstance(week, str):  # week=all
+                rows = iter_weekly_report_rows(
+                    PerformanceEvaluation.objects.filter(employee__department__name__iexact=department_name, year=year)
+                )
+            else:
+                rows = department_dataset(department, week, year).rows() if department else iter(())
+            return streaming_export_response(
+                export, f"Department_Report_{department_name}_Week{week}_{year}", WEEKLY_COLUMNS, rows
+            )
 
-            feedback_map = {emp.id: get_feedback_average(emp) for emp in employees}
+        refresh = request.query_params.get("refresh", "false").lower() == "true"
 
-            ranked = qs.annotate(computed_rank=Window(expression=Rank(), order_by=F("total_score").desc()))
+        try:
+            department = Department.objects.filter(name__iexact=department_name).first()
+            if not department or not Employee.objects.filter(department=department).exists():
+                return Response({"message": f"No employees found in department {department_name}."}, status=status.HTTP_200_OK)
 
-            records = [
-                {
-                    "department_name": department_name,
-                    "emp_id": perf.employee.user.emp_id,
-                    "employee_full_name": f"{perf.employee.user.first_name} {perf.employee.user.last_name}".strip(),
-                    "total_score": float(perf.total_score),
-                    "average_score": float(perf.average_score),
-                    "feedback_avg": feedback_map.get(perf.employee.id, 0.0),
-                    "rank": int(perf.computed_rank),
-                    "remarks": perf.remarks or "",
-                }
-                for perf in ranked
-            ]
+            cached = None if refresh else fresh_report("department", year, week_number=week, department=department)
+            if cached:
+                return self._response(department_name, week, year, cached.payload["records"], cache_info(cached))
+
+            records = department_report_rows(department, week, year, rows=department_dataset(department, week, year).rows())
+            if not records:
+                return Response({"message": f"No performance data found for department {department_name} in Week {week}, {year}."}, status=status.HTTP_200_OK)
+
+            store_report("department", year, {"records": records}, user=request.user, week_number=week, department=department)
 
             create_report_notification(
                 triggered_by=request.user,
@@ -292,129 +306,128 @@ class DepartmentReportView(APIView):
                 department=None,
             )
 
-            return Response(
-                {"department_name": department_name, "evaluation_period": f"Week {week}, {year}", "total_employees": len(records), "records": records},
-                status=status.HTTP_200_OK,
-            )
+            return self._response(department_name, week, year, records, cache_info())
 
         except Exception as e:
             logger.exception(f"DepartmentReport Error: {str(e)}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _response(self, department_name, week, year, records, cache):
+        response = Response(
+            {
+                "department_name": department_name,
+                "evaluation_period": f"Week {week}, {year}",
+                "total_employees": len(records),
+                "records": records,
+                "cache": cache,
+            },
+            status=status.HTTP_200_OK,
+        )
+        return with_cache_headers(response, cache)
+
 
 # ===========================================================
-# 4. MANAGER REPORT (Placeholder)
+# 4. MANAGER REPORT (Reporting Hierarchy)
 # ===========================================================
 class ManagerReportView(APIView):
-    """Placeholder: Manager-wise weekly report."""
+    """
+    Weekly rollup of a manager's direct and indirect reports: team average,
+    score distribution, top/weak members and per-metric averages.
+
+    Example:
+      GET /api/reports/manager/?manager=EMP0001&week=44&year=2025
+
+    Managers get their own team by default and may open any manager below
+    them; admins may open any manager. Served from the cached report while
+    fresh (?refresh=true recomputes).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        return Response(
-            {"message": "Manager-wise report endpoint under construction."},
-            status=status.HTTP_200_OK,
-        )
+        role = getattr(request.user, "role", "").lower()
+        if role not in ["admin", "manager"]:
+            return Response({"error": "Only Admin or Manager can view manager reports."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
+            year = int(request.query_params.get("year", timezone.now().year))
+            refresh = request.query_params.get("refresh", "false").lower() == "true"
+            manager_emp_id = request.query_params.get("manager")
+
+            if manager_emp_id:
+                manager = Employee.objects.select_related("user", "department").filter(
+                    user__emp_id__iexact=manager_emp_id
+                ).first()
+                if not manager:
+                    return Response({"error": f"Manager with ID {manager_emp_id} not found."}, status=status.HTTP_404_NOT_FOUND)
+            elif role == "manager":
+                manager = Employee.objects.select_related("user", "department").filter(user=request.user).first()
+                if not manager:
+                    return Response({"error": "No employee profile found for the current user."}, status=status.HTTP_404_NOT_FOUND)
+            else:
+                return Response({"error": "Please provide manager (emp_id)."}, status=status.HTTP_400_BAD_REQUEST)
+
+            if role == "manager" and manager.user_id != request.user.id:
+                own_profile = Employee.objects.filter(user=request.user).values_list("id", flat=True).first()
+                if not own_profile or manager.id not in team_members(own_profile):
+                    return Response({"error": "You can only view managers within your own team."}, status=status.HTTP_403_FORBIDDEN)
+
+            cached = None if refresh else fresh_report("manager", year, week_number=week, manager=manager.user)
+            if cached:
+                return self._response(cached.payload, cache_info(cached))
+
+            payload = manager_report(manager, week, year)
+            if payload["records"]:
+                store_report("manager", year, payload, user=request.user, week_number=week, manager=manager.user)
+            return self._response(payload, cache_info())
+
+        except Exception as e:
+            logger.exception("ManagerReport Error: %s", str(e))
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def _response(self, payload, cache):
+        data = dict(payload)
+        for key in ("records", "top_members", "weak_members"):
+            data[key] = ManagerReportSerializer(payload[key], many=True).data
+        data["cache"] = cache
+        return with_cache_headers(Response(data, status=status.HTTP_200_OK), cache)
 
 
 # ===========================================================
 # 5. EXCEL EXPORT (Weekly + Monthly) — Final Version
 # ===========================================================
 class ExportWeeklyExcelView(APIView):
-    """Exports weekly performance data to Excel."""
+    """
+    Exports weekly performance data to Excel.
+    week=all exports the whole year, one sheet per week.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         try:
-            week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
+            week = request.query_params.get("week", str(timezone.now().isocalendar()[1]))
             year = int(request.query_params.get("year", timezone.now().year))
+            all_weeks = week.lower() == "all"
 
-            qs = (
-                PerformanceEvaluation.objects.filter(week_number=week, year=year)
-                .select_related("employee__user", "department")
-                .annotate(emp_id=F("employee__user__emp_id"))
-            )
+            qs = PerformanceEvaluation.objects.filter(year=year)
+            if all_weeks:
+                rows, empty = None, not qs.exists()
+            else:
+                week = int(week)
+                dataset = weekly_dataset(week, year)
+                rows, empty = dataset.rows(), not dataset
 
-            if not qs.exists():
+            if empty:
                 return Response(
                     {"message": f"No performance data found for Week {week}, {year}."},
                     status=status.HTTP_200_OK,
                 )
 
-            # Create Excel workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = f"Week_{week}_{year}"
-
-            # Header style
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin"),
+            filename = (
+                f"Weekly_Performance_Report_{year}.xlsx" if all_weeks
+                else f"Weekly_Performance_Report_Week{week}_{year}.xlsx"
             )
-
-            headers = [
-                "Emp ID",
-                "Employee Name",
-                "Department",
-                "Total Score",
-                "Average Score",
-                "Feedback Avg",
-                "Rank",
-                "Remarks",
-            ]
-            ws.append(headers)
-
-            # Apply header styling
-            for col in ws.iter_cols(min_row=1, max_row=1):
-                for cell in col:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    cell.border = border
-
-            feedback_map = {
-                emp.id: get_feedback_average(emp)
-                for emp in Employee.objects.filter(id__in=qs.values_list("employee_id", flat=True))
-            }
-
-            ranked = qs.annotate(computed_rank=Window(expression=Rank(), order_by=F("total_score").desc()))
-
-            for perf in ranked:
-                ws.append(
-                    [
-                        perf.employee.user.emp_id,
-                        f"{perf.employee.user.first_name} {perf.employee.user.last_name}",
-                        perf.department.name if perf.department else "-",
-                        float(perf.total_score),
-                        float(perf.average_score),
-                        feedback_map.get(perf.employee.id, 0.0),
-                        int(perf.computed_rank),
-                        perf.remarks or "",
-                    ]
-                )
-
-            # Auto-adjust column width
-            for col in ws.columns:
-                max_length = 0
-                col_letter = col[0].column_letter
-                for cell in col:
-                    try:
-                        max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                ws.column_dimensions[col_letter].width = max_length + 3
-
-            # Create response
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            filename = f"Weekly_Performance_Report_Week{week}_{year}.xlsx"
-            response["Content-Disposition"] = f'attachment; filename="{filename}"'
-            wb.save(response)
-            return response
+            return excel_response(weekly_excel_sheets(qs, rows), filename)
 
         except Exception as e:
             logger.exception("ExportWeeklyExcel Error: %s", str(e))
@@ -430,91 +443,18 @@ class ExportMonthlyExcelView(APIView):
             month = int(request.query_params.get("month", timezone.now().month))
             year = int(request.query_params.get("year", timezone.now().year))
 
-            qs = PerformanceEvaluation.objects.filter(review_date__month=month, year=year).select_related(
-                "employee__user", "department"
-            )
+            if not 1 <= month <= 12:
+                return Response({"error": "Month must be between 1 and 12."}, status=status.HTTP_400_BAD_REQUEST)
 
-            if not qs.exists():
+            dataset = monthly_dataset(month, year)
+            if not dataset:
                 return Response(
                     {"message": f"No performance data found for {month}/{year}."},
                     status=status.HTTP_200_OK,
                 )
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = f"Month_{month}_{year}"
-
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin"),
-            )
-
-            headers = [
-                "Emp ID",
-                "Employee Name",
-                "Department",
-                "Average Score",
-                "Feedback Avg",
-                "Best Week",
-                "Best Week Score",
-            ]
-            ws.append(headers)
-
-            for col in ws.iter_cols(min_row=1, max_row=1):
-                for cell in col:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    cell.border = border
-
-            employees = Employee.objects.filter(id__in=qs.values_list("employee_id", flat=True))
-            for emp in employees.select_related("user", "department"):
-                emp_qs = qs.filter(employee=emp)
-                if not emp_qs.exists():
-                    continue
-
-                avg_score = round(emp_qs.aggregate(avg=Avg("average_score"))["avg"], 2)
-                best_week_obj = emp_qs.order_by("-average_score").first()
-                fb_avg = get_feedback_average(
-                    emp,
-                    start_date=best_week_obj.created_at - timedelta(days=30),
-                    end_date=best_week_obj.created_at,
-                )
-
-                ws.append(
-                    [
-                        emp.user.emp_id,
-                        f"{emp.user.first_name} {emp.user.last_name}",
-                        emp.department.name if emp.department else "-",
-                        avg_score,
-                        fb_avg,
-                        best_week_obj.week_number,
-                        best_week_obj.average_score,
-                    ]
-                )
-
-            # Auto-fit columns
-            for col in ws.columns:
-                max_length = 0
-                col_letter = col[0].column_letter
-                for cell in col:
-                    try:
-                        max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                ws.column_dimensions[col_letter].width = max_length + 3
-
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            filename = f"Monthly_Performance_Report_{month}_{year}.xlsx"
-            response["Content-Disposition"] = f'attachment; filename="{filename}"'
-            wb.save(response)
-            return response
+            sheet = monthly_excel_sheet(month, year, dataset.rows())
+            return excel_response([sheet], f"Monthly_Performance_Report_{month}_{year}.xlsx")
 
         except Exception as e:
             logger.exception("ExportMonthlyExcel Error: %s", str(e))
@@ -547,11 +487,9 @@ class PrintPerformanceReportView(APIView):
                 return Response({"error": f"Employee with ID {emp_id} not found."}, status=status.HTTP_404_NOT_FOUND)
 
             # Fetch performance evaluations for the selected week
-            evaluations = PerformanceEvaluation.objects.filter(
-                employee=employee, week_number=week, year=year
-            ).select_related("employee__user", "department")
+            evaluations = list(PerformanceEvaluation.objects.filter(employee=employee, week_number=week, year=year))
 
-            if not evaluations.exists():
+            if not evaluations:
                 return Response(
                     {"message": f"No performance records found for {emp_id} in Week {week}, {year}."},
                     status=status.HTTP_200_OK,
@@ -560,8 +498,24 @@ class PrintPerformanceReportView(APIView):
             # Compute feedback average for display
             employee.latest_feedback_avg = get_feedback_average(employee)
 
-            # Generate the PDF using the utility
-            pdf_response = generate_employee_performance_pdf(employee, evaluations, week=f"Week {week}, {year}")
+            # Serve the PDF from the on-disk cache; render only when its inputs changed
+            week_label = f"Week {week}, {year}"
+            key = cache_key(
+                "employee-week",
+                employee.user.emp_id,
+                week_label,
+                [(e.id, e.updated_at) for e in evaluations],
+                employee.latest_feedback_avg,
+                name=f"{employee.user.first_name} {employee.user.last_name}",
+                department=employee.department.name if employee.department else None,
+            )
+            pdf_response = cached_pdf_response(
+                key,
+                lambda: render_performance_pdf(
+                    employee_report_data_from_models(employee, evaluations, week=week_label, stamped=False)
+                ),
+                performance_pdf_filename(employee),
+            )
 
             # Create a notification for this PDF export
             try:
@@ -575,7 +529,7 @@ class PrintPerformanceReportView(APIView):
             except Exception as e:
                 logger.warning(f"PDF export notification failed: {e}")
 
-            logger.info(f"PDF performance report generated for {emp_id}, Week {week}, {year}.")
+            logger.info(f"PDF performance report served for {emp_id}, Week {week}, {year} (cache {pdf_response['X-PDF-Cache']}).")
             return pdf_response
 
         except Exception as e:
@@ -583,6 +537,85 @@ class PrintPerformanceReportView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class BulkPerformancePDFView(APIView):
+    """
+    Weekly performance PDFs for a whole department, or the whole organization
+    when no department is given, as one download.
+
+    Example:
+      GET /api/reports/print/bulk/?week=44&year=2025&department=Engineering
+      GET /api/reports/print/bulk/?week=44&year=2025&output=pdf   (one merged PDF)
+
+    output=zip (default) renders the PDFs in a process pool; output=pdf builds
+    one merged document. Timings are returned in X-Report-* headers.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        role = getattr(request.user, "role", "").lower()
+        if role not in ["admin", "manager"]:
+            return Response({"error": "Only Admin or Manager can print bulk reports."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
+            year = int(request.query_params.get("year", timezone.now().year))
+            output = request.query_params.get("output", "zip").lower()
+            if output not in ("zip", "pdf"):
+                return Response({"error": "output must be 'zip' or 'pdf'."}, status=status.HTTP_400_BAD_REQUEST)
+
+            department = None
+            department_param = request.query_params.get("department")
+            if department_param:
+                department = (
+                    Department.objects.filter(name__iexact=department_param).first()
+                    or Department.objects.filter(code__iexact=department_param).first()
+                )
+                if not department:
+                    return Response({"error": f"Department '{department_param}' not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            started = time.perf_counter()
+            reports = bulk_report_data(week, year, department=department)
+            query_seconds = time.perf_counter() - started
+            if not reports:
+                scope = department.name if department else "the organization"
+                return Response(
+                    {"message": f"No performance records found for {scope} in Week {week}, {year}."},
+                    status=status.HTTP_200_OK,
+                )
+
+            scope = department.name.replace(" ", "_") if department else "Organization"
+            workers = 1
+            if output == "pdf":
+                content = render_merged_pdf(reports, title=f"Performance Reports — {scope} — Week {week}, {year}")
+                response = HttpResponse(content, content_type="application/pdf")
+                filename = f"Performance_Reports_{scope}_Week{week}_{year}.pdf"
+            else:
+                workers = pdf_workers() if len(reports) >= parallel_threshold() else 1
+                archive = tempfile.TemporaryFile()
+                write_zip(reports, archive, week, year, workers=workers)
+                archive.seek(0)
+                response = FileResponse(archive, content_type="application/zip")
+                filename = f"Performance_Reports_{scope}_Week{week}_{year}.zip"
+            total_seconds = time.perf_counter() - started
+
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            response["X-Report-Count"] = str(len(reports))
+            response["X-Report-Workers"] = str(workers)
+            response["X-Report-Query-Seconds"] = f"{query_seconds:.3f}"
+            response["X-Report-Render-Seconds"] = f"{total_seconds - query_seconds:.3f}"
+            response["X-Report-Total-Seconds"] = f"{total_seconds:.3f}"
+
+            logger.info(
+                f"Bulk PDF ({output}) for {scope}, Week {week}, {year}: {len(reports)} report(s), "
+                f"{workers} worker(s), {total_seconds:.2f}s."
+            )
+            return response
+
+        except Exception as e:
+            logger.exception("BulkPerformancePDF Error: %s", str(e))
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # ===========================================================
 # 7. CACHED REPORT MANAGEMENT (List, Archive, Restore)
 # ===========================================================
@@ -590,12 +623,23 @@ from rest_framework.generics import ListAPIView
 from django.shortcuts import get_object_or_404
 
 class CachedReportListView(ListAPIView):
-    """Displays list of cached reports (Admin/Manager dashboard)."""
+    """
+    Displays list of cached reports (Admin/Manager dashboard).
+    Payloads are not loaded (row_count / payload_bytes describe them);
+    ?include_payload=true returns them too.
+    """
     permission_classes = [permissions.IsAuthenticated]
-    serializer_class = CachedReportSerializer
+
+    def _include_payload(self):
+        return self.request.query_params.get("include_payload", "false").lower() == "true"
+
+    def get_serializer_class(self):
+        return CachedReportSerializer if self._include_payload() else CachedReportListSerializer
 
     def get_queryset(self):
-        queryset = CachedReport.objects.all().order_by("-created_at")
+        queryset = CachedReport.objects.select_related("generated_by", "manager", "department").order_by("-generated_at")
+        if not self._include_payload():
+            queryset = queryset.defer("payload_json", "payload_blob")
         report_type = self.request.query_params.get("report_type")
         if report_type:
             queryset = queryset.filter(report_type__iexact=report_type)
@@ -608,8 +652,7 @@ class CachedReportArchiveView(APIView):
 
     def post(self, request, pk):
         report = get_object_or_404(CachedReport, pk=pk)
-        report.is_archived = True
-        report.save(update_fields=["is_archived"])
+        report.soft_delete()
         logger.info(f"Cached report {report.id} archived by {request.user}.")
         return Response(
             {"message": f"Report {report.id} archived successfully."},
@@ -623,10 +666,154 @@ class CachedReportRestoreView(APIView):
 
     def post(self, request, pk):
         report = get_object_or_404(CachedReport, pk=pk)
-        report.is_archived = False
-        report.save(update_fields=["is_archived"])
+        report.restore()
         logger.info(f"Cached report {report.id} restored by {request.user}.")
         return Response(
             {"message": f"Report {report.id} restored successfully."},
             status=status.HTTP_200_OK,
         )
+
+
+# ===========================================================
+# 8. BACKGROUND REPORT JOBS (Submit / Poll / Download)
+# ===========================================================
+import mimetypes
+import os
+
+
+def _can_manage_reports(user):
+    return getattr(user, "role", "").lower() in ["admin", "manager"]
+
+
+def _visible_jobs(user):
+    jobs_qs = ReportJob.objects.select_related("requested_by")
+    if getattr(user, "role", "").lower() == "admin":
+        return jobs_qs
+    return jobs_qs.filter(requested_by=user)
+
+
+class ReportJobListCreateView(APIView):
+    """
+    POST → queue a heavy export and return its job ID (202)
+    GET  → the caller's jobs (all jobs for admins), newest first
+
+    Example:
+      POST /api/reports/jobs/ {"job_type": "monthly", "export_format": "xlsx", "month": 10, "year": 2025}
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not _can_manage_reports(request.user):
+            return Response({"error": "Only Admin or Manager can view report jobs."}, status=status.HTTP_403_FORBIDDEN)
+        queryset = _visible_jobs(request.user)
+        job_status = request.query_params.get("status")
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        serializer = ReportJobSerializer(queryset[:50], many=True, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        if not _can_manage_reports(request.user):
+            return Response({"error": "Only Admin or Manager can submit report jobs."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ReportJobCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        job = jobs.submit(data["job_type"], data["export_format"], data["params"], requested_by=request.user)
+        logger.info(f"Report job #{job.pk} ({job.job_type}/{job.export_format}) queued by {request.user}.")
+        return Response(
+            ReportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ReportJobDetailView(APIView):
+    """Status and progress of one job (poll until status is completed or failed)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(_visible_jobs(request.user), pk=pk)
+        return Response(ReportJobSerializer(job, context={"request": request}).data, status=status.HTTP_200_OK)
+
+
+class ReportJobDownloadView(APIView):
+    """Streams the stored artifact of a completed job."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(_visible_jobs(request.user).select_related("cached_report"), pk=pk)
+        if job.status != "completed" or not job.cached_report or not job.cached_report.file_path:
+            return Response(
+                {"error": f"Report job #{job.pk} has no file to download (status: {job.status})."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        stored = job.cached_report.file_path
+        try:
+            fileobj = stored.open("rb")
+        except FileNotFoundError:
+            return Response({"error": "The report file is no longer available."}, status=status.HTTP_410_GONE)
+
+        filename = os.path.basename(stored.name)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
+
+
+# ===========================================================
+# 9. WEEK-OVER-WEEK TRENDS (Department / Organization)
+# ===========================================================
+class TrendReportView(APIView):
+    """
+    This week vs. last week for every evaluated employee of a department
+    (or the whole organization): score delta, rank movement and the
+    current streak of improvements or declines — one SQL statement.
+
+    Example:
+      GET /api/reports/trends/?department_name=Engineering&week=44&year=2025&weeks=12
+
+    `weeks` is the look-back window (default 12, max 104) within which the
+    previous evaluated week and streaks are found.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            week = int(request.query_params.get("week", timezone.now().isocalendar()[1]))
+            year = int(request.query_params.get("year", timezone.now().year))
+            weeks = int(request.query_params.get("weeks", DEFAULT_LOOKBACK_WEEKS))
+        except ValueError:
+            return Response({"error": "week, year and weeks must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 2 <= weeks <= MAX_LOOKBACK_WEEKS:
+            return Response(
+                {"error": f"weeks must be between 2 and {MAX_LOOKBACK_WEEKS}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        department = None
+        department_name = request.query_params.get("department_name")
+        if department_name:
+            department = Department.objects.filter(name__iexact=department_name).first()
+            if not department:
+                return Response({"error": f"Department '{department_name}' not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            records = trend_rows(week, year, department=department, weeks=weeks)
+        except ValueError as e:
+            # date.fromisocalendar rejects weeks that do not exist in the year
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception("TrendReport Error: %s", str(e))
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(
+            {
+                "scope": department.name if department else "organization",
+                "evaluation_period": f"Week {week}, {year}",
+                "lookback_weeks": weeks,
+                "total_employees": len(records),
+                "summary": trend_summary(records),
+                "records": TrendReportSerializer(records, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,181 @@
+# ===========================================================
+# reports/warmup.py
+# ===========================================================
+# Purpose:
+# Precompute the read-through report caches before traffic
+# arrives (`manage.py warm_reports`, typically from cron early
+# on Monday).
+#
+# For the current and previous periods:
+# • weekly org report and every department report of the week
+#   → CachedReport (the same payloads the views store)
+# • monthly report → CachedReport
+# • weekly rollups behind /api/performance/summary/ and the
+#   dashboard → DepartmentWeekRollup / WeeklyRollup
+#
+# Department reports are built in a thread pool
+# (REPORT_WARM_WORKERS) and written one at a time;
+# every task reports its own timing. Entries that are still
+# fresh are skipped unless force=True.
+# ===========================================================
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from datetime import timedelta
+import logging
+import threading
+import time
+
+from employee.models import Department
+from performance.models import PerformanceEvaluation
+from performance.rollups import refresh_rollups
+from .builders import department_report_rows
+from .cache import fresh_report, store_report
+from .dataset import department_dataset, monthly_dataset, weekly_dataset
+
+logger = logging.getLogger(__name__)
+
+# Building a report is the expensive, read-only part and runs in parallel;
+# the cache writes are small and serialized (SQLite allows a single writer)
+_store_lock = threading.Lock()
+
+
+def _store(report_type, year, records, **period):
+    with _store_lock:
+        store_report(report_type, year, {"records": records}, **period)
+
+
+def warm_workers():
+    return getattr(settings, "REPORT_WARM_WORKERS", 4)
+
+
+def recent_weeks(day, count):
+    """(week_number, year) of the ISO week containing `day` and the count-1 weeks before it."""
+    weeks = []
+    for offset in range(count):
+        iso = (day - timedelta(weeks=offset)).isocalendar()
+        weeks.append((iso[1], iso[0]))
+    return weeks
+
+
+def recent_months(day, count):
+    """(month, year) of the month containing `day` and the count-1 months before it."""
+    month, year = day.month, day.year
+    months = []
+    for _ in range(count):
+        months.append((month, year))
+        month, year = (month - 1, year) if month > 1 else (12, year - 1)
+    return months
+
+
+# ===========================================================
+# TASKS
+# ===========================================================
+def _timed(label, build):
+    """
+    Run one warm-up task in its own DB connection scope.
+    build() returns (status, rows); status is stored | fresh | empty.
+    """
+    close_old_connections()
+    started = time.perf_counter()
+    try:
+        status, rows = build()
+    except Exception as e:
+        logger.exception("[WarmReports] %s failed: %s", label, e)
+        status, rows = "failed", 0
+    finally:
+        close_old_connections()
+    result = {"report": label, "status": status, "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+    logger.info("[WarmReports] %s → %s (%s rows) in %.3fs", label, status, rows, result["seconds"])
+    return result
+
+
+def warm_weekly(week_number, year, force=False):
+    def build():
+        if not force and fresh_report("weekly", year, week_number=week_number):
+            return "fresh", 0
+        records = list(weekly_dataset(week_number, year).rows())
+        if not records:
+            return "empty", 0
+        _store("weekly", year, records, week_number=week_number)
+        return "stored", len(records)
+
+    return _timed(f"weekly W{week_number}/{year}", build)
+
+
+def warm_department(department, week_number, year, force=False):
+    def build():
+        if not force and fresh_report("department", year, week_number=week_number, department=department):
+            return "fresh", 0
+        records = department_report_rows(
+            department, week_number, year, rows=department_dataset(department, week_number, year).rows()
+        )
+        if not records:
+            return "empty", 0
+        _store("department", year, records, week_number=week_number, department=department)
+        return "stored", len(records)
+
+    return _timed(f"department {department.name} W{week_number}/{year}", build)
+
+
+def warm_monthly(month, year, force=False):
+    def build():
+        if not force and fresh_report("monthly", year, month=month):
+            return "fresh", 0
+        records = list(monthly_dataset(month, year).rows())
+        if not records:
+            return "empty", 0
+        _store("monthly", year, records, month=month)
+        return "stored", len(records)
+
+    return _timed(f"monthly {month}/{year}", build)
+
+
+def warm_rollups(week_number, year):
+    """Rebuild the week's department and organization rollups (the dashboard's source)."""
+    def build():
+        department_ids = set(
+            PerformanceEvaluation.objects.filter(week_number=week_number, year=year, department__isnull=False)
+            .values_list("department_id", flat=True).distinct()
+        )
+        if not department_ids:
+            return "empty", 0
+        refresh_rollups((department_id, week_number, year) for department_id in department_ids)
+        return "stored", len(department_ids)
+
+    return _timed(f"rollups W{week_number}/{year}", build)
+
+
+# ===========================================================
+# ENTRY POINT
+# ===========================================================
+def warm_reports(day=None, weeks=2, months=2, workers=None, force=False):
+    """
+    Warm every report for the last `weeks` ISO weeks and `months` months
+    ending at `day` (default: today). Returns one result dict per task.
+    """
+    day = day or timezone.localdate()
+    workers = workers or warm_workers()
+    departments = list(Department.objects.filter(is_active=True).order_by("name"))
+    results = []
+
+    for week_number, year in recent_weeks(day, weeks):
+        results.append(warm_rollups(week_number, year))
+        results.append(warm_weekly(week_number, year, force=force))
+
+    department_tasks = [
+        (department, week_number, year)
+        for week_number, year in recent_weeks(day, weeks)
+        for department in departments
+    ]
+    if workers > 1 and len(department_tasks) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm-reports") as pool:
+            results.extend(pool.map(lambda task: warm_department(*task, force=force), department_tasks))
+    else:
+        results.extend(warm_department(*task, force=force) for task in department_tasks)
+
+    for month, year in recent_months(day, months):
+        results.append(warm_monthly(month, year, force=force))
+    return results